@@ -0,0 +1,129 @@
+"""
+Generates a synthetic corpus of .docx, .pptx, .xlsx and .txt files.
+
+    python -m benchmarks.corpus uploads --files 20 --segments 200
+
+The files have the same shape as the ones create_test_files.sh writes (a
+headed Word document, title slides, a sheet of strings and numbers, plain
+text), scaled to the requested number of segments. Most segments are
+Japanese prose; some are repeated status labels, IDs and numbers, so
+deduplication and the pre-filter see realistic input. The same seed always
+produces the same corpus.
+"""
+
+import argparse
+import os
+import random
+from docx import Document
+from openpyxl import Workbook
+from pptx import Presentation
+
+KINDS = ("docx", "pptx", "xlsx", "txt")
+SUBJECTS = ["この製品", "当社のサービス", "新しいシステム", "お客様", "担当チーム", "本契約"]
+PREDICATES = [
+    "は来月から利用可能になります",
+    "について詳しくご説明します",
+    "の品質を継続的に改善しています",
+    "に関するお問い合わせを受け付けています",
+    "は安全性の基準を満たしています",
+    "の導入により作業時間が短縮されます",
+]
+CLAUSES = ["なお、", "また、", "ただし、", "さらに、", ""]
+LABELS = ["未対応", "対応中", "完了", "保留"]
+
+
+def sentence(rng: random.Random) -> str:
+    return f"{rng.choice(CLAUSES)}{rng.choice(SUBJECTS)}{rng.choice(PREDICATES)}。"
+
+
+def segment_texts(rng: random.Random, count: int) -> list:
+    """Returns count segment texts: mostly prose, some labels, IDs and numbers."""
+    texts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.15:
+            texts.append(rng.choice(LABELS))
+        elif roll < 0.25:
+            texts.append(f"ID-{rng.randrange(10**6):06d}")
+        elif roll < 0.3:
+            texts.append(f"{rng.randrange(10**5):,}")
+        else:
+            texts.append("".join(sentence(rng) for _ in range(rng.randint(1, 3))))
+    return texts
+
+
+def write_docx(path: str, texts: list):
+    doc = Document()
+    doc.add_heading("テスト文書", level=1)
+    for text in texts:
+        doc.add_paragraph(text)
+    doc.save(path)
+
+
+def write_pptx(path: str, texts: list):
+    prs = Presentation()
+    layout = prs.slide_layouts[1]  # Title and content
+    for i in range(0, len(texts), 2):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = texts[i]
+        if i + 1 < len(texts):
+            slide.placeholders[1].text = texts[i + 1]
+    prs.save(path)
+
+
+def write_xlsx(path: str, texts: list):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "TestData"
+    for row, text in enumerate(texts, 1):
+        ws.cell(row=row, column=1, value=text)
+        ws.cell(row=row, column=2, value=row * 100)
+    wb.save(path)
+
+
+def write_txt(path: str, texts: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(texts))
+
+
+WRITERS = {"docx": write_docx, "pptx": write_pptx, "xlsx": write_xlsx, "txt": write_txt}
+
+
+def generate_corpus(
+    directory: str,
+    files: int,
+    segments: int,
+    seed: int = 0,
+    kinds: tuple = KINDS,
+) -> list:
+    """
+    Writes files documents of about segments segments each, cycling through
+    kinds, and returns their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        kind = kinds[i % len(kinds)]
+        rng = random.Random(f"{seed}:{i}")
+        path = os.path.join(directory, f"bench_{i:04d}.{kind}")
+        WRITERS[kind](path, segment_texts(rng, segments))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    args = parser.parse_args()
+    paths = generate_corpus(
+        args.directory, args.files, args.segments, args.seed, tuple(args.kinds)
+    )
+    print(f"Wrote {len(paths)} files to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
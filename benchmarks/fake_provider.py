@@ -0,0 +1,142 @@
+"""
+A seeded fake LLM provider for benchmarks.
+
+FakeProvider.translate/critique have the same signatures as the real
+translate_with_*/critique_with_* functions and go through the same path: the
+prompt is rendered from the templates and the request runs on the shared
+async engine under the rate-limit scheduler, so retries, throttling and
+concurrency limits behave as in production. Only the network call is
+simulated.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from pipeline.batching import SEGMENT_TAG
+from pipeline.chunking import estimate_tokens
+from translators.async_engine import run_request
+from translators.errors import RateLimitedError, TransientError
+from translators.utils import format_reference_section, get_prompt_with_glossary
+
+
+@dataclass
+class LatencyProfile:
+    """
+    How a simulated provider behaves. Latency is log-normal around median
+    seconds (sigma is the spread of its logarithm) plus per_1k_tokens seconds
+    per thousand output tokens. Each attempt fails with a transient error at
+    failure_rate, or is throttled (HTTP 429, retry_after seconds) at
+    throttle_rate.
+    """
+
+    median: float = 0.5
+    sigma: float = 0.4
+    per_1k_tokens: float = 0.5
+    failure_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+
+
+class FakeProvider:
+    """
+    Answers with each segment prefixed by the provider's name, keeping packed
+    <seg> tags intact. The outcome and latency of every attempt are drawn from
+    a generator seeded by (seed, provider, attempt, text), so a run is
+    reproducible regardless of the order in which requests are scheduled.
+    """
+
+    def __init__(self, name: str, profile: LatencyProfile, seed: int = 0):
+        self.name = name
+        self.profile = profile
+        self.seed = seed
+
+    def _rng(self, text: str, attempt: int) -> random.Random:
+        return random.Random(f"{self.seed}:{self.name}:{attempt}:{text}")
+
+    def respond(self, text: str) -> str:
+        if SEGMENT_TAG.search(text):
+            return SEGMENT_TAG.sub(
+                lambda m: f'<seg id="{m.group(1)}">[{self.name}] {m.group(2)}</seg>',
+                text,
+            )
+        return f"[{self.name}] {text}"
+
+    def _request(self, prompt: str, key: str, response: str):
+        attempts = 0
+        profile = self.profile
+
+        async def attempt():
+            nonlocal attempts
+            rng = self._rng(key, attempts)
+            attempts += 1
+            latency = rng.lognormvariate(0, profile.sigma) * profile.median
+            latency += estimate_tokens(response) / 1000 * profile.per_1k_tokens
+            roll = rng.random()
+            if roll < profile.throttle_rate:
+                await asyncio.sleep(latency / 10)
+                raise RateLimitedError(
+                    self.name, "Simulated rate limit.", 429, profile.retry_after
+                )
+            await asyncio.sleep(latency)
+            if roll < profile.throttle_rate + profile.failure_rate:
+                raise TransientError(self.name, "Simulated server error.", 503)
+            return response
+
+        return run_request(
+            self.name, attempt, estimate_tokens(prompt) + estimate_tokens(response)
+        )
+
+    def translate(
+        self,
+        text: str,
+        target_language: str,
+        source_language: str = "English",
+        references: list | None = None,
+        on_text=None,
+    ) -> str:
+        if not text or not text.strip():
+            return ""
+        prompt = get_prompt_with_glossary(
+            "templates/translate_prompt.txt",
+            {
+                "{source_language}": source_language,
+                "{target_language}": target_language,
+                "{text}": text,
+                "{reference_section}": format_reference_section(references),
+            },
+        )
+        response = self._request(prompt, text, self.respond(text))
+        if on_text:
+            on_text(None)
+            on_text(response)
+        return response
+
+    def critique(
+        self,
+        source_text: str,
+        primary_translation: str,
+        target_language: str,
+        source_language: str = "English",
+        on_text=None,
+    ) -> str:
+        if not source_text or not source_text.strip():
+            return ""
+        prompt = get_prompt_with_glossary(
+            "templates/critique_prompt.txt",
+            {
+                "{source_language}": source_language,
+                "{target_language}": target_language,
+                "{source_text}": source_text,
+                "{primary_translation}": primary_translation,
+            },
+        )
+        response = self._request(
+            prompt,
+            f"critique:{source_text}",
+            f"**Critique:** [{self.name}] Reviewed.\n"
+            f"**Refined Translation:** {primary_translation}",
+        )
+        if on_text:
+            on_text(None)
+            on_text(response)
+        return response
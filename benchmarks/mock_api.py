@@ -0,0 +1,477 @@
+"""
+A local mock of the OpenAI, Anthropic and Gemini HTTP APIs for load tests.
+
+    python -m benchmarks.mock_api --port 8800 --latency-median 0.5
+
+Serves POST /v1/chat/completions (OpenAI), POST /v1/messages (Anthropic) and
+POST /v1beta/models/<model>:generateContent / :streamGenerateContent (Gemini)
+in each provider's wire format, streamed as server-sent events (or, for
+Gemini without alt=sse, as a streamed JSON array) when the client asks for it.
+Point the service at it with MOCK_API_URL=http://127.0.0.1:8800 and the real
+translator modules, SDKs and HTTP clients are exercised with no network.
+
+Every request draws its latency and outcome from a LatencyProfile (per
+provider, see --profiles), so responses can be delayed, throttled with 429 and
+Retry-After, or failed with 503. Input and output tokens are estimated and
+returned in each response's usage block. GET /stats returns the totals per
+provider as JSON; PUT /profiles replaces the profiles while the server runs.
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.fake_provider import LatencyProfile
+from pipeline.batching import SEGMENT_TAG
+from pipeline.chunking import estimate_tokens
+
+PROVIDERS = ("gpt", "claude", "gemini")
+GEMINI_PATH = re.compile(
+    r"^/v1beta/models/([^:/]+):(generateContent|streamGenerateContent)$"
+)
+SOURCE_TEXT = re.compile(r"Source Text:\n---\n(.*)\Z", re.DOTALL)
+PROVIDED_TRANSLATION = re.compile(
+    r"PROVIDED TRANSLATION:\n(.*?)\n---\s*\Z", re.DOTALL
+)
+CHUNK_WORDS = 4  # Words per streamed delta
+
+
+def source_text(prompt: str) -> str:
+    """Returns the text a translate or critique prompt is about, or the whole prompt."""
+    for pattern in (SOURCE_TEXT, PROVIDED_TRANSLATION):
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1).strip()
+    return prompt.strip()
+
+
+def mock_response(provider: str, prompt: str) -> str:
+    """
+    Answers a prompt the way the pipeline expects: packed <seg> blocks come back
+    tagged and in order, critiques use the **Critique:**/**Refined Translation:**
+    format, and anything else is echoed with a provider prefix.
+    """
+    text = source_text(prompt)
+    if PROVIDED_TRANSLATION.search(prompt):
+        return (
+            f"**Critique:** [mock {provider}] Reviewed.\n"
+            f"**Refined Translation:** {text}"
+        )
+    if SEGMENT_TAG.search(text):
+        return "\n".join(
+            f'<seg id="{m.group(1)}">[mock {provider}] {m.group(2)}</seg>'
+            for m in SEGMENT_TAG.finditer(text)
+        )
+    return f"[mock {provider}] {text}"
+
+
+def split_deltas(text: str) -> list:
+    """Splits text into stream deltas of a few words that join back to text."""
+    words = re.split(r"(?<=\s)", text)
+    return [
+        "".join(words[i : i + CHUNK_WORDS]) for i in range(0, len(words), CHUNK_WORDS)
+    ] or [""]
+
+
+class MockState:
+    """Profiles, the seeded generator and the per-provider request totals."""
+
+    def __init__(self, profiles: dict, seed: int = 0):
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.profiles = profiles
+        self._stats = {name: self._empty_stats() for name in PROVIDERS}
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "requests": 0,
+            "streamed": 0,
+            "succeeded": 0,
+            "throttled": 0,
+            "failed": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+        }
+
+    def profile(self, provider: str) -> LatencyProfile:
+        return self.profiles.get(provider) or self.profiles["default"]
+
+    def set_profiles(self, profiles: dict):
+        with self._lock:
+            self.profiles = {**self.profiles, **profiles}
+
+    def draw(self, provider: str) -> tuple:
+        """Returns (outcome, seconds to first token, seconds per output token)."""
+        profile = self.profile(provider)
+        with self._lock:
+            first_token = self._rng.lognormvariate(0, profile.sigma) * profile.median
+            roll = self._rng.random()
+        if roll < profile.throttle_rate:
+            return "throttled", first_token / 10, 0.0
+        if roll < profile.throttle_rate + profile.failure_rate:
+            return "failed", first_token, 0.0
+        return "ok", first_token, profile.per_1k_tokens / 1000
+
+    def count(self, provider: str, **values):
+        with self._lock:
+            for key, value in values.items():
+                self._stats[provider][key] += value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "providers": {name: dict(stats) for name, stats in self._stats.items()},
+                "profiles": {name: asdict(p) for name, p in self.profiles.items()},
+            }
+
+
+def openai_body(model: str, content: str, input_tokens: int, output_tokens: int):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def openai_events(model: str, deltas: list, input_tokens: int, output_tokens: int):
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+    }
+
+    def chunk(delta: dict, finish_reason=None):
+        choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        return None, {**base, "choices": [choice]}
+
+    yield chunk({"role": "assistant", "content": ""})
+    for delta in deltas:
+        yield chunk({"content": delta})
+    yield chunk({}, "stop")
+    usage = {
+        "prompt_tokens": input_tokens,
+        "completion_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+    yield None, {**base, "choices": [], "usage": usage}
+    yield None, "[DONE]"
+
+
+def anthropic_body(model: str, content: str, input_tokens: int, output_tokens: int):
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": content}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+    }
+
+
+def anthropic_events(model: str, deltas: list, input_tokens: int, output_tokens: int):
+    message = anthropic_body(model, "", input_tokens, 1)
+    message.update(content=[], stop_reason=None)
+    yield "message_start", {"type": "message_start", "message": message}
+    yield "content_block_start", {
+        "type": "content_block_start",
+        "index": 0,
+        "content_block": {"type": "text", "text": ""},
+    }
+    yield "ping", {"type": "ping"}
+    for delta in deltas:
+        yield "content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": delta},
+        }
+    yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+    yield "message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+        "usage": {"output_tokens": output_tokens},
+    }
+    yield "message_stop", {"type": "message_stop"}
+
+
+def gemini_body(content: str, input_tokens: int, output_tokens: int, final=True):
+    candidate = {
+        "content": {"parts": [{"text": content}], "role": "model"},
+        "index": 0,
+    }
+    if final:
+        candidate["finishReason"] = "STOP"
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {
+            "promptTokenCount": input_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": input_tokens + output_tokens,
+        },
+    }
+
+
+def error_body(provider: str, status: int, message: str) -> dict:
+    if provider == "claude":
+        kind = "rate_limit_error" if status == 429 else "overloaded_error"
+        return {"type": "error", "error": {"type": kind, "message": message}}
+    if provider == "gemini":
+        kind = "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"
+        return {"error": {"code": status, "message": message, "status": kind}}
+    kind = "rate_limit_exceeded" if status == 429 else "server_error"
+    return {"error": {"message": message, "type": kind, "param": None, "code": kind}}
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is realistic
+    state: MockState = None
+
+    def log_message(self, format, *args):
+        pass  # Load tests would otherwise flood the log
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/stats":
+            self._send_json(200, self.state.stats())
+        else:
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+
+    def do_PUT(self):
+        if self.path.split("?")[0] != "/profiles":
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+            return
+        self.state.set_profiles(parse_profiles(self._read_json()))
+        self._send_json(200, self.state.stats())
+
+    def do_POST(self):
+        path, _, query = self.path.partition("?")
+        body = self._read_json()
+        if path == "/v1/chat/completions":
+            prompt = "\n".join(
+                str(message.get("content", "")) for message in body.get("messages", [])
+            )
+            self._complete("gpt", body.get("model", ""), prompt, body.get("stream"))
+        elif path == "/v1/messages":
+            # The translators put the instructions in the system prompt and the
+            # text in the last user message, or everything in the user message.
+            messages = body.get("messages") or [{}]
+            prompt = messages[-1].get("content", "")
+            if not isinstance(prompt, str):
+                prompt = "".join(part.get("text", "") for part in prompt)
+            input_text = str(body.get("system", "")) + prompt
+            self._complete(
+                "claude", body.get("model", ""), prompt, body.get("stream"), input_text
+            )
+        elif match := GEMINI_PATH.match(path):
+            prompt = "\n".join(
+                part.get("text", "")
+                for content in body.get("contents", [])
+                for part in content.get("parts", [])
+            )
+            stream = match.group(2) == "streamGenerateContent"
+            self._complete(
+                "gemini", match.group(1), prompt, stream, sse="alt=sse" in query
+            )
+        else:
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+
+    def _complete(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        stream: bool,
+        input_text: str | None = None,
+        sse: bool = True,
+    ):
+        content = mock_response(provider, prompt)
+        input_tokens = estimate_tokens(input_text or prompt)
+        output_tokens = estimate_tokens(content)
+        outcome, first_token, per_token = self.state.draw(provider)
+        self.state.count(provider, requests=1, streamed=1 if stream else 0)
+        time.sleep(first_token)
+        if outcome == "throttled":
+            self.state.count(provider, throttled=1)
+            retry_after = self.state.profile(provider).retry_after
+            self._send_json(
+                429,
+                error_body(provider, 429, "Simulated rate limit."),
+                {"Retry-After": f"{retry_after:g}"},
+            )
+            return
+        if outcome == "failed":
+            self.state.count(provider, failed=1)
+            self._send_json(503, error_body(provider, 503, "Simulated server error."))
+            return
+        self.state.count(
+            provider,
+            succeeded=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+        if not stream:
+            time.sleep(output_tokens * per_token)
+            if provider == "gpt":
+                body = openai_body(model, content, input_tokens, output_tokens)
+            elif provider == "claude":
+                body = anthropic_body(model, content, input_tokens, output_tokens)
+            else:
+                body = gemini_body(content, input_tokens, output_tokens)
+            self._send_json(200, body)
+            return
+        self._stream(
+            provider, model, content, input_tokens, output_tokens, per_token, sse
+        )
+
+    def _stream(
+        self,
+        provider: str,
+        model: str,
+        content: str,
+        input_tokens: int,
+        output_tokens: int,
+        per_token: float,
+        sse: bool,
+    ):
+        deltas = split_deltas(content)
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", "text/event-stream" if sse else "application/json"
+        )
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if provider == "gemini":
+            events = [
+                (None, gemini_body(delta, input_tokens, estimate_tokens(delta), False))
+                for delta in deltas
+            ]
+            events[-1][1]["candidates"][0]["finishReason"] = "STOP"
+        elif provider == "gpt":
+            events = openai_events(model, deltas, input_tokens, output_tokens)
+        else:
+            events = anthropic_events(model, deltas, input_tokens, output_tokens)
+        events = list(events)
+        # The output tokens are spread evenly over the streamed events.
+        pause = output_tokens * per_token / len(events)
+        for number, (event, data) in enumerate(events):
+            time.sleep(pause)
+            payload = data if isinstance(data, str) else json.dumps(data)
+            if sse:
+                prefix = f"event: {event}\n" if event else ""
+                self._write_chunk(f"{prefix}data: {payload}\n\n".encode("utf-8"))
+            else:
+                # Gemini's REST transport reads one JSON array, element by element.
+                separator = "," if number else "["
+                self._write_chunk(f"{separator}{payload}".encode("utf-8"))
+        if not sse:
+            self._write_chunk(b"]")
+        self._write_chunk(b"")
+
+
+def parse_profiles(data: dict) -> dict:
+    """Builds {provider or "default": LatencyProfile} from a JSON object."""
+    return {name: LatencyProfile(**values) for name, values in data.items()}
+
+
+def start_mock_api(
+    profiles: dict, port: int = 0, host: str = "127.0.0.1", seed: int = 0
+) -> ThreadingHTTPServer:
+    """
+    Serves the mock APIs on a daemon thread and returns the server; its URL is
+    http://host:server.server_address[1]. profiles maps a provider (or
+    "default") to its LatencyProfile.
+    """
+    state = MockState({"default": LatencyProfile(), **profiles}, seed)
+    handler = type("MockAPIHandler", (MockAPIHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="MockAPI", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-median", type=float, default=0.5)
+    parser.add_argument("--latency-sigma", type=float, default=0.4)
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument(
+        "--profiles",
+        help='JSON file of per-provider profiles, e.g. {"claude": {"median": 2}}.',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+
+    profiles = {
+        "default": LatencyProfile(
+            median=args.latency_median,
+            sigma=args.latency_sigma,
+            per_1k_tokens=args.latency_per_1k_tokens,
+            failure_rate=args.failure_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+        )
+    }
+    if args.profiles:
+        with open(args.profiles, "r", encoding="utf-8") as f:
+            profiles.update(parse_profiles(json.load(f)))
+    server = start_mock_api(profiles, args.port, args.host, args.seed)
+    url = f"http://{args.host}:{server.server_address[1]}"
+    logging.info(f"Mock provider APIs listening on {url}")
+    logging.info(f"Start the service with MOCK_API_URL={url} to use them.")
+    try:
+        while True:
+            time.sleep(60)
+            logging.info(json.dumps(server.state.stats()["providers"]))
+    except KeyboardInterrupt:
+        server.shutdown()
+        logging.info(json.dumps(server.state.stats()["providers"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+End-to-end throughput benchmark of the job pipeline against a fake provider.
+
+    python -m benchmarks.throughput --files 40 --segments 200 --output run.json
+
+A synthetic corpus (see benchmarks.corpus) is processed once per operation
+mode by the real process_csv_job / process_hot_folder_job code on the real
+job queue, with every provider replaced by a seeded FakeProvider (or, with
+--backend mock-api, with the real provider clients talking to a local
+benchmarks.mock_api server using the same latency profile). Each mode
+runs in its own process in a scratch directory, so peak RSS and CPU time are
+measured separately. Reported per mode: jobs/sec, p50/p95/p99 job latency
+(queue wait included), peak RSS of the service and of its document workers,
+CPU time, job outcomes and provider retries. Results are printed as a table
+and written as JSON, with the git revision, to compare runs across versions.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.corpus import KINDS, generate_corpus  # noqa: E402
+from benchmarks.fake_provider import FakeProvider, LatencyProfile  # noqa: E402
+from benchmarks.mock_api import start_mock_api  # noqa: E402
+
+MODES = ("SIMPLE", "PARALLEL", "CRITIQUE", "HOTFOLDER")
+BACKENDS = ("fake", "mock-api")
+PROVIDERS = ("gpt", "claude", "gemini")
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of values (0 if there are none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure(settings: dict):
+    """Points the service at the scratch directory and applies the run's settings."""
+    import config
+
+    config.GLOSSARY_PATH = os.path.join(REPO_ROOT, config.GLOSSARY_PATH)
+    config.JOB_WORKERS = settings["job_workers"]
+    config.DOCUMENT_WORKERS = settings["document_workers"]
+    # Every run must reach the (fake) providers, so nothing is served from disk.
+    config.TRANSLATION_CACHE_ENABLED = False
+    config.TRANSLATION_MEMORY_ENABLED = False
+    config.DOCUMENT_CACHE_ENABLED = False
+    config.RETRY_BASE_DELAY = settings["retry_base_delay"]
+    config.PROVIDER_RATE_LIMITS = {
+        name: {"rpm": settings["rpm"], "tpm": settings["tpm"]} for name in PROVIDERS
+    }
+    if settings["mock_api_url"]:
+        url = settings["mock_api_url"]
+        config.PROVIDER_BASE_URLS = {"gpt": f"{url}/v1", "claude": url, "gemini": url}
+        config.OPENAI_API_KEY = config.ANTHROPIC_API_KEY = "mock"
+        config.GOOGLE_API_KEY = "mock"
+
+
+def run_mode(mode: str, corpus: list, settings: dict, results):
+    """Runs every corpus file as one job in mode; executes in a child process."""
+    logging.basicConfig(level=logging.INFO if settings["verbose"] else logging.ERROR)
+    workdir = tempfile.mkdtemp(prefix=f"bench_{mode.lower()}_")
+    try:
+        os.chdir(workdir)
+        shutil.copytree(os.path.join(REPO_ROOT, "templates"), "templates")
+        for directory in ("uploads", "outputs", "monitor"):
+            os.makedirs(directory)
+        configure(settings)
+        import core
+
+        core.pyperclip.copy = lambda text: None
+        core.OPERATION_MODE = "PARALLEL" if mode == "HOTFOLDER" else mode
+        profile = LatencyProfile(**settings["profile"])
+        for name in PROVIDERS if not settings["mock_api_url"] else ():
+            provider = FakeProvider(name, profile, settings["seed"])
+            setattr(core, f"translate_with_{name}", provider.translate)
+            setattr(core, f"critique_with_{name}", provider.critique)
+
+        latencies = []
+        lock = threading.Lock()
+
+        def timed(submitted: float, func, *args):
+            try:
+                func(*args)
+            finally:
+                with lock:
+                    latencies.append(time.monotonic() - submitted)
+
+        paths = []
+        for source in corpus:
+            path = os.path.join("uploads", os.path.basename(source))
+            shutil.copy(source, path)
+            paths.append(path)
+
+        core.job_queue.start()
+        start = time.monotonic()
+        for number, path in enumerate(paths, 1):
+            if mode == "HOTFOLDER":
+                args = (core.process_hot_folder_job, path)
+            else:
+                job = {
+                    "job_id": str(number),
+                    "link": f"https://example.com/jobs/{number}",
+                    "title": "Japanese/English",
+                }
+                args = (core.process_csv_job, job, path)
+            core.job_queue.submit(timed, time.monotonic(), *args)
+        core.job_queue.join()
+        elapsed = time.monotonic() - start
+        retries = core.get_scheduler().stats()
+        core.shutdown_job_queue()
+
+        statuses = {}
+        for job in core.get_job_store().list_jobs():
+            statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        workers = resource.getrusage(resource.RUSAGE_CHILDREN)
+        results.put(
+            {
+                "mode": mode,
+                "jobs": len(paths),
+                "seconds": elapsed,
+                "jobs_per_second": len(paths) / elapsed if elapsed else 0.0,
+                "latency_p50": percentile(latencies, 0.50),
+                "latency_p95": percentile(latencies, 0.95),
+                "latency_p99": percentile(latencies, 0.99),
+                "peak_rss_mb": own.ru_maxrss / 1024,
+                "peak_worker_rss_mb": workers.ru_maxrss / 1024,
+                "cpu_seconds": own.ru_utime + own.ru_stime,
+                "worker_cpu_seconds": workers.ru_utime + workers.ru_stime,
+                "statuses": statuses,
+                "provider_requests": {
+                    name: {key: stats[key] for key in ("requests", "retries", "failed")}
+                    for name, stats in retries.items()
+                },
+            }
+        )
+    except Exception as e:
+        results.put({"mode": mode, "error": repr(e)})
+        raise
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--files", type=int, default=20, help="Jobs per mode.")
+    parser.add_argument("--segments", type=int, default=100, help="Per file.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="fake",
+        help="fake: in-process FakeProvider. mock-api: real clients, local server.",
+    )
+    parser.add_argument("--job-workers", type=int, default=4)
+    parser.add_argument("--document-workers", type=int, default=2)
+    parser.add_argument("--latency-median", type=float, default=0.5)
+    parser.add_argument("--latency-sigma", type=float, default=0.4)
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--retry-base-delay", type=float, default=0.5)
+    parser.add_argument("--rpm", type=int, default=0, help="0 = unlimited.")
+    parser.add_argument("--tpm", type=int, default=0, help="0 = unlimited.")
+    parser.add_argument("--output", default="throughput_results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    settings = {
+        "seed": args.seed,
+        "job_workers": args.job_workers,
+        "document_workers": args.document_workers,
+        "retry_base_delay": args.retry_base_delay,
+        "rpm": args.rpm,
+        "tpm": args.tpm,
+        "verbose": args.verbose,
+        "backend": args.backend,
+        "mock_api_url": None,
+        "profile": {
+            "median": args.latency_median,
+            "sigma": args.latency_sigma,
+            "per_1k_tokens": args.latency_per_1k_tokens,
+            "failure_rate": args.failure_rate,
+            "throttle_rate": args.throttle_rate,
+            "retry_after": args.retry_after,
+        },
+    }
+    report = {
+        "benchmark": "throughput",
+        "revision": git_revision(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "files": args.files,
+        "segments": args.segments,
+        "kinds": args.kinds,
+        "settings": settings,
+        "results": [],
+    }
+    mock_api = None
+    if args.backend == "mock-api":
+        mock_api = start_mock_api(
+            {"default": LatencyProfile(**settings["profile"])}, seed=args.seed
+        )
+        settings["mock_api_url"] = f"http://127.0.0.1:{mock_api.server_address[1]}"
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = generate_corpus(
+            directory, args.files, args.segments, args.seed, tuple(args.kinds)
+        )
+        print(
+            f"{'mode':<10} {'jobs/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+            f"{'RSS MB':>7} {'CPU s':>7}  outcomes"
+        )
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for mode in args.modes:
+            process = context.Process(
+                target=run_mode, args=(mode, corpus, settings, results)
+            )
+            process.start()
+            result = results.get()
+            process.join()
+            report["results"].append(result)
+            if "error" in result:
+                print(f"{mode:<10} failed: {result['error']}")
+                continue
+            print(
+                f"{mode:<10} {result['jobs_per_second']:>7.2f} "
+                f"{result['latency_p50']:>7.1f} {result['latency_p95']:>7.1f} "
+                f"{result['latency_p99']:>7.1f} {result['peak_rss_mb']:>7.0f} "
+                f"{result['cpu_seconds'] + result['worker_cpu_seconds']:>7.1f}  "
+                f"{result['statuses']}"
+            )
+    if mock_api:
+        report["mock_api"] = mock_api.state.stats()["providers"]
+        mock_api.shutdown()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
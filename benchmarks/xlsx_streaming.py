@@ -0,0 +1,84 @@
+"""
+Compares full and streaming .xlsx handling on a generated workbook.
+
+    python -m benchmarks.xlsx_streaming --rows 200000
+
+Each mode runs in its own process so peak memory (max RSS) is measured
+separately. "full" loads the whole workbook with openpyxl, parses it and
+saves the translated copy; "streaming" parses with read-only rows and
+regenerates by rewriting the worksheet XML row by row.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from fetchers.document_ir import parse_document  # noqa: E402
+from regenerators.xlsx_regenerator import create_xlsx  # noqa: E402
+
+STATUSES = ["Offen", "In Bearbeitung", "Erledigt", "N/A"]
+
+
+def generate_workbook(path: str, rows: int):
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet("Items")
+    sheet.append(["ID", "Beschreibung", "Status", "Menge"])
+    for i in range(rows):
+        sheet.append([i, f"Artikel Nummer {i}", STATUSES[i % len(STATUSES)], i % 97])
+    wb.save(path)
+
+
+def run(mode: str, path: str, output: str, results):
+    # The threshold decides which path parse_document and create_xlsx take.
+    config.XLSX_STREAMING_MIN_MB = 0 if mode == "streaming" else float("inf")
+    start = time.perf_counter()
+    document = parse_document(path)
+    parsed = time.perf_counter()
+    translations = [segment.text.upper() for segment in document.segments]
+    status = create_xlsx(document, translations, output)
+    done = time.perf_counter()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put(
+        (mode, len(document.segments), parsed - start, done - parsed, peak_mb, status)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.xlsx")
+        generate_workbook(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"Workbook: {args.rows} rows, {size_mb:.1f} MB")
+        print(
+            f"{'mode':<10} {'segments':>9} {'parse s':>8} {'write s':>8} {'peak MB':>8}"
+        )
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for mode in ("full", "streaming"):
+            output = os.path.join(directory, f"{mode}.xlsx")
+            process = context.Process(target=run, args=(mode, path, output, results))
+            process.start()
+            mode, segments, parse_s, write_s, peak_mb, status = results.get()
+            process.join()
+            if status.startswith("Error:"):
+                print(f"{mode}: {status}")
+                continue
+            print(
+                f"{mode:<10} {segments:>9} {parse_s:>8.1f} {write_s:>8.1f} {peak_mb:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,8 @@ PRIMARY_MODEL = os.getenv("PRIMARY_MODEL", "gpt").lower()
 
 # Glossary
 GLOSSARY_PATH = os.getenv("GLOSSARY_PATH", "glossary.json")
+# Only inject glossary terms that actually occur in the text being translated.
+GLOSSARY_FILTER_TERMS = os.getenv("GLOSSARY_FILTER_TERMS", "True").upper() == "TRUE"
 
 # Language Defaults
 DEFAULT_SOURCE_LANGUAGE = "Japanese"
@@ -23,6 +25,225 @@ DEFAULT_TARGET_LANGUAGE = "English"
 DUMMY_MODE = os.getenv("DUMMY_MODE", "False").upper() == "TRUE"
 
 # --- Inter-Process Communication ---
-# The path to a file that the service will create to signal the UI to reload.
-UI_RELOAD_SIGNAL_PATH = "monitor/.trigger_reload"
+# The UI creates this file to make the service reload its configuration.
 CONFIG_RELOAD_SIGNAL_PATH = "monitor/.trigger_config_reload"
+# The service pushes job changes to the review UI over a local socket (port 0
+# turns it off). The UI checks for them every UI_REFRESH_INTERVAL seconds and
+# only reruns when a job was added or the job on screen changed; while the
+# service is unreachable it reads the job store's recent changes every
+# UI_POLL_INTERVAL seconds instead.
+UI_NOTIFY_HOST = os.getenv("UI_NOTIFY_HOST", "127.0.0.1")
+UI_NOTIFY_PORT = int(os.getenv("UI_NOTIFY_PORT", "9465"))
+UI_REFRESH_INTERVAL = float(os.getenv("UI_REFRESH_INTERVAL", "1"))
+UI_POLL_INTERVAL = float(os.getenv("UI_POLL_INTERVAL", "5"))
+# The service writes the plain text of every regenerated output to PREVIEW_DIR,
+# so the UI can show it without parsing the document. The UI keeps up to
+# UI_PREVIEW_CACHE_ENTRIES rendered previews (about UI_PREVIEW_CACHE_MB of
+# text) in memory and shows long texts UI_PREVIEW_PAGE_CHARS at a time.
+PREVIEW_DIR = os.getenv("PREVIEW_DIR", "outputs/.previews")
+UI_PREVIEW_CACHE_ENTRIES = int(os.getenv("UI_PREVIEW_CACHE_ENTRIES", "32"))
+UI_PREVIEW_CACHE_MB = float(os.getenv("UI_PREVIEW_CACHE_MB", "256"))
+UI_PREVIEW_PAGE_CHARS = int(os.getenv("UI_PREVIEW_PAGE_CHARS", "100000"))
+
+# --- Concurrency ---
+# Number of jobs (files) processed at once, and how many may wait in the queue.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "500"))
+# Maximum number of in-flight API calls per provider, shared across all jobs.
+PROVIDER_MAX_CONCURRENCY = {
+    "gpt": int(os.getenv("GPT_MAX_CONCURRENCY", "4")),
+    "claude": int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4")),
+    "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+}
+# Provider requests are awaited together on one shared asyncio event loop. Each
+# attempt is cancelled after PROVIDER_TIMEOUT_SECONDS, and at most
+# ASYNC_MAX_IN_FLIGHT are awaited at once; the rest wait on the loop.
+PROVIDER_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", "300"))
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "1000"))
+
+# --- Rate Limits & Retries ---
+# Requests and (estimated) tokens per minute allowed per provider; 0 means no
+# limit. Set these to your account's quota so load is paced instead of throttled.
+PROVIDER_RATE_LIMITS = {
+    "gpt": {
+        "rpm": int(os.getenv("GPT_RPM", "500")),
+        "tpm": int(os.getenv("GPT_TPM", "200000")),
+    },
+    "claude": {
+        "rpm": int(os.getenv("CLAUDE_RPM", "50")),
+        "tpm": int(os.getenv("CLAUDE_TPM", "40000")),
+    },
+    "gemini": {
+        "rpm": int(os.getenv("GEMINI_RPM", "60")),
+        "tpm": int(os.getenv("GEMINI_TPM", "1000000")),
+    },
+}
+# Rate-limited and transient failures are retried with jittered exponential
+# backoff (or after the provider's Retry-After, if it sends one).
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "5"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+
+# --- Hedged Requests (SIMPLE mode) ---
+# If PRIMARY_MODEL has not answered by its learned HEDGE_PERCENTILE latency (or
+# HEDGE_DEFAULT_DELAY seconds per 1k tokens until HEDGE_MIN_SAMPLES responses
+# have been seen), the same request is also sent to HEDGE_SECONDARY_MODEL and
+# the first answer wins. Hedges may add at most HEDGE_MAX_EXTRA_SPEND (as a
+# fraction of primary tokens) to the bill.
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "False").upper() == "TRUE"
+HEDGE_SECONDARY_MODEL = os.getenv("HEDGE_SECONDARY_MODEL", "gpt").lower()
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "60"))
+HEDGE_MAX_EXTRA_SPEND = float(os.getenv("HEDGE_MAX_EXTRA_SPEND", "0.1"))
+
+# --- Pipelined Critique ---
+# In CRITIQUE mode, reviewers start on each translated chunk while the primary
+# model is still translating the rest, instead of waiting for the full document.
+CRITIQUE_PIPELINED = os.getenv("CRITIQUE_PIPELINED", "True").upper() == "TRUE"
+
+# --- Streaming Output ---
+# Provider responses are streamed and written to outputs/job_<id>_<service>.partial
+# every STREAM_FLUSH_INTERVAL seconds while a job runs. The partial file is
+# removed once the final output is written, and kept if the request fails.
+STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "True").upper() == "TRUE"
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "1.0"))
+
+# --- Provider HTTP Clients ---
+# One pooled, keep-alive client per provider is shared by all jobs. HTTP/2 is
+# used when the optional h2 package is installed.
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100"))
+PROVIDER_MAX_KEEPALIVE = int(os.getenv("PROVIDER_MAX_KEEPALIVE", "20"))
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "120"))
+PROVIDER_HTTP2 = os.getenv("PROVIDER_HTTP2", "True").upper() == "TRUE"
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+PROVIDER_READ_TIMEOUT = float(os.getenv("PROVIDER_READ_TIMEOUT", "120"))
+
+# --- Provider Endpoints ---
+# Base URL of each provider's API (unset = the public endpoint). MOCK_API_URL
+# points all three at the local mock server (python -m benchmarks.mock_api) so
+# the real client code can be load-tested without network access. Gemini is
+# then called over REST instead of gRPC.
+MOCK_API_URL = os.getenv("MOCK_API_URL", "").rstrip("/")
+PROVIDER_BASE_URLS = {
+    "gpt": os.getenv("GPT_BASE_URL") or (MOCK_API_URL and f"{MOCK_API_URL}/v1"),
+    "claude": os.getenv("CLAUDE_BASE_URL") or MOCK_API_URL,
+    "gemini": os.getenv("GEMINI_BASE_URL") or MOCK_API_URL,
+}
+
+# --- Translation Cache ---
+# Provider responses are cached on disk, keyed by a hash of the model, sampling
+# parameters and the fully rendered prompt, so resubmitted documents are free.
+TRANSLATION_CACHE_ENABLED = (
+    os.getenv("TRANSLATION_CACHE_ENABLED", "True").upper() == "TRUE"
+)
+TRANSLATION_CACHE_PATH = os.getenv(
+    "TRANSLATION_CACHE_PATH", "monitor/translation_cache.sqlite3"
+)
+TRANSLATION_CACHE_MAX_MB = int(os.getenv("TRANSLATION_CACHE_MAX_MB", "512"))
+TRANSLATION_CACHE_MAX_AGE_DAYS = float(
+    os.getenv("TRANSLATION_CACHE_MAX_AGE_DAYS", "30")
+)
+
+# --- Document Cache ---
+# Source documents are parsed once into segments (with their paragraph, shape
+# or cell locations) and cached as JSON keyed by the file's SHA-256.
+DOCUMENT_CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "True").upper() == "TRUE"
+DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", "monitor/document_cache")
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "500"))
+
+# Workbooks at least this large are read with read-only row streaming and
+# regenerated by streaming each worksheet's XML, writing translated cells as
+# inline strings, instead of loading them.
+XLSX_STREAMING_MIN_MB = float(os.getenv("XLSX_STREAMING_MIN_MB", "1"))
+
+# --- Document Workers ---
+# Parsing and regenerating documents is CPU-bound, so it runs in a pool of
+# worker processes (0 = inline in the job thread). A task that runs longer
+# than DOCUMENT_TASK_TIMEOUT seconds is killed and the job fails cleanly.
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", str(os.cpu_count() or 2)))
+DOCUMENT_TASK_TIMEOUT = float(os.getenv("DOCUMENT_TASK_TIMEOUT", "300"))
+
+# --- Segment Deduplication ---
+# Repeated segments (compared with whitespace collapsed) are sent to the
+# providers once per job and their translation is copied to every occurrence.
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "True").upper() == "TRUE"
+
+# --- Segment Pre-filter ---
+# Segments that need no translation (numbers, dates, IDs, codes, URLs, e-mail
+# addresses, formulas stored as text, or text already in the target language's
+# script) are classified locally and copied to the output unchanged.
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "True").upper() == "TRUE"
+# Segments that are exactly one of these acronyms are copied too. Other
+# all-caps words (OPEN, NAME, SALE) are translated.
+PREFILTER_ACRONYMS = [
+    acronym.strip()
+    for acronym in os.getenv(
+        "PREFILTER_ACRONYMS",
+        "N/A,TBD,TBC,USD,EUR,GBP,JPY,CNY,CHF,VAT,SKU,ISBN,PDF,URL,KG,CM,MM,KM",
+    ).split(",")
+    if acronym.strip()
+]
+
+# --- Translation Memory ---
+# Segment pairs from past jobs, per language pair and model. Matches scoring at
+# least TM_REUSE_THRESHOLD are filled locally; weaker matches down to
+# TM_HINT_THRESHOLD are given to the model as reference translations.
+TRANSLATION_MEMORY_ENABLED = (
+    os.getenv("TRANSLATION_MEMORY_ENABLED", "True").upper() == "TRUE"
+)
+TRANSLATION_MEMORY_PATH = os.getenv(
+    "TRANSLATION_MEMORY_PATH", "monitor/translation_memory.sqlite3"
+)
+TM_REUSE_THRESHOLD = float(os.getenv("TM_REUSE_THRESHOLD", "0.95"))
+TM_HINT_THRESHOLD = float(os.getenv("TM_HINT_THRESHOLD", "0.75"))
+TM_MAX_REFERENCES = int(os.getenv("TM_MAX_REFERENCES", "20"))
+
+# --- Chunking ---
+# Estimated input tokens per request. Documents larger than this are split at
+# paragraph/cell boundaries and the chunks are translated concurrently. Keep the
+# budgets well below each model's output limit so translations never truncate.
+DEFAULT_CHUNK_TOKEN_BUDGET = int(os.getenv("DEFAULT_CHUNK_TOKEN_BUDGET", "1500"))
+CHUNK_TOKEN_BUDGET = {
+    "gpt": int(os.getenv("GPT_CHUNK_TOKEN_BUDGET", "3000")),
+    "claude": int(os.getenv("CLAUDE_CHUNK_TOKEN_BUDGET", "2000")),
+    "gemini": int(os.getenv("GEMINI_CHUNK_TOKEN_BUDGET", "3000")),
+}
+# claude-3-5-sonnet-20240620 rejects more than 4096 output tokens.
+CLAUDE_MAX_TOKENS = int(os.getenv("CLAUDE_MAX_TOKENS", "4096"))
+# Short segments (cells, shapes) are packed into one tagged request, up to this
+# many per request; unparsed segments are re-requested up to BATCH_MAX_RETRIES times.
+BATCH_MAX_SEGMENTS = int(os.getenv("BATCH_MAX_SEGMENTS", "200"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "2"))
+
+# --- Job State ---
+# SQLite database holding every job's status and per-provider results. Replaces
+# monitor/processed_jobs.log and monitor/hotfolder_manifest.log (imported once).
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "monitor/jobs.sqlite3")
+
+# --- Metrics ---
+# Per-stage and per-provider latency histograms, token counts, estimated cost,
+# retries, errors, queue waits and bytes processed. They are served in the
+# Prometheus text format at http://METRICS_HOST:METRICS_PORT/metrics (port 0
+# turns the endpoint off) and appended to a JSONL file that is rolled over
+# at METRICS_JSONL_MAX_MB.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").upper() == "TRUE"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "monitor/metrics.jsonl")
+METRICS_JSONL_MAX_MB = float(os.getenv("METRICS_JSONL_MAX_MB", "50"))
+# US dollars per million input/output tokens, used for cost estimates.
+PROVIDER_COST_PER_MTOK = {
+    "gpt": {
+        "input": float(os.getenv("GPT_INPUT_COST_PER_MTOK", "0.15")),
+        "output": float(os.getenv("GPT_OUTPUT_COST_PER_MTOK", "0.60")),
+    },
+    "claude": {
+        "input": float(os.getenv("CLAUDE_INPUT_COST_PER_MTOK", "3")),
+        "output": float(os.getenv("CLAUDE_OUTPUT_COST_PER_MTOK", "15")),
+    },
+    "gemini": {
+        "input": float(os.getenv("GEMINI_INPUT_COST_PER_MTOK", "1.25")),
+        "output": float(os.getenv("GEMINI_OUTPUT_COST_PER_MTOK", "5")),
+    },
+}
@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import time
 import re
@@ -6,24 +5,47 @@ import threading
 import pyperclip
 import logging
 import importlib
+import functools
 import config
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 # --- Imports from our own project modules ---
-from fetchers.file_fetcher import get_text_from_file
+from fetchers.document_ir import SEGMENT_SEPARATOR, DocumentIR
+from fetchers.file_fetcher import read_document
 from translators.gpt_translator import translate_with_gpt, critique_with_gpt
 from translators.claude_translator import translate_with_claude, critique_with_claude
 from translators.gemini_translator import translate_with_gemini, critique_with_gemini
-from regenerators.docx_regenerator import create_docx_from_text
-from regenerators.pptx_regenerator import create_pptx_from_text
-from regenerators.xlsx_regenerator import create_xlsx_from_text
+from translators.async_engine import get_engine
+from translators.clients import get_clients
+from translators.errors import ProviderError
+from translators.scheduler import get_scheduler
+from regenerators import regenerate_all
+from regenerators.docx_regenerator import create_docx
+from regenerators.pptx_regenerator import create_pptx
+from regenerators.xlsx_regenerator import create_xlsx
+from pipeline.job_queue import JobQueue, ProviderLimiter
+from pipeline.chunking import estimate_tokens
+from pipeline.document_translator import translate_document
+from pipeline.critique_pipeline import CritiquePipeline
+from pipeline.dedup import DedupPlan
+from pipeline.prefilter import SegmentFilter
+from pipeline.metrics import get_metrics, start_metrics_server
+from pipeline.notifications import NotificationServer
+from pipeline.previews import write_preview
+from pipeline.process_pool import StageError, get_document_workers
+from pipeline.streaming import StreamProgress, partial_output_path
+from pipeline.hedging import HedgePolicy, LatencyTracker, hedged_call
+from pipeline import job_store as jobs
+from pipeline.job_store import JobStore
+from pipeline.feed_reader import FeedChangeHandler, FeedTailer
+from pipeline.handshake import HandshakeTable
 from config import (
     OPERATION_MODE,
     PRIMARY_MODEL,
     DEFAULT_SOURCE_LANGUAGE,
     DEFAULT_TARGET_LANGUAGE,
-    UI_RELOAD_SIGNAL_PATH,
 )
 
 # --- Get a logger instance ---
@@ -31,13 +53,41 @@ logger = logging.getLogger(__name__)
 
 # --- Configuration & State ---
 JOBS_FEED_CSV_PATH = "monitor/jobs_feed.csv"
+FEED_STATE_PATH = "monitor/.jobs_feed_state.json"
 PROCESSED_LOG_PATH = "monitor/processed_jobs.log"
 HOTFOLDER_MANIFEST_PATH = "monitor/hotfolder_manifest.log"
 UPLOADS_DIR = "uploads"
 OUTPUTS_DIR = "outputs"
 HANDSHAKE_WAIT_TIME = 30
 POLL_INTERVAL = 60
-active_handshake_jobs = set()
+STATS_LOG_INTERVAL = 60
+handshakes = HandshakeTable()
+active_csv_jobs = set()
+_job_store = None
+_job_store_lock = threading.Lock()
+_hotfolder_id_lock = threading.Lock()
+_last_hotfolder_id = 0
+
+# --- Bounded Concurrency ---
+# Jobs run on a fixed pool of workers; each job fans its provider calls out to a
+# shared executor, and every call holds one of its provider's concurrency slots.
+job_queue = JobQueue(config.JOB_WORKERS, config.JOB_QUEUE_SIZE)
+provider_limiter = ProviderLimiter(config.PROVIDER_MAX_CONCURRENCY)
+hedge_policy = HedgePolicy(
+    LatencyTracker(),
+    percentile=config.HEDGE_PERCENTILE,
+    min_samples=config.HEDGE_MIN_SAMPLES,
+    default_delay=config.HEDGE_DEFAULT_DELAY,
+    max_extra_spend=config.HEDGE_MAX_EXTRA_SPEND,
+)
+provider_executor = ThreadPoolExecutor(
+    max_workers=config.JOB_WORKERS * len(config.PROVIDER_MAX_CONCURRENCY),
+    thread_name_prefix="ProviderCall",
+)
+# Local Prometheus-format endpoint; started by start_metrics().
+metrics_server = None
+# Pushes job changes to the review UI; started by start_ui_notifier().
+ui_notifier = None
 
 
 # --- Helper Functions ---
@@ -51,16 +101,345 @@ def get_job_id_from_link(link: str) -> str | None:
     return match.group(1) if match else None
 
 
-def get_processed_jobs() -> set:
-    if not os.path.exists(PROCESSED_LOG_PATH):
-        return set()
-    with open(PROCESSED_LOG_PATH, "r", encoding="utf-8") as f:
-        return {line.strip() for line in f}
+def notify_ui(job_id: str, status: str):
+    """Tells connected review UIs that a job was registered or changed status."""
+    if ui_notifier:
+        ui_notifier.publish({"event": "job", "job_id": job_id, "status": status})
+
+
+def get_job_store() -> JobStore:
+    """
+    Returns the job-state database, opening it on first use.
+
+    The first open imports the legacy processed_jobs.log and hot folder manifest,
+    and jobs interrupted by a previous crash are reset so they run again.
+    """
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore(config.JOB_STORE_PATH, on_change=notify_ui)
+            _job_store.import_legacy_logs(
+                PROCESSED_LOG_PATH, HOTFOLDER_MANIFEST_PATH, get_job_id_from_link
+            )
+            _job_store.reset_interrupted()
+        return _job_store
+
+
+def record_translations(
+    job_id: str,
+    document: DocumentIR,
+    results: dict,
+    plan: DedupPlan | None = None,
+) -> int:
+    """
+    Saves the successful translations (one string per segment) among the
+    providers' results and records each provider's outcome for the job. With a
+    dedup plan, results translate plan.unique and are expanded first. Returns
+    the number of outputs saved.
+    """
+    store = get_job_store()
+    translations = {}
+    for service, result in results.items():
+        if isinstance(result, str):  # An "Error: ..." result
+            store.record_result(job_id, service, jobs.FAILED, error=result)
+            continue
+        if plan:
+            try:
+                result = plan.expand(result)
+            except ValueError as e:
+                logger.error(f"[Job {job_id}] {service.capitalize()}: {e}")
+                store.record_result(
+                    job_id, service, jobs.FAILED, error=f"Error: {e}"
+                )
+                continue
+        translations[service] = result
+    output_paths = save_translation_outputs(document, translations, job_id)
+    for service, output_path in output_paths.items():
+        if output_path is None:
+            store.record_result(
+                job_id, service, jobs.FAILED, error="Regeneration failed."
+            )
+        else:
+            store.record_result(
+                job_id, service, jobs.COMPLETED, output_path=output_path
+            )
+    return sum(path is not None for path in output_paths.values())
+
+
+def plan_dedup(
+    job_id: str,
+    document: DocumentIR,
+    providers: int,
+    source_lang: str | None = None,
+    target_lang: str | None = None,
+):
+    """
+    Returns the job's DedupPlan (None if dedup and the pre-filter are both off)
+    and records how many segments and input tokens it saves across the given
+    number of providers, including those skipped as non-translatable.
+    """
+    if not (config.DEDUP_ENABLED or config.PREFILTER_ENABLED):
+        return None
+    segment_filter = (
+        SegmentFilter(source_lang, target_lang, config.PREFILTER_ACRONYMS)
+        if config.PREFILTER_ENABLED
+        else None
+    )
+    plan = DedupPlan(
+        [segment.text for segment in document.segments],
+        passthrough=segment_filter.passthrough if segment_filter else None,
+        dedupe=config.DEDUP_ENABLED,
+    )
+    report = plan.report()
+    report["tokens_saved"] *= providers
+    report["passthrough_tokens"] *= providers
+    get_job_store().record_dedup(job_id, report)
+    if report["passthrough_segments"]:
+        logger.info(
+            f"[Job {job_id}] Pre-filter: {report['passthrough_segments']}/{report['segments']} "
+            f"segments copied without translation, "
+            f"skipping ~{report['passthrough_tokens']} input tokens across {providers} provider(s)."
+        )
+    dispatched = report["segments"] - report["passthrough_segments"]
+    if report["unique_segments"] < dispatched:
+        logger.info(
+            f"[Job {job_id}] Dedup: {report['unique_segments']}/{dispatched} "
+            f"segments are unique ({report['duplicate_ratio']:.0%} duplicates), "
+            f"saving ~{report['tokens_saved']} input tokens across {providers} provider(s)."
+        )
+    return plan
+
+
+def final_status(success_count: int, total: int) -> str:
+    if success_count == total:
+        return jobs.COMPLETED
+    return jobs.PARTIAL if success_count else jobs.FAILED
 
 
-def log_processed_job(job_link: str):
-    with open(PROCESSED_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(job_link + "\n")
+def new_hotfolder_job_id() -> str:
+    """Returns a timestamp-based job ID that is unique even for simultaneous drops."""
+    global _last_hotfolder_id
+    with _hotfolder_id_lock:
+        _last_hotfolder_id = max(int(time.time()), _last_hotfolder_id + 1)
+        return f"hotfolder_{_last_hotfolder_id}"
+
+
+def document_translator(service: str, func, job_id: str = None):
+    """
+    Wraps a provider's translate function with the segment-level pipeline.
+
+    The pipeline chunks the document and acquires the provider's concurrency
+    slot for each request it makes. With a job_id, responses are streamed to
+    a .partial file as they arrive.
+    """
+    return functools.partial(translate_document_for, service, func, job_id=job_id)
+
+
+def stream_progress(job_id: str, service: str):
+    """Returns a started StreamProgress for the job, or None if streaming is off."""
+    if not (config.STREAMING_ENABLED and job_id):
+        return None
+    os.makedirs(OUTPUTS_DIR, exist_ok=True)
+    return StreamProgress(
+        job_id,
+        service,
+        partial_output_path(OUTPUTS_DIR, job_id, service),
+        store=get_job_store(),
+        flush_interval=config.STREAM_FLUSH_INTERVAL,
+    ).start()
+
+
+def translate_document_for(
+    service: str, func, *args, job_id: str = None, on_chunk=None, cancel=None
+) -> list | str:
+    progress = stream_progress(job_id, service)
+    result = None
+    try:
+        result = translate_document(
+            service,
+            func,
+            *args,
+            limiter=provider_limiter,
+            progress=progress,
+            on_chunk=on_chunk,
+            cancel=cancel,
+        )
+        return result
+    except ProviderError as e:
+        result = provider_error_result(service, e)
+        return result
+    finally:
+        if progress:
+            # A failed run keeps what arrived so far for inspection; a hedge
+            # that lost the race does not.
+            failed = not isinstance(result, list)
+            progress.close(keep_partial=failed and not (cancel and cancel.cancelled))
+
+
+def limited(service: str, func, job_id: str = None):
+    """Wraps a provider function so each call holds one of its concurrency slots."""
+    return functools.partial(call_provider, service, func, job_id=job_id)
+
+
+def call_provider(service: str, func, *args, job_id: str = None, on_text=None) -> str:
+    """Calls a provider function while holding one of its concurrency slots."""
+    # A caller that streams the output itself passes on_text.
+    progress = None if on_text else stream_progress(job_id, f"{service}_critique")
+    if progress:
+        on_text = progress.sink(0)
+    extra = {"on_text": on_text} if on_text else {}
+    result = None
+    try:
+        with provider_limiter.slot(service):
+            result = func(*args, **extra)
+        return result
+    except ProviderError as e:
+        result = provider_error_result(service, e)
+        return result
+    finally:
+        if progress:
+            progress.close(keep_partial=not result or result.startswith("Error:"))
+
+
+def provider_error_result(service: str, error: ProviderError) -> str:
+    """
+    Logs a failed provider call and turns it into the "Error: ..." result string
+    recorded for the job; the error kind tells a rate limit from a bad request.
+    """
+    logger.error(f"{service.capitalize()} request failed [{error.kind}]: {error}")
+    return f"Error: {error}"
+
+
+def critique_pipelined(
+    job_id: str, models: dict, segments: list, target_lang: str, source_lang: str
+) -> tuple:
+    """
+    Translates segments with PRIMARY_MODEL while the other models review each
+    chunk as soon as it is translated. Returns (primary translation, {service:
+    critique}); the critiques are empty if the translation failed.
+    """
+    reviewers = {
+        name: funcs["critique"]
+        for name, funcs in models.items()
+        if name != PRIMARY_MODEL
+    }
+    progress = {name: stream_progress(job_id, f"{name}_critique") for name in reviewers}
+    progress = {name: stream for name, stream in progress.items() if stream}
+    pipeline = CritiquePipeline(
+        provider_executor, reviewers, target_lang, source_lang, progress
+    )
+    critiques = {}
+    try:
+        translation = models[PRIMARY_MODEL]["translate"](
+            segments, target_lang, source_lang, on_chunk=pipeline.add
+        )
+        if isinstance(translation, str):  # An "Error: ..." result
+            return translation, critiques
+        if not len(pipeline):
+            # No chunk went to the provider (e.g. every segment came from the
+            # translation memory), so the whole document is reviewed at once.
+            pipeline.add(
+                0,
+                SEGMENT_SEPARATOR.join(segments),
+                SEGMENT_SEPARATOR.join(translation),
+            )
+        logger.info(
+            f"[Job {job_id}] Primary translation complete. "
+            f"Waiting for reviews of {len(pipeline)} chunk(s)..."
+        )
+        critiques = pipeline.results()
+        return translation, critiques
+    finally:
+        pipeline.cancel()  # Reviews not yet started if the translation failed
+        for name, stream in progress.items():
+            stream.close(keep_partial=critiques.get(name, "").startswith("Error:"))
+
+
+def run_provider_calls(funcs: dict, *args) -> dict:
+    """Runs func(*args) for every service concurrently and returns their results."""
+    futures = {
+        service: provider_executor.submit(func, *args)
+        for service, func in funcs.items()
+    }
+    results = {}
+    for service, future in futures.items():
+        try:
+            results[service] = future.result()
+        except Exception as e:
+            logger.error(f"{service.capitalize()} call raised an exception: {e}")
+            results[service] = f"Error: {service} call raised an exception. {e}"
+    return results
+
+
+def translate_simple(translate_funcs: dict, *args) -> tuple:
+    """
+    Translates with PRIMARY_MODEL, hedging with HEDGE_SECONDARY_MODEL when
+    enabled. Returns (service, translation).
+    """
+    secondary = config.HEDGE_SECONDARY_MODEL
+    if not config.HEDGING_ENABLED or secondary == PRIMARY_MODEL:
+        return PRIMARY_MODEL, translate_funcs[PRIMARY_MODEL](*args)
+    return hedged_call(
+        hedge_policy,
+        provider_executor,
+        translate_funcs,
+        PRIMARY_MODEL,
+        secondary,
+        sum(map(estimate_tokens, args[0])),
+        *args,
+    )
+
+
+def get_concurrency_stats() -> dict:
+    """Returns job queue and per-provider concurrency statistics."""
+    return {
+        "jobs": job_queue.stats(),
+        "providers": provider_limiter.stats(),
+        "requests": get_engine().stats(),
+        "connections": get_clients().connection_stats(),
+        "rate_limits": get_scheduler().stats(),
+        "hedging": hedge_policy.stats(),
+        "document_stages": get_document_workers().stats(),
+    }
+
+
+def log_concurrency_stats():
+    stats = job_queue.stats()
+    logger.info(
+        f"Job queue: depth={stats['queue_depth']}, busy={stats['busy_workers']}/{stats['workers']}, "
+        f"completed={stats['completed']}, failed={stats['failed']}, "
+        f"avg_wait={stats['avg_wait_seconds']:.1f}s, utilisation={stats['utilisation']:.0%}"
+    )
+    requests = get_engine().stats()
+    logger.info(
+        f"Provider requests: in_flight={requests['in_flight']}, waiting={requests['waiting']}, "
+        f"completed={requests['completed']}, failed={requests['failed']}, "
+        f"timed_out={requests['timed_out']}"
+    )
+    for service, connections in get_clients().connection_stats().items():
+        if connections["requests"] and connections["new_connections"] is None:
+            logger.info(
+                f"{service.capitalize()} connections: requests={connections['requests']} "
+                "(connection reuse is not measured)"
+            )
+        elif connections["requests"]:
+            logger.info(
+                f"{service.capitalize()} connections: requests={connections['requests']}, "
+                f"new={connections['new_connections']}, reused={connections['reused_connections']}, "
+                f"tls_handshakes={connections['tls_handshakes']}"
+            )
+    for service, limits in get_scheduler().stats().items():
+        logger.info(
+            f"{service.capitalize()} rate limits: requests={limits['requests']}, "
+            f"retries={limits['retries']}, rate_limited={limits['rate_limited']}, "
+            f"failed={limits['failed']}, throttled={limits['throttled_seconds']:.1f}s"
+        )
+    for stage, stats in get_document_workers().stats().items():
+        logger.info(
+            f"Document {stage}: tasks={stats['tasks']}, cpu={stats['cpu_seconds']:.1f}s, "
+            f"wall={stats['wall_seconds']:.1f}s, timeouts={stats['timeouts']}, "
+            f"crashes={stats['crashes']}"
+        )
 
 
 def find_job_file(job_id: str) -> str | None:
@@ -72,96 +451,207 @@ def find_job_file(job_id: str) -> str | None:
     return None
 
 
-def save_translation_output(
-    source_filepath: str, service: str, result: str, job_id: str | None = None
-):
-    """A helper function to handle saving files in various formats."""
+def run_document_stage(job_id: str | None, stage: str, func, *args):
+    """
+    Runs a CPU-bound document stage in the worker pool and records its CPU and
+    wall time for the job. Raises StageError if the worker timed out or crashed.
+    """
+    result, cpu_seconds, wall_seconds = get_document_workers().run(stage, func, *args)
+    get_metrics().observe(
+        "translator_stage_seconds", wall_seconds, job_id=job_id, stage=stage
+    )
+    if job_id:
+        get_job_store().add_stage_time(job_id, stage, cpu_seconds, wall_seconds)
+    return result
+
+
+def count_bytes(job_id: str | None, stage: str, path: str):
+    """Adds the size of a file read or written by a stage to the metrics."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    get_metrics().inc(
+        "translator_bytes_processed_total", size, job_id=job_id, stage=stage
+    )
+
+
+def read_source(job_id: str, source_filepath: str) -> tuple:
+    """Parses a job's source file in the worker pool; see read_document()."""
+    try:
+        result = run_document_stage(job_id, "parse", read_document, source_filepath)
+        count_bytes(job_id, "parse", source_filepath)
+        return result
+    except StageError as e:
+        return None, f"Error: Could not read file. {e}"
+
+
+def save_translation_outputs(
+    document: DocumentIR, translations: dict, job_id: str | None = None
+) -> dict:
+    """
+    A helper function to handle saving files in various formats, given each
+    provider's translation (one string per segment). Office documents are
+    regenerated in a single worker task, so the original is loaded once for
+    all providers. Returns {service: output path, or None if the document
+    could not be regenerated}.
+    """
+    source_filepath = document.source_path
     base_name = os.path.splitext(os.path.basename(source_filepath))[0]
     if job_id:
         base_name = f"job_{job_id}"
     original_extension = os.path.splitext(source_filepath)[1]
     REGENERATORS = {
-        ".docx": create_docx_from_text,
-        ".pptx": create_pptx_from_text,
-        ".xlsx": create_xlsx_from_text,
+        ".docx": create_docx,
+        ".pptx": create_pptx,
+        ".xlsx": create_xlsx,
     }
-    regenerator_func = REGENERATORS.get(original_extension)
-    if regenerator_func:
+    regenerator_func = REGENERATORS.get(document.file_type)
+    paths = {}
+    if not regenerator_func:
+        for service, result in translations.items():
+            output_filename = f"{base_name}_{service}.txt"
+            write_output(
+                job_id,
+                os.path.join(OUTPUTS_DIR, output_filename),
+                SEGMENT_SEPARATOR.join(result),
+            )
+            logger.info(
+                f"-> [{base_name}] {service.capitalize()} translation saved to {output_filename}"
+            )
+            paths[service] = os.path.join(OUTPUTS_DIR, output_filename)
+        return paths
+
+    outputs = {}
+    for service, result in translations.items():
         output_filename = f"{base_name}_{service}{original_extension}"
-        status = regenerator_func(
-            source_filepath, result, os.path.join(OUTPUTS_DIR, output_filename)
+        try:
+            outputs[service] = (
+                document.align(result),
+                os.path.join(OUTPUTS_DIR, output_filename),
+            )
+        except ValueError as e:
+            logger.error(f"[{base_name}] {service.capitalize()}: {e}")
+            paths[service] = None
+    if not outputs:
+        return paths
+    try:
+        statuses = run_document_stage(
+            job_id,
+            "regenerate",
+            regenerate_all,
+            regenerator_func,
+            document,
+            list(outputs.values()),
         )
+    except StageError as e:
+        statuses = [f"Error: {e}"] * len(outputs)
+    for (service, (aligned, output_path)), status in zip(outputs.items(), statuses):
         if status.startswith("Error:"):
             logger.error(f"[{base_name}] {service.capitalize()}: {status}")
-        else:
-            logger.info(
-                f"-> [{base_name}] {service.capitalize()} translation regenerated to {output_filename}"
+            paths[service] = None
+            continue
+        count_bytes(job_id, "regenerate", output_path)
+        try:
+            write_preview(
+                output_path, SEGMENT_SEPARATOR.join(aligned), config.PREVIEW_DIR
             )
-    else:
-        output_filename = f"{base_name}_{service}.txt"
-        with open(
-            os.path.join(OUTPUTS_DIR, output_filename), "w", encoding="utf-8"
-        ) as f:
-            f.write(result)
+        except OSError as e:
+            logger.warning(f"[{base_name}] Could not write preview: {e}")
         logger.info(
-            f"-> [{base_name}] {service.capitalize()} translation saved to {output_filename}"
+            f"-> [{base_name}] {service.capitalize()} translation regenerated to {os.path.basename(output_path)}"
         )
+        paths[service] = output_path
+    return paths
+
+
+def write_output(job_id: str | None, path: str, text: str):
+    """Writes a text output file, recording the write time and size in the metrics."""
+    started = time.monotonic()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    get_metrics().observe(
+        "translator_stage_seconds",
+        time.monotonic() - started,
+        job_id=job_id,
+        stage="write",
+    )
+    count_bytes(job_id, "write", path)
 
 
 # --- Core Processing Logic ---
-def process_csv_job(job: pd.Series, source_filepath: str):
+def process_csv_job(job: dict, source_filepath: str):
     """Orchestrates the full translation workflow for a job from the CSV."""
     job_id = get_job_id_from_link(job["link"])
     logger.info(f"[Job {job_id}] Found source file: {source_filepath}")
-    source_text = get_text_from_file(source_filepath)
     source_lang, target_lang = parse_languages(job["title"])
+    store = get_job_store()
+    store.register_job(
+        job_id,
+        "csv",
+        link=job["link"],
+        source_path=source_filepath,
+        source_language=source_lang,
+        target_language=target_lang,
+        status=jobs.PROCESSING,
+    )
+    document, source_text = read_source(job_id, source_filepath)
+    if document is None:
+        logger.error(f"[Job {job_id}] Could not read file: {source_text}")
+        store.transition(job_id, jobs.FAILED)
+        return
+    status = jobs.FAILED
     models = {
-        "gpt": {"translate": translate_with_gpt, "critique": critique_with_gpt},
+        "gpt": {
+            "translate": document_translator("gpt", translate_with_gpt, job_id),
+            "critique": limited("gpt", critique_with_gpt, job_id),
+        },
         "claude": {
-            "translate": translate_with_claude,
-            "critique": critique_with_claude,
+            "translate": document_translator("claude", translate_with_claude, job_id),
+            "critique": limited("claude", critique_with_claude, job_id),
         },
         "gemini": {
-            "translate": translate_with_gemini,
-            "critique": critique_with_gemini,
+            "translate": document_translator("gemini", translate_with_gemini, job_id),
+            "critique": limited("gemini", critique_with_gemini, job_id),
         },
     }
+    # Providers see each distinct translatable segment once; results are
+    # expanded on save, with pass-through segments copied as they are.
+    plan = plan_dedup(
+        job_id,
+        document,
+        1 if OPERATION_MODE == "SIMPLE" else len(models),
+        source_lang,
+        target_lang,
+    )
+    segments = plan.unique if plan else document.texts()
 
     if OPERATION_MODE == "SIMPLE":
         logger.info(
             f"[Job {job_id}] Running SIMPLE translation with {PRIMARY_MODEL}..."
         )
-        translation = models[PRIMARY_MODEL]["translate"](
-            source_text, target_lang, source_lang
+        service, translation = translate_simple(
+            {name: funcs["translate"] for name, funcs in models.items()},
+            segments,
+            target_lang,
+            source_lang,
         )
-        if not translation.startswith("Error:"):
-            save_translation_output(source_filepath, PRIMARY_MODEL, translation, job_id)
+        if record_translations(job_id, document, {service: translation}, plan):
+            status = jobs.COMPLETED
             logger.info(f"[Job {job_id}] Processing complete. 1/1 task succeeded.")
         else:
             logger.error(f"[Job {job_id}] Processing failed. 0/1 task succeeded.")
 
     elif OPERATION_MODE == "PARALLEL":
         logger.info(f"[Job {job_id}] Running PARALLEL translation...")
-        translations = {}
-        threads = []
-
-        def run_translation(service, func):
-            translations[service] = func(source_text, target_lang, source_lang)
-
-        for name, funcs in models.items():
-            thread = threading.Thread(
-                target=run_translation, args=(name, funcs["translate"])
-            )
-            threads.append(thread)
-            thread.start()
-        for thread in threads:
-            thread.join()
-        success_count = sum(
-            1 for r in translations.values() if not r.startswith("Error:")
+        translations = run_provider_calls(
+            {name: funcs["translate"] for name, funcs in models.items()},
+            segments,
+            target_lang,
+            source_lang,
         )
-        for service, result in translations.items():
-            if not result.startswith("Error:"):
-                save_translation_output(source_filepath, service, result, job_id)
+        success_count = record_translations(job_id, document, translations, plan)
+        status = final_status(success_count, len(models))
         if success_count == len(models):
             logger.info(
                 f"[Job {job_id}] Processing complete. All {len(models)} translations succeeded."
@@ -175,106 +665,132 @@ def process_csv_job(job: pd.Series, source_filepath: str):
         logger.info(
             f"[Job {job_id}] Running CRITIQUE with primary model {PRIMARY_MODEL}..."
         )
-        primary_translation = models[PRIMARY_MODEL]["translate"](
-            source_text, target_lang, source_lang
-        )
-        if primary_translation.startswith("Error:"):
+        reviewer_models = {k: v for k, v in models.items() if k != PRIMARY_MODEL}
+        critiques = None
+        if config.CRITIQUE_PIPELINED:
+            primary_translation, critiques = critique_pipelined(
+                job_id, models, segments, target_lang, source_lang
+            )
+        else:
+            primary_translation = models[PRIMARY_MODEL]["translate"](
+                segments, target_lang, source_lang
+            )
+        if isinstance(primary_translation, str):  # An "Error: ..." result
+            store.record_result(
+                job_id, PRIMARY_MODEL, jobs.FAILED, error=primary_translation
+            )
             logger.error(
                 f"[Job {job_id}] Primary translation failed. Aborting critique."
             )
         else:
-            logger.info(
-                f"[Job {job_id}] Primary translation complete. Generating critiques..."
-            )
-            critiques = {}
-            threads = []
-            reviewer_models = {k: v for k, v in models.items() if k != PRIMARY_MODEL}
-
-            def run_critique(service, func):
-                critiques[service] = func(
-                    source_text, primary_translation, target_lang, source_lang
+            # Reviewers and the report read the segments as one text.
+            source_text = SEGMENT_SEPARATOR.join(segments)
+            primary_translation = SEGMENT_SEPARATOR.join(primary_translation)
+            if critiques is None:
+                logger.info(
+                    f"[Job {job_id}] Primary translation complete. Generating critiques..."
                 )
-
-            for name, funcs in reviewer_models.items():
-                thread = threading.Thread(
-                    target=run_critique, args=(name, funcs["critique"])
+                critiques = run_provider_calls(
+                    {
+                        name: funcs["critique"]
+                        for name, funcs in reviewer_models.items()
+                    },
+                    source_text,
+                    primary_translation,
+                    target_lang,
+                    source_lang,
                 )
-                threads.append(thread)
-                thread.start()
-            for thread in threads:
-                thread.join()
             success_count = sum(
                 1 for c in critiques.values() if not c.startswith("Error:")
             )
             final_report = f"--- SOURCE TEXT ---\n{source_text}\n\n--- PRIMARY TRANSLATION ({PRIMARY_MODEL.upper()}) ---\n{primary_translation}\n\n"
             for service, critique_text in critiques.items():
                 final_report += f"--- CRITIQUE & REFINEMENT ({service.upper()}) ---\n{critique_text}\n\n"
-            with open(
-                os.path.join(OUTPUTS_DIR, f"job_{job_id}_CRITIQUE_REPORT.md"),
-                "w",
-                encoding="utf-8",
-            ) as f:
-                f.write(final_report)
+            report_path = os.path.join(OUTPUTS_DIR, f"job_{job_id}_CRITIQUE_REPORT.md")
+            write_output(job_id, report_path, final_report)
+            store.record_result(
+                job_id, PRIMARY_MODEL, jobs.COMPLETED, output_path=report_path
+            )
+            for service, critique_text in critiques.items():
+                failed = critique_text.startswith("Error:")
+                store.record_result(
+                    job_id,
+                    f"{service}_critique",
+                    jobs.FAILED if failed else jobs.COMPLETED,
+                    output_path=None if failed else report_path,
+                    error=critique_text if failed else None,
+                )
+            status = final_status(success_count, len(reviewer_models))
             logger.info(
                 f"[Job {job_id}] Critique report generated with {success_count}/{len(reviewer_models)} successful reviews."
             )
 
-    log_processed_job(job["link"])
-    logger.info(f"[Job {job_id}] Finished & Logged.")
-
-    with open(UI_RELOAD_SIGNAL_PATH, "w") as f:
-        pass
+    store.transition(job_id, status)
+    logger.info(f"[Job {job_id}] Finished & Logged ({status}).")
 
 
-def process_hot_folder_job(source_filepath: str):
-    """Orchestrates the translation workflow for a file from the hot folder."""
+def process_hot_folder_job(source_filepath: str, job_id: str | None = None):
+    """
+    Orchestrates the translation workflow for a file from the hot folder. A
+    job_id is given when an interrupted job is resumed.
+    """
     filename = os.path.basename(source_filepath)
 
-    job_id = f"hotfolder_{int(time.time())}"
-    logger.info(
-        f"Hot Folder: Detected ad-hoc file '{filename}', assigning Job ID: {job_id}"
-    )
-
-    with open(HOTFOLDER_MANIFEST_PATH, "a", encoding="utf-8") as f:
-        f.write(f"{job_id},{source_filepath}\n")
+    if job_id is None:
+        job_id = new_hotfolder_job_id()
+        logger.info(
+            f"Hot Folder: Detected ad-hoc file '{filename}', assigning Job ID: {job_id}"
+        )
 
     source_lang, target_lang = DEFAULT_SOURCE_LANGUAGE, DEFAULT_TARGET_LANGUAGE
     if "_to_" in os.path.splitext(filename)[0]:
         target_lang = os.path.splitext(filename)[0].split("_to_")[-1]
 
+    store = get_job_store()
+    store.register_job(
+        job_id,
+        "hotfolder",
+        source_path=source_filepath,
+        source_language=source_lang,
+        target_language=target_lang,
+        status=jobs.PROCESSING,
+    )
+    try:
+        translate_hot_folder_job(job_id, source_filepath, source_lang, target_lang)
+    except Exception as e:
+        # Re-raised so the job queue logs the traceback and counts the failure.
+        logger.error(f"Hot Folder Job [{job_id}]: Failed with an unexpected error: {e}")
+        store.transition(job_id, jobs.FAILED)
+        raise
+
+
+def translate_hot_folder_job(
+    job_id: str, source_filepath: str, source_lang: str, target_lang: str
+):
+    """Reads, translates and regenerates a registered hot folder job."""
+    store = get_job_store()
     logger.info(
         f"Hot Folder Job [{job_id}]: Translating from '{source_lang}' to '{target_lang}' (PARALLEL mode)..."
     )
-    source_text = get_text_from_file(source_filepath)
-    if source_text.startswith("Error:"):
+    document, source_text = read_source(job_id, source_filepath)
+    if document is None:
         logger.error(f"Hot Folder Job [{job_id}]: Could not read file: {source_text}")
+        store.transition(job_id, jobs.FAILED)
         return
 
     models = {
-        "gpt": translate_with_gpt,
-        "claude": translate_with_claude,
-        "gemini": translate_with_gemini,
+        "gpt": document_translator("gpt", translate_with_gpt, job_id),
+        "claude": document_translator("claude", translate_with_claude, job_id),
+        "gemini": document_translator("gemini", translate_with_gemini, job_id),
     }
-    translations = {}
-    threads = []
-
-    def run_translation(service, func):
-        translations[service] = func(source_text, target_lang, source_lang)
+    plan = plan_dedup(job_id, document, len(models), source_lang, target_lang)
+    segments = plan.unique if plan else document.texts()
+    translations = run_provider_calls(models, segments, target_lang, source_lang)
 
-    for name, func in models.items():
-        thread = threading.Thread(target=run_translation, args=(name, func))
-        threads.append(thread)
-        thread.start()
-    for thread in threads:
-        thread.join()
-
-    success_count = 0
-    for service, result in translations.items():
-        if not result.startswith("Error:"):
-            save_translation_output(source_filepath, service, result, job_id=job_id)
-            success_count += 1
+    success_count = record_translations(job_id, document, translations, plan)
 
     total_tasks = len(models)
+    store.transition(job_id, final_status(success_count, total_tasks))
     if success_count == total_tasks:
         logger.info(
             f"Hot Folder Job [{job_id}]: Processing complete. All {total_tasks} succeeded."
@@ -288,80 +804,266 @@ def process_hot_folder_job(source_filepath: str):
             f"Hot Folder Job [{job_id}]: All {total_tasks} translations failed."
         )
 
-    with open(UI_RELOAD_SIGNAL_PATH, "w") as f:
-        pass
+
+def resume_hot_folder_jobs() -> int:
+    """
+    Resubmits hot folder jobs that a previous run left unfinished. They were
+    reset to pending, but hot folder files are only picked up when they
+    arrive, so nothing else would run them. A job whose file is gone is marked
+    failed. Returns the number of jobs resubmitted.
+    """
+    store = get_job_store()
+    resumed = 0
+    for job in store.jobs_with_status(jobs.PENDING, kind="hotfolder"):
+        source_filepath = job["source_path"]
+        if source_filepath and os.path.exists(source_filepath):
+            logger.info(
+                f"Hot Folder Job [{job['job_id']}]: Resuming interrupted job for "
+                f"'{os.path.basename(source_filepath)}'."
+            )
+            job_queue.submit(process_hot_folder_job, source_filepath, job["job_id"])
+            resumed += 1
+        else:
+            logger.warning(
+                f"Hot Folder Job [{job['job_id']}]: Source file is gone, marking failed."
+            )
+            store.transition(job["job_id"], jobs.FAILED)
+    return resumed
+
+
+def run_queued_csv_job(job: dict, source_filepath: str):
+    """Runs a queued CSV job, marking it failed if processing raises."""
+    job_id = get_job_id_from_link(job["link"])
+    try:
+        process_csv_job(job, source_filepath)
+    except Exception:
+        get_job_store().transition(job_id, jobs.FAILED)
+        raise
+    finally:
+        active_csv_jobs.discard(job_id)
+
+
+def start_metrics():
+    """
+    Attaches the rolling JSONL metrics file and starts the local metrics
+    endpoint, unless metrics (or the endpoint's port) are turned off.
+    """
+    global metrics_server
+    if not config.METRICS_ENABLED or metrics_server:
+        return
+    if config.METRICS_JSONL_PATH:
+        get_metrics().open_jsonl(
+            config.METRICS_JSONL_PATH, int(config.METRICS_JSONL_MAX_MB * 1024 * 1024)
+        )
+    if not config.METRICS_PORT:
+        return
+    try:
+        metrics_server = start_metrics_server(
+            get_metrics(), config.METRICS_PORT, config.METRICS_HOST
+        )
+    except OSError as e:
+        logger.error(f"Could not start the metrics endpoint: {e}")
+        return
+    logger.info(
+        f"Metrics available at http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics"
+    )
+
+
+def start_ui_notifier():
+    """Starts the socket the review UI listens on for job changes, unless its port is 0."""
+    global ui_notifier
+    if not config.UI_NOTIFY_PORT or ui_notifier:
+        return
+    try:
+        ui_notifier = NotificationServer(config.UI_NOTIFY_HOST, config.UI_NOTIFY_PORT)
+    except OSError as e:
+        logger.error(f"Could not start the UI notification socket: {e}")
+        return
+    logger.info(
+        f"Pushing job updates to the UI on {config.UI_NOTIFY_HOST}:{config.UI_NOTIFY_PORT}"
+    )
+
+
+def shutdown_job_queue():
+    """Waits for queued jobs to finish and stops the job workers."""
+    logger.info(f"Draining job queue ({job_queue.stats()['queue_depth']} queued)...")
+    job_queue.shutdown(wait=True)
+    provider_executor.shutdown(wait=True)
+    get_engine().shutdown()
+    get_document_workers().shutdown()
+    if metrics_server:
+        metrics_server.shutdown()
+    if ui_notifier:
+        ui_notifier.close()
+    get_metrics().close()
+
+
+def reload_config_if_signalled():
+    """Reloads config from .env when the UI has dropped the reload signal file."""
+    if not os.path.exists(config.CONFIG_RELOAD_SIGNAL_PATH):
+        return
+    try:
+        # Reload the config module to pick up changes from .env
+        importlib.reload(config)
+        # Re-apply dummy mode if it was changed
+        # (This is a simplified approach; a more complex app might use a class)
+        if config.DUMMY_MODE:
+            # Logic to re-patch functions if needed
+            pass
+        os.remove(config.CONFIG_RELOAD_SIGNAL_PATH)
+        logger.warning("Configuration reloaded due to signal from UI.")
+        # Log the new state
+        logger.info(f"New Operation Mode: {config.OPERATION_MODE}")
+        logger.info(f"New Primary Model: {config.PRIMARY_MODEL}")
+    except Exception as e:
+        logger.error(f"Failed to reload configuration: {e}")
+
+
+def ingest_feed_rows(tailer: FeedTailer) -> int:
+    """
+    Registers rows appended to the feed as pending jobs and returns how many.
+    The feed offset is only saved once every row is registered.
+    """
+    store = get_job_store()
+    new_count = 0
+    for row in tailer.read_new_rows():
+        link, title = row.get("link"), row.get("title")
+        if not link or title is None:
+            logger.error(f"CSV format issue in '{JOBS_FEED_CSV_PATH}': {row}")
+            continue
+        job_id = get_job_id_from_link(link)
+        if not job_id or store.is_known(link):
+            continue
+        store.register_job(job_id, "csv", link=link, title=title)
+        new_count += 1
+    tailer.commit()
+    return new_count
+
+
+def wait_for_feed_change(
+    stop_event: threading.Event, feed_changed: threading.Event, timeout: float
+):
+    """Waits until the feed changes, the worker is stopped, or timeout elapses."""
+    deadline = time.monotonic() + timeout
+    while not stop_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if feed_changed.wait(min(1, remaining)):
+            feed_changed.clear()
+            return
+
+
+def start_handshake(job: dict):
+    """Adds a pending CSV job to the handshake table and prompts for its file."""
+    job_id = job["job_id"]
+    if not handshakes.add(job_id, job, HANDSHAKE_WAIT_TIME):
+        return
+    logger.info(f"[Job {job_id}] New job found. Prompting for manual action.")
+    pyperclip.copy(job_id)
+    logger.info(f"[Job {job_id}] Copied ID to clipboard.")
+    # The file may already be there (e.g. after a restart).
+    source_filepath = find_job_file(job_id)
+    if source_filepath:
+        resolve_handshake(job_id, source_filepath)
+
+
+def resolve_handshake(job_id: str, source_filepath: str) -> bool:
+    """Queues a pending CSV job now that its file has arrived."""
+    job = handshakes.resolve(job_id)
+    if job is None:
+        return False
+    return queue_csv_job(job, source_filepath)
+
+
+def queue_csv_job(job: dict, source_filepath: str) -> bool:
+    """
+    Queues a pending CSV job. The job is claimed by moving it from PENDING to
+    QUEUED, so a thread that started a second handshake for it before the
+    move (the CSV worker still saw it pending) does not submit it again.
+    Returns False if the job was no longer pending.
+    """
+    job_id = job["job_id"]
+    store = get_job_store()
+    try:
+        store.transition(job_id, jobs.QUEUED, from_statuses=(jobs.PENDING,))
+    except jobs.InvalidTransition:
+        logger.debug(f"[Job {job_id}] Already queued or finished; not queued again.")
+        return False
+    active_csv_jobs.add(job_id)
+    logger.info(f"[Job {job_id}] File '{os.path.basename(source_filepath)}' received.")
+    store.register_job(
+        job_id,
+        "csv",
+        link=job["link"],
+        source_path=source_filepath,
+        status=jobs.QUEUED,
+    )
+    job_queue.submit(run_queued_csv_job, job, source_filepath)
+    return True
+
+
+def expire_handshakes():
+    """Rejects pending CSV jobs whose file did not arrive before their deadline."""
+    for job_id, job in handshakes.expire():
+        # A last look catches files the observer missed (e.g. the folder monitor is off).
+        source_filepath = find_job_file(job_id)
+        if source_filepath:
+            queue_csv_job(job, source_filepath)
+            continue
+        logger.warning(f"[Job {job_id}] Timed out. Assuming job was rejected.")
+        get_job_store().transition(job_id, jobs.REJECTED)
 
 
 # --- Main Worker Loops (Controllable) ---
 def csv_handshake_worker(stop_event: threading.Event):
-    """Monitors the CSV, but stops when the stop_event is set."""
+    """
+    Monitors the CSV feed, but stops when the stop_event is set.
+
+    Only rows appended since the last read are parsed, and a watchdog observer
+    on the feed wakes the worker as soon as the file changes; POLL_INTERVAL is
+    just a fallback for filesystems that do not deliver events. Handshakes run
+    concurrently: each job is started the moment its file lands in uploads/,
+    and this loop only wakes up to reject the ones whose deadline passes.
+    """
     logger.info("CSV Worker started.")
-    while not stop_event.is_set():
-        # --- NEW: Check for config reload signal ---
-        if os.path.exists(config.CONFIG_RELOAD_SIGNAL_PATH):
+    tailer = FeedTailer(JOBS_FEED_CSV_PATH, FEED_STATE_PATH)
+    feed_changed = threading.Event()
+    feed_dir = os.path.dirname(JOBS_FEED_CSV_PATH) or "."
+    os.makedirs(feed_dir, exist_ok=True)
+    observer = Observer()
+    observer.schedule(
+        FeedChangeHandler(JOBS_FEED_CSV_PATH, feed_changed), feed_dir, recursive=False
+    )
+    observer.start()
+    try:
+        while not stop_event.is_set():
+            reload_config_if_signalled()
             try:
-                # Reload the config module to pick up changes from .env
-                importlib.reload(config)
-                # Re-apply dummy mode if it was changed
-                # (This is a simplified approach; a more complex app might use a class)
-                if config.DUMMY_MODE:
-                    # Logic to re-patch functions if needed
-                    pass
-                os.remove(config.CONFIG_RELOAD_SIGNAL_PATH)
-                logger.warning("Configuration reloaded due to signal from UI.")
-                # Log the new state
-                logger.info(f"New Operation Mode: {config.OPERATION_MODE}")
-                logger.info(f"New Primary Model: {config.PRIMARY_MODEL}")
+                new_count = ingest_feed_rows(tailer)
             except Exception as e:
-                logger.error(f"Failed to reload configuration: {e}")
+                logger.error(f"Could not process CSV. Error: {e}")
+                new_count = 0
 
-        try:
-            if not os.path.exists(JOBS_FEED_CSV_PATH):
-                raise FileNotFoundError
-            df = pd.read_csv(JOBS_FEED_CSV_PATH, sep=",")
-            df.columns = [c.strip().lower() for c in df.columns]
-            if "link" not in df.columns or "title" not in df.columns:
-                logger.error(f"CSV format issue in '{JOBS_FEED_CSV_PATH}'.")
-                stop_event.wait(POLL_INTERVAL)
-                continue
-        except Exception as e:
-            logger.error(f"Could not process CSV. Error: {e}")
-            stop_event.wait(POLL_INTERVAL)
-            continue
+            for job in get_job_store().jobs_with_status(jobs.PENDING, kind="csv"):
+                if stop_event.is_set():
+                    break
+                start_handshake(job)
+            if new_count:
+                logger.info(
+                    f"CSV Worker: {new_count} new jobs added, {len(handshakes)} handshakes pending."
+                )
+            expire_handshakes()
 
-        processed_links = get_processed_jobs()
-        new_jobs = df[~df["link"].isin(processed_links)].copy()
-        if new_jobs.empty:
-            stop_event.wait(POLL_INTERVAL)
-            continue
-        pending_job_ids = {get_job_id_from_link(link) for link in new_jobs["link"]}
-        pending_job_ids.discard(None)
-        if pending_job_ids:
-            logger.info(
-                f"CSV Worker: Found {len(pending_job_ids)} new jobs. Pre-registering IDs."
+            timeout = handshakes.seconds_until_next_deadline()
+            wait_for_feed_change(
+                stop_event,
+                feed_changed,
+                POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL),
             )
-            active_handshake_jobs.update(pending_job_ids)
-
-        for _, job in new_jobs.iterrows():
-            if stop_event.is_set():
-                break
-            job_id = get_job_id_from_link(job["link"])
-            if not job_id:
-                continue
-            logger.info(f"[Job {job_id}] New job found. Prompting for manual action.")
-            pyperclip.copy(job_id)
-            logger.info(f"[Job {job_id}] Copied ID to clipboard.")
-            stop_event.wait(HANDSHAKE_WAIT_TIME)
-
-            if stop_event.is_set():
-                break
-            source_filepath = find_job_file(job_id)
-            if source_filepath:
-                process_csv_job(job, source_filepath)
-            else:
-                logger.warning(f"[Job {job_id}] Timed out. Assuming job was rejected.")
-                log_processed_job(job["link"])
-            active_handshake_jobs.discard(job_id)
+    finally:
+        observer.stop()
+        observer.join()
     logger.info("CSV Worker received stop signal and is shutting down.")
 
 
@@ -373,12 +1075,23 @@ class HotFolderHandler(FileSystemEventHandler):
             return
         source_filepath = event.src_path
         job_id_match = re.match(r"^(\d+)", os.path.basename(source_filepath))
-        if job_id_match and job_id_match.group(1) in active_handshake_jobs:
+        if job_id_match and resolve_handshake(job_id_match.group(1), source_filepath):
+            return
+        if job_id_match and job_id_match.group(1) in active_csv_jobs:
             logger.info(
                 f"Hot Folder: Ignoring '{os.path.basename(source_filepath)}' (handled by CSV worker)."
             )
             return
-        process_hot_folder_job(source_filepath)
+        job_queue.submit(process_hot_folder_job, source_filepath)
+
+    def on_moved(self, event):
+        # Browsers download to a temporary name and rename when done, so a
+        # pending handshake is also resolved by a file moved into place.
+        if event.is_directory:
+            return
+        job_id_match = re.match(r"^(\d+)", os.path.basename(event.dest_path))
+        if job_id_match:
+            resolve_handshake(job_id_match.group(1), event.dest_path)
 
 
 def folder_monitor_worker(stop_event: threading.Event):
@@ -387,11 +1100,17 @@ def folder_monitor_worker(stop_event: threading.Event):
     observer = Observer()
     observer.schedule(HotFolderHandler(), UPLOADS_DIR, recursive=False)
     observer.start()
+    resume_hot_folder_jobs()
+    last_stats_log = time.monotonic()
     try:
         while not stop_event.is_set():
             time.sleep(
                 1
             )  # The observer runs in its own thread, we just need to keep this one alive
+            if time.monotonic() - last_stats_log >= STATS_LOG_INTERVAL:
+                last_stats_log = time.monotonic()
+                if job_queue.stats()["submitted"]:
+                    log_concurrency_stats()
     finally:
         observer.stop()
         observer.join()
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+import docx
+import pptx
+import openpyxl
+import config
+
+IR_VERSION = 2  # Bump when parsing changes so cached documents are re-parsed
+SEGMENT_SEPARATOR = "\n\n"  # Joins segments into a readable text (and .txt blocks)
+SUPPORTED_EXTENSIONS = (".docx", ".pptx", ".xlsx", ".txt")
+
+
+@dataclass
+class Segment:
+    """
+    One translatable piece of a document. location says where it lives:
+    {"paragraph": i} (.docx), {"slide": i, "shape_id": n} (.pptx),
+    {"sheet": title, "cell": "B4"} (.xlsx) or {"block": i} (.txt).
+    """
+
+    id: str
+    text: str
+    location: dict
+
+
+@dataclass
+class DocumentIR:
+    """
+    A source document parsed once into segments, in reading order.
+
+    The original file is opened at most once per instance (see original()), so
+    regenerating several translations of one job reuses the same loaded file.
+    """
+
+    source_path: str
+    file_hash: str
+    file_type: str
+    segments: list
+    _original: object = field(default=None, repr=False, compare=False)
+
+    def text(self) -> str:
+        """The segments joined into one text, for display and review only."""
+        return SEGMENT_SEPARATOR.join(self.texts())
+
+    def texts(self) -> list:
+        """The segment texts in order, as sent for translation."""
+        return [segment.text for segment in self.segments]
+
+    def align(self, translations: list) -> list:
+        """
+        Checks that there is one translation per segment, in order, and returns
+        them. Raises ValueError if the segment count does not match.
+        """
+        if len(translations) != len(self.segments):
+            raise ValueError(
+                f"Translation has {len(translations)} segments, "
+                f"the document has {len(self.segments)}."
+            )
+        return list(translations)
+
+    def original(self):
+        """Returns the loaded source document (python-docx/pptx/openpyxl object)."""
+        if self._original is None:
+            self._original = _LOADERS[self.file_type](self.source_path)
+        return self._original
+
+    def __getstate__(self):
+        # Worker processes get the segments only and load the original once per
+        # task; core regenerates all of a job's outputs in one task.
+        state = dict(self.__dict__)
+        state["_original"] = None
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            "version": IR_VERSION,
+            "file_type": self.file_type,
+            "segments": [asdict(segment) for segment in self.segments],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, source_path: str, file_hash: str):
+        return cls(
+            source_path,
+            file_hash,
+            data["file_type"],
+            [Segment(**segment) for segment in data["segments"]],
+        )
+
+
+def _parse_docx(document) -> list:
+    return [
+        Segment(f"p{i}", paragraph.text, {"paragraph": i})
+        for i, paragraph in enumerate(document.paragraphs)
+    ]
+
+
+def _parse_pptx(presentation) -> list:
+    segments = []
+    for slide_index, slide in enumerate(presentation.slides):
+        for shape in slide.shapes:
+            if hasattr(shape, "text"):
+                segments.append(
+                    Segment(
+                        f"s{slide_index}/{shape.shape_id}",
+                        shape.text,
+                        {"slide": slide_index, "shape_id": shape.shape_id},
+                    )
+                )
+    return segments
+
+
+def _parse_xlsx(workbook) -> list:
+    """Works on full and read-only workbooks; formulas are not translated."""
+    segments = []
+    for sheet in workbook.worksheets:
+        for row in sheet.iter_rows():
+            for cell in row:
+                if cell.value and isinstance(cell.value, str) and cell.data_type != "f":
+                    segments.append(
+                        Segment(
+                            f"{sheet.title}!{cell.coordinate}",
+                            cell.value,
+                            {"sheet": sheet.title, "cell": cell.coordinate},
+                        )
+                    )
+    return segments
+
+
+def _read_txt(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _parse_txt(text: str) -> list:
+    return [
+        Segment(f"b{i}", block, {"block": i})
+        for i, block in enumerate(text.split(SEGMENT_SEPARATOR))
+    ]
+
+
+_LOADERS = {
+    ".docx": docx.Document,
+    ".pptx": pptx.Presentation,
+    ".xlsx": openpyxl.load_workbook,
+    ".txt": _read_txt,
+}
+_PARSERS = {
+    ".docx": _parse_docx,
+    ".pptx": _parse_pptx,
+    ".xlsx": _parse_xlsx,
+    ".txt": _parse_txt,
+}
+
+
+def file_type_of(path: str) -> str | None:
+    extension = os.path.splitext(path)[1].lower()
+    return extension if extension in SUPPORTED_EXTENSIONS else None
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_large_workbook(path: str) -> bool:
+    """Large .xlsx files are read and regenerated in streaming mode."""
+    return (
+        file_type_of(path) == ".xlsx"
+        and os.path.getsize(path) >= config.XLSX_STREAMING_MIN_MB * 1024 * 1024
+    )
+
+
+def _parse_large_workbook(path: str) -> list:
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return _parse_xlsx(workbook)
+    finally:
+        workbook.close()
+
+
+def parse_document(path: str, file_hash: str | None = None) -> DocumentIR:
+    """Parses a supported file into a DocumentIR, keeping the loaded original."""
+    file_type = file_type_of(path)
+    if file_type is None:
+        raise ValueError("Unsupported file type.")
+    if is_large_workbook(path):
+        # Read-only rows are streamed, so memory stays flat for any sheet size.
+        return DocumentIR(
+            path, file_hash or hash_file(path), file_type, _parse_large_workbook(path)
+        )
+    original = _LOADERS[file_type](path)
+    return DocumentIR(
+        path,
+        file_hash or hash_file(path),
+        file_type,
+        _PARSERS[file_type](original),
+        original,
+    )
+
+
+class DocumentCache:
+    """
+    Parsed documents stored as JSON files named after the source file's SHA-256,
+    so a file is parsed once no matter how often (or under which name) it is
+    read. Only the newest max_entries files are kept.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 500):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, f"{file_hash}.json")
+
+    def load(self, path: str) -> DocumentIR:
+        file_hash = hash_file(path)
+        cache_path = self._path(file_hash)
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == IR_VERSION:
+                self.hits += 1
+                return DocumentIR.from_dict(data, path, file_hash)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.misses += 1
+        document = parse_document(path, file_hash)
+        self._store(cache_path, document)
+        return document
+
+    def _store(self, cache_path: str, document: DocumentIR):
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(document.to_dict(), f, ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+            self._prune()
+        except OSError as e:
+            logging.warning(f"Could not cache parsed document '{cache_path}': {e}")
+
+    def _prune(self):
+        with self._lock:
+            entries = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".json")
+            ]
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort(key=os.path.getmtime)
+            for stale in entries[: len(entries) - self.max_entries]:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Returns the process-wide document cache configured from config."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DocumentCache(
+                config.DOCUMENT_CACHE_DIR, config.DOCUMENT_CACHE_MAX_ENTRIES
+            )
+        return _cache
+
+
+def load_document(path: str) -> DocumentIR:
+    """Returns the parsed document for path, from the disk cache if possible."""
+    if config.DOCUMENT_CACHE_ENABLED:
+        return get_document_cache().load(path)
+    return parse_document(path)
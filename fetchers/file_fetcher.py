@@ -1,45 +1,26 @@
-import docx
-import pptx
-import openpyxl
+from .document_ir import file_type_of, load_document
 
 
-def get_text_from_file(filepath: str) -> str:
+def read_document(filepath: str) -> tuple:
     """
-    Reads and returns text content from a file, supporting .txt, .docx, .pptx, and .xlsx.
+    Parses a .txt, .docx, .pptx or .xlsx file into a DocumentIR (cached on disk
+    by content hash). Returns (document, text), where text joins the segments
+    with a blank line; if the file cannot be read, document is None and text
+    is the error.
     """
-    full_text_list = []
+    if file_type_of(filepath) is None:
+        return None, "Error: Unsupported file type."
     try:
-        if filepath.endswith(".docx"):
-            doc = docx.Document(filepath)
-            for para in doc.paragraphs:
-                full_text_list.append(para.text)
-
-        elif filepath.endswith(".pptx"):
-            prs = pptx.Presentation(filepath)
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        full_text_list.append(shape.text)
-
-        elif filepath.endswith(".xlsx"):
-            wb = openpyxl.load_workbook(filepath)
-            for sheet in wb.worksheets:
-                for row in sheet.iter_rows():
-                    for cell in row:
-                        if cell.value and isinstance(cell.value, str):
-                            full_text_list.append(cell.value)
-
-        elif filepath.endswith(".txt"):
-            with open(filepath, "r", encoding="utf-8") as f:
-                return f.read()
-
-        else:
-            return "Error: Unsupported file type."
-
-        # Use a consistent separator for regeneration
-        return "\n\n".join(full_text_list)
-
+        document = load_document(filepath)
     except FileNotFoundError:
-        return f"Error: File not found at {filepath}"
+        return None, f"Error: File not found at {filepath}"
     except Exception as e:
-        return f"Error: Could not read file. {e}"
+        return None, f"Error: Could not read file. {e}"
+    return document, document.text()
+
+
+def get_text_from_file(filepath: str) -> str:
+    """
+    Reads and returns text content from a file, supporting .txt, .docx, .pptx, and .xlsx.
+    """
+    return read_document(filepath)[1]
@@ -0,0 +1,32 @@
+import re
+
+SEGMENT_TAG = re.compile(r'<seg id="(\d+)">(.*?)</seg>', re.DOTALL)
+
+
+def pack_segments(texts: list) -> str:
+    """Wraps each text in a numbered <seg> tag so many segments fit in one request."""
+    return "\n".join(
+        f'<seg id="{number}">{text}</seg>' for number, text in enumerate(texts, 1)
+    )
+
+
+def parse_packed(response: str, count: int) -> dict:
+    """
+    Extracts {number: translation} from a packed response.
+
+    Only ids 1..count with non-empty content are returned; anything missing,
+    duplicated or empty is left out so the caller can re-request it.
+    """
+    parsed = {}
+    duplicates = set()
+    for match in SEGMENT_TAG.finditer(response):
+        number = int(match.group(1))
+        content = match.group(2).strip()
+        if not 1 <= number <= count or not content:
+            continue
+        if number in parsed:
+            duplicates.add(number)
+        parsed[number] = content
+    for number in duplicates:
+        del parsed[number]
+    return parsed
@@ -0,0 +1,93 @@
+import re
+
+CHARS_PER_TOKEN = 4  # Rough average for Latin-script text
+CJK_PATTERN = re.compile(
+    r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]"
+)
+TAG_OVERHEAD_TOKENS = 8  # Cost of the <seg id="n">...</seg> wrapper per unit
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？])(\s*)")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in text without calling a tokenizer.
+
+    CJK characters are counted as one token each and everything else at
+    CHARS_PER_TOKEN characters per token, which errs on the high side for all
+    three providers.
+    """
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _hard_split(text: str, budget: int) -> list:
+    width = max(1, budget)  # One token per character is the worst case
+    return [(text[i : i + width], "") for i in range(0, len(text), width)]
+
+
+def _split_sentences(line: str, budget: int) -> list:
+    parts = SENTENCE_BOUNDARY.split(line)
+    pieces = []
+    for sentence, separator in zip(parts[0::2], parts[1::2] + [""]):
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) > budget:
+            split = _hard_split(sentence, budget)
+            split[-1] = (split[-1][0], separator)
+            pieces.extend(split)
+        else:
+            pieces.append((sentence, separator))
+    return pieces
+
+
+def split_oversized(text: str, budget: int) -> list:
+    """
+    Splits a segment that exceeds the token budget into (piece, separator) pairs.
+
+    Lines are grouped while they fit, overlong lines are split at sentence ends,
+    and each piece remembers the separator that followed it in the source so the
+    translated pieces can be rejoined in the same shape.
+    """
+    if estimate_tokens(text) <= budget:
+        return [(text, "")]
+    pieces = []
+    current = []
+    current_tokens = 0
+    for line in text.split("\n"):
+        line_tokens = estimate_tokens(line) + 1
+        if current and current_tokens + line_tokens > budget:
+            pieces.append(("\n".join(current), "\n"))
+            current, current_tokens = [], 0
+        if line_tokens > budget:
+            pieces.extend(_split_sentences(line, budget))
+            pieces[-1] = (pieces[-1][0], "\n")
+            continue
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append(("\n".join(current), "\n"))
+    pieces[-1] = (pieces[-1][0], "")
+    return pieces
+
+
+def chunk_units(units: list, budget: int, max_units: int | None = None) -> list:
+    """
+    Greedily packs consecutive (key, text) units into chunks within the token
+    budget, with at most max_units units per chunk.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for key, text in units:
+        tokens = estimate_tokens(text) + TAG_OVERHEAD_TOKENS
+        if current and (
+            current_tokens + tokens > budget
+            or (max_units and len(current) >= max_units)
+        ):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append((key, text))
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
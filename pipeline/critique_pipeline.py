@@ -0,0 +1,89 @@
+import logging
+import threading
+
+
+class CritiquePipeline:
+    """
+    Reviews a translation chunk by chunk while the rest is still being translated.
+
+    add() is the on_chunk callback for translate_document: every finished chunk
+    is handed to each reviewer on the executor right away, so reviewing chunk N
+    overlaps with translating chunk N+1. results() waits for the reviews and
+    joins each reviewer's critiques in document order.
+    """
+
+    def __init__(
+        self,
+        executor,
+        reviewers: dict,
+        target_language: str,
+        source_language: str,
+        progress: dict | None = None,
+    ):
+        self.executor = executor
+        self.reviewers = reviewers
+        self.languages = (target_language, source_language)
+        self.progress = progress or {}
+        self._lock = threading.Lock()
+        self._futures = {service: {} for service in reviewers}
+
+    def add(self, number: int, source_text: str, translation: str):
+        with self._lock:
+            for service, critique in self.reviewers.items():
+                self._futures[service][number] = self.executor.submit(
+                    self._review,
+                    service,
+                    critique,
+                    number,
+                    source_text,
+                    translation,
+                    *self.languages,
+                )
+
+    def _review(self, service, critique, number, *args) -> str:
+        progress = self.progress.get(service)
+        extra = {"on_text": progress.sink(number)} if progress else {}
+        result = critique(*args, **extra)
+        if progress and not result.startswith("Error:"):
+            progress.complete(number, result)
+        return result
+
+    def cancel(self):
+        """Cancels reviews that have not started yet (e.g. the translation failed)."""
+        with self._lock:
+            for futures in self._futures.values():
+                for future in futures.values():
+                    future.cancel()
+
+    def _collect(self, service: str, chunks: dict) -> str:
+        parts = []
+        for number in sorted(chunks):
+            try:
+                part = chunks[number].result()
+            except Exception as e:
+                logging.error(f"{service.capitalize()} review raised an exception: {e}")
+                part = f"Error: {service} review raised an exception. {e}"
+            if part.startswith("Error:"):
+                return part
+            if len(chunks) > 1:
+                part = f"#### Part {len(parts) + 1} of {len(chunks)}\n\n{part}"
+            parts.append(part)
+        return "\n\n".join(parts)
+
+    def results(self) -> dict:
+        """
+        Returns {service: critique text} with each reviewer's chunk critiques in
+        order. A reviewer that failed on any chunk gets that chunk's error.
+        """
+        with self._lock:
+            futures = {
+                service: dict(chunks) for service, chunks in self._futures.items()
+            }
+        return {
+            service: self._collect(service, chunks)
+            for service, chunks in futures.items()
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return max((len(chunks) for chunks in self._futures.values()), default=0)
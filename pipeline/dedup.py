@@ -0,0 +1,92 @@
+import re
+from .chunking import estimate_tokens
+
+
+def dedup_key(text: str) -> str:
+    """Segments that differ only in whitespace share one translation."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class DedupPlan:
+    """
+    Collapses a document's repeated segments so each distinct one is sent to
+    the providers once.
+
+    unique is the document's segments with blank and duplicate ones removed,
+    in first-occurrence order; expand() maps their translations back to one
+    translation per original segment.
+    Blank segments are kept as they are, and a copy whose surrounding
+    whitespace differs from the first occurrence keeps its own.
+
+    passthrough, if given, is called once per distinct segment; segments it
+    returns True for are not sent at all and are copied verbatim to the
+    output, like blank ones. With dedupe=False repeats are sent every time.
+    """
+
+    def __init__(self, segments: list, passthrough=None, dedupe: bool = True):
+        self.segments = segments
+        self.unique = []
+        self.mapping = []  # Index into unique for each segment, or None if kept
+        self.passthrough = []  # Non-blank segments kept as they are
+        positions = {}
+        for number, segment in enumerate(segments):
+            key = dedup_key(segment)
+            if not key:
+                self.mapping.append(None)
+                continue
+            if key not in positions:
+                if passthrough and passthrough(segment):
+                    positions[key] = None
+                else:
+                    positions[key] = len(self.unique)
+                    self.unique.append(segment)
+            elif not dedupe and positions[key] is not None:
+                positions[key] = len(self.unique)
+                self.unique.append(segment)
+            self.mapping.append(positions[key])
+            if positions[key] is None:
+                self.passthrough.append(number)
+
+    def expand(self, translations: list) -> list:
+        """
+        Fans the translations of unique out to every segment. Raises ValueError
+        if there is not one translation per unique segment.
+        """
+        parts = translations
+        if len(parts) != len(self.unique):
+            raise ValueError(
+                f"Translation has {len(parts)} segments, "
+                f"expected {len(self.unique)} unique segments."
+            )
+        expanded = []
+        for segment, index in zip(self.segments, self.mapping):
+            if index is None:
+                expanded.append(segment)
+            elif segment == self.unique[index]:
+                expanded.append(parts[index])
+            else:
+                leading = segment[: len(segment) - len(segment.lstrip())]
+                trailing = segment[len(segment.rstrip()) :]
+                expanded.append(f"{leading}{parts[index].strip()}{trailing}")
+        return expanded
+
+    def report(self) -> dict:
+        """
+        Returns segment counts and the input tokens saved per provider, in
+        total and by pass-through segments alone.
+        """
+        source_tokens = sum(estimate_tokens(s) for s in self.segments if s.strip())
+        unique_tokens = sum(estimate_tokens(s) for s in self.unique)
+        dispatched = sum(index is not None for index in self.mapping)
+        return {
+            "segments": dispatched + len(self.passthrough),
+            "unique_segments": len(self.unique),
+            "duplicate_ratio": 1 - len(self.unique) / dispatched if dispatched else 0.0,
+            "source_tokens": source_tokens,
+            "unique_tokens": unique_tokens,
+            "tokens_saved": source_tokens - unique_tokens,
+            "passthrough_segments": len(self.passthrough),
+            "passthrough_tokens": sum(
+                estimate_tokens(self.segments[i]) for i in self.passthrough
+            ),
+        }
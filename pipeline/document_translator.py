@@ -0,0 +1,280 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from translators.async_engine import cancel_scope
+from translators.errors import TruncatedError
+from translators.translation_memory import get_translation_memory
+from .batching import pack_segments, parse_packed
+from .chunking import chunk_units, estimate_tokens, split_oversized
+import config
+
+SEGMENT_SEPARATOR = "\n\n"  # Joins a chunk's segments for progress and review
+
+_chunk_executors = {}
+_chunk_executors_lock = threading.Lock()
+
+
+def _chunk_executor(service: str) -> ThreadPoolExecutor:
+    """Returns the service's chunk executor, sized to its concurrency limit."""
+    with _chunk_executors_lock:
+        if service not in _chunk_executors:
+            _chunk_executors[service] = ThreadPoolExecutor(
+                max_workers=config.PROVIDER_MAX_CONCURRENCY.get(service, 4),
+                thread_name_prefix=f"Chunk-{service}",
+            )
+        return _chunk_executors[service]
+
+
+def _request(
+    service,
+    translate_func,
+    limiter,
+    text,
+    target_language,
+    source_language,
+    references,
+    on_text=None,
+    cancel=None,
+):
+    # Only streaming callers pass on_text, so plain translate functions still work.
+    extra = {"on_text": on_text} if on_text else {}
+    with cancel_scope(cancel), limiter.slot(service) if limiter else nullcontext():
+        return translate_func(
+            text, target_language, source_language, references=references, **extra
+        )
+
+
+def _translate_chunk(
+    service,
+    translate_func,
+    limiter,
+    chunk,
+    target_language,
+    source_language,
+    references,
+    on_text=None,
+    cancel=None,
+):
+    """
+    Translates one chunk of (key, text) units and returns {key: translation}.
+
+    Multi-unit chunks are sent as one packed request with numbered segment tags.
+    Segments missing from the response are re-requested in a smaller packed
+    request, and anything still unparsed after BATCH_MAX_RETRIES is translated
+    on its own so the document never loses alignment. A response cut off at
+    the output limit is retried as two smaller requests, or for a single
+    segment, as two halves of it.
+    """
+
+    def request(text):
+        return _request(
+            service,
+            translate_func,
+            limiter,
+            text,
+            target_language,
+            source_language,
+            references,
+            on_text,
+            cancel,
+        )
+
+    def split_and_retry(units, error):
+        if len(units) > 1:
+            half = len(units) // 2
+            logging.warning(
+                f"  -> [{service}] Response for {len(units)} segments was cut off. "
+                "Retrying them in two requests."
+            )
+            results = {}
+            for part in (units[:half], units[half:]):
+                part_results = translate(part)
+                if isinstance(part_results, str):
+                    return part_results
+                results.update(part_results)
+            return results
+        key, text = units[0]
+        pieces = split_oversized(text, estimate_tokens(text) // 2)
+        if len(pieces) == 1:
+            raise error
+        logging.warning(
+            f"  -> [{service}] Response for a segment was cut off. "
+            f"Retrying it in {len(pieces)} pieces."
+        )
+        translated = translate(list(enumerate(piece for piece, _ in pieces)))
+        if isinstance(translated, str):
+            return translated
+        return {
+            key: "".join(
+                translated[n] + separator for n, (_, separator) in enumerate(pieces)
+            )
+        }
+
+    def translate(units):
+        results = {}
+        remaining = list(units)
+        for attempt in range(config.BATCH_MAX_RETRIES + 1):
+            if len(remaining) <= 1:
+                break
+            try:
+                translation = request(pack_segments([text for _, text in remaining]))
+            except TruncatedError as e:
+                retried = split_and_retry(remaining, e)
+                if isinstance(retried, str):
+                    return retried
+                results.update(retried)
+                return results
+            if translation.startswith("Error:"):
+                return translation
+            parsed = parse_packed(translation, len(remaining))
+            failed = []
+            for number, (key, text) in enumerate(remaining, 1):
+                if number in parsed:
+                    results[key] = parsed[number]
+                else:
+                    failed.append((key, text))
+            if failed:
+                logging.warning(
+                    f"  -> [{service}] {len(failed)}/{len(remaining)} packed segments "
+                    f"could not be parsed (attempt {attempt + 1}). Re-requesting them."
+                )
+            remaining = failed
+
+        for key, text in remaining:
+            try:
+                translation = request(text)
+            except TruncatedError as e:
+                translation = split_and_retry([(key, text)], e)
+                if isinstance(translation, str):
+                    return translation
+                results.update(translation)
+                continue
+            if translation.startswith("Error:"):
+                return translation
+            results[key] = translation
+        return results
+
+    return translate(chunk)
+
+
+def translate_document(
+    service: str,
+    translate_func,
+    segments: list,
+    target_language: str,
+    source_language: str,
+    limiter=None,
+    progress=None,
+    on_chunk=None,
+    cancel=None,
+) -> list | str:
+    """
+    Translates a document's segments, reusing the translation memory, and
+    returns one translation per segment (or an "Error: ..." string).
+
+    Exact and high-scoring fuzzy matches are filled locally, weaker fuzzy matches
+    are passed to the provider as reference translations, and the remaining
+    segments are packed into tagged multi-segment requests within the provider's
+    token budget and translated concurrently. New segment pairs are stored in
+    the memory. If progress (a StreamProgress) is given, responses are streamed
+    into it chunk by chunk. on_chunk(number, source, translation) is called as
+    each chunk finishes, in completion order, with the chunk's segments joined
+    by blank lines. Cancelling cancel (a CancelToken) stops every request still
+    running or not yet sent, and the call raises CancelledError.
+    """
+    # Jobs whose title did not name a language pair skip the memory entirely.
+    memory = source_language and target_language and get_translation_memory()
+    results = [None] * len(segments)
+    references = {}
+    for i, segment in enumerate(segments):
+        if not segment.strip():
+            results[i] = segment
+            continue
+        match = memory and memory.lookup(
+            segment, source_language, target_language, service
+        )
+        if not match:
+            continue
+        if match.score >= config.TM_REUSE_THRESHOLD:
+            results[i] = match.target
+        else:
+            references[i] = (match.source, match.target)
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    reused = len(segments) - len(pending)
+    if memory and reused:
+        logging.info(
+            f"  -> [{service}] Translation memory filled {reused}/{len(segments)} segments locally."
+        )
+    if not pending:
+        return results
+
+    budget = config.CHUNK_TOKEN_BUDGET.get(service, config.DEFAULT_CHUNK_TOKEN_BUDGET)
+    pieces = {i: split_oversized(segments[i], budget) for i in pending}
+    units = [((i, p), piece) for i in pending for p, (piece, _) in enumerate(pieces[i])]
+    chunks = chunk_units(units, budget, max_units=config.BATCH_MAX_SEGMENTS)
+    if len(chunks) > 1:
+        logging.info(
+            f"  -> [{service}] Translating {len(units)} segments in {len(chunks)} chunks "
+            f"(budget {budget} tokens)."
+        )
+
+    executor = _chunk_executor(service)
+    futures = []
+    for number, chunk in enumerate(chunks):
+        chunk_segments = sorted({i for (i, _), _ in chunk})
+        chunk_references = [references[i] for i in chunk_segments if i in references]
+        futures.append(
+            executor.submit(
+                _translate_chunk,
+                service,
+                translate_func,
+                limiter,
+                chunk,
+                target_language,
+                source_language,
+                chunk_references[: config.TM_MAX_REFERENCES],
+                progress.sink(number) if progress else None,
+                cancel,
+            )
+        )
+    translated = {}
+    numbers = {future: number for number, future in enumerate(futures)}
+    for future in as_completed(futures):
+        number = numbers[future]
+        try:
+            chunk_result = future.result()
+        except Exception:
+            for other in futures:
+                other.cancel()
+            raise
+        if isinstance(chunk_result, str):
+            for other in futures:
+                other.cancel()
+            return chunk_result
+        translated.update(chunk_result)
+        chunk_text = SEGMENT_SEPARATOR.join(
+            chunk_result[key] for key, _ in chunks[number]
+        )
+        if progress:
+            progress.complete(number, chunk_text)
+        if on_chunk:
+            on_chunk(
+                number,
+                SEGMENT_SEPARATOR.join(piece for _, piece in chunks[number]),
+                chunk_text,
+            )
+
+    for i in pending:
+        results[i] = "".join(
+            translated[(i, p)] + separator for p, (_, separator) in enumerate(pieces[i])
+        )
+    if memory:
+        memory.add(
+            [(segments[i], results[i]) for i in pending],
+            source_language,
+            target_language,
+            service,
+        )
+    return results
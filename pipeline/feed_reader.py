@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from watchdog.events import FileSystemEventHandler
+
+
+class FeedTailer:
+    """
+    Reads only the rows appended to a CSV feed since the last call.
+
+    The byte offset, inode and header are remembered (and persisted to
+    state_path, if given) so each poll costs the size of the new rows, not of
+    the whole feed. A different inode or a file smaller than the saved offset
+    means the feed was rotated or truncated, and it is re-read from the start.
+
+    Rows only count as read once the caller has stored them and calls
+    commit(); until then every call returns them again, so a crash in between
+    cannot lose them.
+    """
+
+    def __init__(self, path: str, state_path: str | None = None):
+        self.path = path
+        self.state_path = state_path
+        self.inode = None
+        self.offset = 0
+        self.columns = None
+        self._pending = None
+        self._load_state()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.inode = state["inode"]
+            self.offset = state["offset"]
+            self.columns = state["columns"]
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable feed state '{self.state_path}': {e}")
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"inode": self.inode, "offset": self.offset, "columns": self.columns}, f
+            )
+        os.replace(temp_path, self.state_path)
+
+    def read_new_rows(self) -> list:
+        """Returns the complete rows appended since the last call, as dicts."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        inode, offset, columns = self.inode, self.offset, self.columns
+        if stat.st_ino != inode or stat.st_size < offset:
+            if inode is not None:
+                logging.info(
+                    f"Feed '{self.path}' was rotated or truncated. Re-reading."
+                )
+            inode, offset, columns = stat.st_ino, 0, None
+        if stat.st_size == offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        # Only consume complete records: stop at the last newline that is not
+        # inside a quoted field, leaving any partial row for the next call.
+        end = data.rfind(b"\n") + 1
+        while end and data[:end].count(b'"') % 2:
+            end = data.rfind(b"\n", 0, end - 1) + 1
+        if not end:
+            return []
+
+        reader = csv.reader(io.StringIO(data[:end].decode("utf-8-sig")))
+        rows = []
+        for record in reader:
+            if not record:
+                continue
+            if columns is None:
+                columns = [c.strip().lower() for c in record]
+                continue
+            rows.append(dict(zip(columns, record)))
+        self._pending = (inode, offset + end, columns)
+        return rows
+
+    def commit(self):
+        """Marks the rows returned by the last read_new_rows() as read and saves it."""
+        if self._pending is None:
+            return
+        self.inode, self.offset, self.columns = self._pending
+        self._pending = None
+        self._save_state()
+
+
+class FeedChangeHandler(FileSystemEventHandler):
+    """Sets an event whenever the watched feed file is written, moved or created."""
+
+    def __init__(self, path: str, changed: threading.Event):
+        self.path = os.path.abspath(path)
+        self.changed = changed
+
+    def on_any_event(self, event):
+        paths = {event.src_path, getattr(event, "dest_path", "")}
+        if self.path in {os.path.abspath(p) for p in paths if p}:
+            self.changed.set()
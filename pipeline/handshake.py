@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class HandshakeTable:
+    """
+    Pending CSV-job handshakes, each with its own deadline.
+
+    A handshake is resolved as soon as its file is seen, by whichever thread
+    sees it first; resolve() and expire() both remove the entry under the lock,
+    so a job is either started or rejected exactly once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def add(self, job_id: str, job: dict, timeout: float) -> bool:
+        """Starts a handshake. Returns False if one is already pending for job_id."""
+        with self._lock:
+            if job_id in self._pending:
+                return False
+            self._pending[job_id] = (job, time.monotonic() + timeout)
+            return True
+
+    def resolve(self, job_id: str) -> dict | None:
+        """Removes and returns the pending job, or None if it is not (or no longer) pending."""
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+        return entry[0] if entry else None
+
+    def expire(self) -> list:
+        """Removes and returns (job_id, job) for every handshake past its deadline."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                (job_id, job)
+                for job_id, (job, deadline) in self._pending.items()
+                if deadline <= now
+            ]
+            for job_id, _ in expired:
+                del self._pending[job_id]
+        return expired
+
+    def seconds_until_next_deadline(self) -> float | None:
+        with self._lock:
+            if not self._pending:
+                return None
+            next_deadline = min(deadline for _, deadline in self._pending.values())
+        return max(0.0, next_deadline - time.monotonic())
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
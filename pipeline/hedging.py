@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from translators.async_engine import CancelToken
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent response times per provider.
+
+    Latencies are stored as seconds per 1,000 estimated tokens (documents under
+    1,000 tokens count as 1,000), so thresholds learned on short documents still
+    make sense for long ones.
+    """
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self.window = window
+
+    def record(self, provider: str, seconds: float, tokens: int):
+        with self._lock:
+            samples = self._samples.setdefault(provider, deque(maxlen=self.window))
+            samples.append(seconds / max(1, tokens / 1000))
+
+    def percentile(self, provider: str, percentile: float) -> tuple:
+        """Returns (seconds per 1k tokens at the percentile, sample count)."""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None, 0
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index], len(samples)
+
+
+class HedgePolicy:
+    """
+    Decides when to send a backup request and caps what hedging may cost.
+
+    The hedge delay for a request is the primary's learned latency percentile
+    scaled to the request's size, or default_delay until min_samples responses
+    have been seen. A hedge is only sent while the hedged tokens stay within
+    max_extra_spend (a fraction) of all primary tokens. Sizes are estimated
+    up front and settled once the race is over: the winner's requests count
+    as primary tokens and the loser's, up to its cancellation, as hedged.
+    """
+
+    def __init__(
+        self,
+        tracker: LatencyTracker,
+        percentile: float = 95,
+        min_samples: int = 20,
+        default_delay: float = 60.0,
+        max_extra_spend: float = 0.1,
+    ):
+        self.tracker = tracker
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.max_extra_spend = max_extra_spend
+        self._lock = threading.Lock()
+        self._primary_tokens = 0
+        self._hedged_tokens = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def delay_for(self, provider: str, tokens: int) -> float:
+        per_1k, count = self.tracker.percentile(provider, self.percentile)
+        if count < self.min_samples:
+            return self.default_delay
+        return per_1k * max(1, tokens / 1000)
+
+    def record_primary(self, tokens: int):
+        with self._lock:
+            self._primary_tokens += tokens
+
+    def try_reserve(self, tokens: int) -> bool:
+        """Reserves budget for a hedge of the given size, if the spend cap allows it."""
+        with self._lock:
+            if (
+                self._hedged_tokens + tokens
+                > self.max_extra_spend * self._primary_tokens
+            ):
+                return False
+            self._hedged_tokens += tokens
+            self._hedges += 1
+            return True
+
+    def settle(
+        self, estimate: int, primary_spent: int, reserved: int, hedged_spent: int
+    ):
+        """Replaces one call's estimated and reserved tokens with its real spend."""
+        with self._lock:
+            self._primary_tokens += primary_spent - estimate
+            self._hedged_tokens += hedged_spent - reserved
+
+    def record_hedge_win(self):
+        with self._lock:
+            self._hedge_wins += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "primary_tokens": self._primary_tokens,
+                "hedged_tokens": self._hedged_tokens,
+            }
+
+
+def _failed(result) -> bool:
+    """Results are translations (a string or list of segments) or "Error: ..."."""
+    return isinstance(result, str) and result.startswith("Error:")
+
+
+def _timed(
+    tracker: LatencyTracker,
+    provider: str,
+    tokens: int,
+    cancel: CancelToken,
+    func,
+    *args,
+):
+    start = time.monotonic()
+    result = func(*args, cancel=cancel)
+    # Cache and translation memory hits send nothing and would teach the
+    # tracker that the provider answers instantly.
+    if cancel.requests and result and not _failed(result):
+        tracker.record(provider, time.monotonic() - start, tokens)
+    return result
+
+
+def hedged_call(
+    policy: HedgePolicy,
+    executor,
+    calls: dict,
+    primary: str,
+    secondary: str,
+    tokens: int,
+    *args,
+) -> tuple:
+    """
+    Runs calls[primary](*args, cancel=token), and also calls[secondary] if the
+    primary has not answered within its hedge delay. Returns (service, result)
+    for the first successful response; the slower call's token is cancelled,
+    which stops its provider requests even mid-flight. If both fail, the
+    primary's error is returned.
+    """
+    tracker = policy.tracker
+    delay = policy.delay_for(primary, tokens)
+    policy.record_primary(tokens)
+    cancels = {primary: CancelToken()}
+    futures = {
+        executor.submit(
+            _timed, tracker, primary, tokens, cancels[primary], calls[primary], *args
+        ): primary
+    }
+    done, _ = wait(futures, timeout=delay)
+    reserved = 0
+    if not done:
+        if policy.try_reserve(tokens):
+            reserved = tokens
+            logging.info(
+                f"  -> [{primary}] No response after {delay:.1f}s. Hedging with {secondary}."
+            )
+            cancels[secondary] = CancelToken()
+            futures[
+                executor.submit(
+                    _timed,
+                    tracker,
+                    secondary,
+                    tokens,
+                    cancels[secondary],
+                    calls[secondary],
+                    *args,
+                )
+            ] = secondary
+        else:
+            logging.info(f"  -> [{primary}] Slow, but the hedging budget is spent.")
+
+    winner = None
+    results = {}
+    pending = set(futures)
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            service = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = f"Error: {service} call raised an exception. {e}"
+            results[service] = result
+            if not _failed(result):
+                winner = service
+                break
+    for token in cancels.values():
+        token.cancel()  # Stops the loser, if it is still running
+
+    kept = winner or primary
+    loser = next((service for service in cancels if service != kept), None)
+    policy.settle(
+        tokens, cancels[kept].tokens, reserved, cancels[loser].tokens if loser else 0
+    )
+    if winner is None:
+        return primary, results.get(primary, results.get(secondary))
+    if winner != primary:
+        policy.record_hedge_win()
+        logging.info(f"  -> Hedge to {winner} finished first.")
+    return winner, results[winner]
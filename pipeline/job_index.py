@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+from . import job_store as jobs
+from .job_store import JobStore
+from .streaming import PARTIAL_EXTENSION
+
+LEGACY_OUTPUT_NAME = re.compile(r"job_([\w\d.-]+)_")
+# Updates committed within this many seconds of the newest one already read are
+# read again, so a write that lands with an older timestamp is not missed.
+REFRESH_OVERLAP = 2.0
+
+
+class JobIndex:
+    """
+    The review UI's view of the jobs that have outputs or are still running,
+    kept current incrementally.
+
+    The first refresh() reads every job and output from the job store, plus any
+    output files in outputs_dir left by versions that did not record them.
+    Later calls read only the jobs and outputs updated since the previous one.
+    version goes up whenever a refresh finds a change, and changed_since()
+    tells which jobs changed after a given version. One index can be shared by
+    all UI sessions.
+    """
+
+    def __init__(self, store: JobStore, outputs_dir: str):
+        self.store = store
+        self.outputs_dir = outputs_dir
+        self.version = 0
+        self._lock = threading.Lock()
+        self._statuses = {}
+        self._outputs = {}
+        self._changed = {}
+        self._watermark = None
+
+    def _scan_legacy_outputs(self) -> set:
+        if not os.path.isdir(self.outputs_dir):
+            return set()
+        for name in os.listdir(self.outputs_dir):
+            match = LEGACY_OUTPUT_NAME.search(name)
+            if match and PARTIAL_EXTENSION not in name:
+                path = os.path.join(self.outputs_dir, name)
+                self._outputs.setdefault(match.group(1), set()).add(path)
+        return set(self._outputs)
+
+    def refresh(self) -> set:
+        """Reads what changed since the last refresh and returns the changed job IDs."""
+        with self._lock:
+            changed = set()
+            if self._watermark is None:
+                changed = self._scan_legacy_outputs()
+                self._watermark = since = 0
+            else:
+                since = max(0, self._watermark - REFRESH_OVERLAP)
+            for job in self.store.list_jobs(limit=-1, updated_since=since):
+                self._watermark = max(self._watermark, job["updated_at"])
+                if self._statuses.get(job["job_id"]) != job["status"]:
+                    self._statuses[job["job_id"]] = job["status"]
+                    changed.add(job["job_id"])
+            for job_id, _, path in self.store.list_outputs(updated_since=since):
+                paths = self._outputs.setdefault(job_id, set())
+                if path not in paths:
+                    paths.add(path)
+                    changed.add(job_id)
+            if changed:
+                self.version += 1
+                for job_id in changed:
+                    self._changed[job_id] = self.version
+            return changed
+
+    def changed_since(self, version: int) -> set:
+        with self._lock:
+            return {job_id for job_id, v in self._changed.items() if v > version}
+
+    def job_ids(self) -> list:
+        """Jobs with at least one output or still processing, newest ID first."""
+        with self._lock:
+            running = {
+                job_id
+                for job_id, status in self._statuses.items()
+                if status == jobs.PROCESSING
+            }
+            return sorted(set(self._outputs) | running, reverse=True)
+
+    def is_running(self, job_id: str) -> bool:
+        with self._lock:
+            return self._statuses.get(job_id) == jobs.PROCESSING
+
+    def outputs(self, job_id: str) -> list:
+        """Paths of the job's output files, in name order."""
+        with self._lock:
+            return sorted(self._outputs.get(job_id, ()))
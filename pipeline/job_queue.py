@@ -0,0 +1,170 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from .metrics import get_metrics
+
+
+class JobQueue:
+    """
+    A bounded job queue drained by a fixed-size pool of worker threads.
+
+    Submitting blocks once the queue is full, so a burst of file drops applies
+    backpressure to the producer instead of fanning out unbounded work.
+    """
+
+    def __init__(self, num_workers: int, max_queue_size: int, name: str = "JobWorker"):
+        self.num_workers = max(1, num_workers)
+        self._queue = queue.Queue(maxsize=max(0, max_queue_size))
+        self._name = name
+        self._threads = []
+        self._lock = threading.Lock()
+        self._busy_workers = 0
+        self._busy_seconds = 0.0
+        self._started_at = None
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def start(self):
+        """Starts the worker threads. Calling it more than once is a no-op."""
+        with self._lock:
+            if self._threads:
+                return
+            self._started_at = time.monotonic()
+            for i in range(self.num_workers):
+                thread = threading.Thread(
+                    target=self._worker_loop, name=f"{self._name}-{i + 1}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Queues a call to func(*args, **kwargs), blocking while the queue is full."""
+        self.start()
+        with self._lock:
+            self._submitted += 1
+        self._queue.put((time.monotonic(), func, args, kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """Lets queued jobs finish, then stops the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        with self._lock:
+            self._threads = []
+
+    def join(self):
+        """Blocks until every submitted job has been processed."""
+        self._queue.join()
+
+    def stats(self) -> dict:
+        """Returns queue depth, wait times and worker utilisation."""
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            capacity = elapsed * self.num_workers
+            finished = self._completed + self._failed
+            return {
+                "workers": self.num_workers,
+                "busy_workers": self._busy_workers,
+                "queue_depth": self._queue.qsize(),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_seconds": self._total_wait / finished if finished else 0.0,
+                "max_wait_seconds": self._max_wait,
+                "utilisation": self._busy_seconds / capacity if capacity else 0.0,
+            }
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            enqueued_at, func, args, kwargs = item
+            started = time.monotonic()
+            wait = started - enqueued_at
+            with self._lock:
+                self._busy_workers += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            get_metrics().observe("translator_queue_wait_seconds", wait, queue="jobs")
+            failed = False
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                failed = True
+                logging.exception(f"Job {getattr(func, '__name__', func)} failed: {e}")
+            finally:
+                with self._lock:
+                    self._busy_workers -= 1
+                    self._busy_seconds += time.monotonic() - started
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+                self._queue.task_done()
+
+
+class ProviderLimiter:
+    """Caps the number of in-flight API calls per provider."""
+
+    def __init__(self, limits: dict, default_limit: int = 4):
+        self._default_limit = default_limit
+        self._semaphores = {
+            name: threading.BoundedSemaphore(max(1, limit))
+            for name, limit in limits.items()
+        }
+        self._limits = dict(limits)
+        self._lock = threading.Lock()
+        self._in_flight = defaultdict(int)
+        self._peak = defaultdict(int)
+        self._waits = defaultdict(float)
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = threading.BoundedSemaphore(
+                    self._default_limit
+                )
+                self._limits[provider] = self._default_limit
+            return self._semaphores[provider]
+
+    @contextmanager
+    def slot(self, provider: str):
+        """Holds one of the provider's concurrency slots for the duration of the block."""
+        semaphore = self._semaphore(provider)
+        started = time.monotonic()
+        semaphore.acquire()
+        wait = time.monotonic() - started
+        get_metrics().observe("translator_queue_wait_seconds", wait, queue=provider)
+        with self._lock:
+            self._waits[provider] += wait
+            self._in_flight[provider] += 1
+            self._peak[provider] = max(self._peak[provider], self._in_flight[provider])
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[provider] -= 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        """Returns the limit, current and peak in-flight calls for each provider."""
+        with self._lock:
+            return {
+                name: {
+                    "limit": limit,
+                    "in_flight": self._in_flight[name],
+                    "peak_in_flight": self._peak[name],
+                    "total_wait_seconds": self._waits[name],
+                }
+                for name, limit in self._limits.items()
+            }
@@ -0,0 +1,416 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Job lifecycle: pending -> queued -> processing -> completed | partial | failed,
+# or pending -> rejected when the handshake times out.
+PENDING = "pending"
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+PARTIAL = "partial"
+FAILED = "failed"
+REJECTED = "rejected"
+TERMINAL_STATUSES = (COMPLETED, PARTIAL, FAILED, REJECTED)
+ACTIVE_STATUSES = (QUEUED, PROCESSING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    link TEXT UNIQUE,
+    title TEXT,
+    kind TEXT NOT NULL,
+    source_path TEXT,
+    source_language TEXT,
+    target_language TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    provider TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, provider)
+);
+CREATE TABLE IF NOT EXISTS job_progress (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    provider TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    tokens_per_second REAL,
+    partial_path TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, provider)
+);
+CREATE TABLE IF NOT EXISTS job_stages (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    stage TEXT NOT NULL,
+    tasks INTEGER NOT NULL,
+    cpu_seconds REAL NOT NULL,
+    wall_seconds REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+CREATE TABLE IF NOT EXISTS job_dedup (
+    job_id TEXT PRIMARY KEY REFERENCES jobs (job_id),
+    segments INTEGER NOT NULL,
+    unique_segments INTEGER NOT NULL,
+    duplicate_ratio REAL NOT NULL,
+    source_tokens INTEGER NOT NULL,
+    unique_tokens INTEGER NOT NULL,
+    tokens_saved INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    passthrough_segments INTEGER NOT NULL DEFAULT 0,
+    passthrough_tokens INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class InvalidTransition(Exception):
+    """Raised when a job is not in a state that allows the requested transition."""
+
+
+class JobStore:
+    """
+    A transactional job-state database in SQLite.
+
+    Each thread gets its own connection; WAL mode lets the review UI read while
+    the service writes. Every state change is a single committed transaction,
+    so a crash can never leave a finished job looking unprocessed.
+    on_change, if given, is called with (job_id, status) after a job is
+    registered or changes status.
+    """
+
+    def __init__(self, path: str, on_change=None):
+        self.path = path
+        self.on_change = on_change
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "title" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN title TEXT")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_dedup)")}
+            for column in ("passthrough_segments", "passthrough_tokens"):
+                if column not in columns:
+                    conn.execute(
+                        f"ALTER TABLE job_dedup ADD COLUMN {column} "
+                        "INTEGER NOT NULL DEFAULT 0"
+                    )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def register_job(
+        self,
+        job_id: str,
+        kind: str,
+        link: str | None = None,
+        title: str | None = None,
+        source_path: str | None = None,
+        source_language: str | None = None,
+        target_language: str | None = None,
+        status: str = PENDING,
+    ):
+        """Creates a job, or refreshes the details of a job that is not yet finished."""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """INSERT INTO jobs (job_id, link, title, kind, source_path,
+                       source_language, target_language, status, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (job_id) DO UPDATE SET
+                       title = COALESCE(excluded.title, title),
+                       source_path = COALESCE(excluded.source_path, source_path),
+                       source_language = COALESCE(excluded.source_language, source_language),
+                       target_language = COALESCE(excluded.target_language, target_language),
+                       status = excluded.status,
+                       updated_at = excluded.updated_at
+                   WHERE jobs.status NOT IN (?, ?, ?, ?)""",
+                (
+                    job_id,
+                    link,
+                    title,
+                    kind,
+                    source_path,
+                    source_language,
+                    target_language,
+                    status,
+                    now,
+                    now,
+                    *TERMINAL_STATUSES,
+                ),
+            )
+        if cursor.rowcount:
+            self._changed(job_id, status)
+
+    def _changed(self, job_id: str, status: str):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(job_id, status)
+        except Exception as e:
+            logging.warning(f"Job change callback failed for {job_id}: {e}")
+
+    def transition(self, job_id: str, new_status: str, from_statuses=None):
+        """
+        Atomically moves a job to new_status, optionally only from the given
+        statuses. Raises InvalidTransition if the job is missing or not eligible.
+        """
+        now = time.time()
+        finished_at = now if new_status in TERMINAL_STATUSES else None
+        query = "UPDATE jobs SET status = ?, updated_at = ?, finished_at = ? WHERE job_id = ?"
+        params = [new_status, now, finished_at, job_id]
+        if from_statuses:
+            query += f" AND status IN ({', '.join('?' for _ in from_statuses)})"
+            params.extend(from_statuses)
+        with self._connection() as conn:
+            if conn.execute(query, params).rowcount != 1:
+                raise InvalidTransition(
+                    f"Job {job_id} cannot move to '{new_status}' from its current state."
+                )
+        self._changed(job_id, new_status)
+
+    def record_result(
+        self,
+        job_id: str,
+        provider: str,
+        status: str,
+        output_path: str | None = None,
+        error: str | None = None,
+    ):
+        """Stores the outcome of one provider's work on a job."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_results VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, provider, status, output_path, error, time.time()),
+            )
+
+    def update_progress(
+        self,
+        job_id: str,
+        provider: str,
+        tokens: int,
+        tokens_per_second: float | None = None,
+        partial_path: str | None = None,
+    ):
+        """Stores how much of a provider's streamed output has been received so far."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_progress VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    provider,
+                    tokens,
+                    tokens_per_second,
+                    partial_path,
+                    time.time(),
+                ),
+            )
+
+    def get_progress(self, job_id: str) -> dict:
+        """Returns {provider: progress} for a job's streamed outputs."""
+        return {
+            row["provider"]: dict(row)
+            for row in self._connection().execute(
+                "SELECT * FROM job_progress WHERE job_id = ?", (job_id,)
+            )
+        }
+
+    def add_stage_time(
+        self, job_id: str, stage: str, cpu_seconds: float, wall_seconds: float
+    ):
+        """Adds one task's CPU and wall time to a job's totals for a document stage."""
+        with self._connection() as conn:
+            conn.execute(
+                """INSERT INTO job_stages VALUES (?, ?, 1, ?, ?)
+                   ON CONFLICT (job_id, stage) DO UPDATE SET
+                       tasks = tasks + 1,
+                       cpu_seconds = cpu_seconds + excluded.cpu_seconds,
+                       wall_seconds = wall_seconds + excluded.wall_seconds""",
+                (job_id, stage, cpu_seconds, wall_seconds),
+            )
+
+    def get_stage_times(self, job_id: str) -> dict:
+        """Returns {stage: {tasks, cpu_seconds, wall_seconds}} for a job."""
+        return {
+            row["stage"]: {
+                "tasks": row["tasks"],
+                "cpu_seconds": row["cpu_seconds"],
+                "wall_seconds": row["wall_seconds"],
+            }
+            for row in self._connection().execute(
+                "SELECT * FROM job_stages WHERE job_id = ?", (job_id,)
+            )
+        }
+
+    def record_dedup(self, job_id: str, report: dict):
+        """
+        Stores a job's deduplication and pass-through report (see
+        pipeline.dedup.DedupPlan).
+        """
+        with self._connection() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO job_dedup (job_id, segments,
+                       unique_segments, duplicate_ratio, source_tokens, unique_tokens,
+                       tokens_saved, updated_at, passthrough_segments,
+                       passthrough_tokens)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    job_id,
+                    report["segments"],
+                    report["unique_segments"],
+                    report["duplicate_ratio"],
+                    report["source_tokens"],
+                    report["unique_tokens"],
+                    report["tokens_saved"],
+                    time.time(),
+                    report.get("passthrough_segments", 0),
+                    report.get("passthrough_tokens", 0),
+                ),
+            )
+
+    def get_dedup(self, job_id: str) -> dict | None:
+        row = (
+            self._connection()
+            .execute("SELECT * FROM job_dedup WHERE job_id = ?", (job_id,))
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def is_known(self, link: str) -> bool:
+        """Returns True if a link is finished or currently queued/processing."""
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT 1 FROM jobs WHERE link = ? AND status IN ({', '.join('?' * 6)})",
+                (link, *TERMINAL_STATUSES, *ACTIVE_STATUSES),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def jobs_with_status(self, status: str, kind: str | None = None) -> list:
+        """Returns all jobs currently in the given status, oldest first."""
+        query = "SELECT * FROM jobs WHERE status = ?"
+        params = [status]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        return [
+            dict(row)
+            for row in self._connection().execute(
+                query + " ORDER BY created_at", params
+            )
+        ]
+
+    def get_job(self, job_id: str) -> dict | None:
+        row = (
+            self._connection()
+            .execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        job = dict(row)
+        job["results"] = {
+            result["provider"]: dict(result)
+            for result in self._connection().execute(
+                "SELECT * FROM job_results WHERE job_id = ?", (job_id,)
+            )
+        }
+        job["progress"] = self.get_progress(job_id)
+        job["dedup"] = self.get_dedup(job_id)
+        job["stages"] = self.get_stage_times(job_id)
+        return job
+
+    def list_jobs(self, limit: int = 1000, updated_since: float = 0) -> list:
+        """Returns the most recently updated jobs, newest first."""
+        return [
+            dict(row)
+            for row in self._connection().execute(
+                "SELECT * FROM jobs WHERE updated_at > ? ORDER BY updated_at DESC LIMIT ?",
+                (updated_since, limit),
+            )
+        ]
+
+    def list_outputs(self, updated_since: float = 0) -> list:
+        """Returns (job_id, provider, output_path) for outputs written after updated_since."""
+        return [
+            tuple(row)
+            for row in self._connection().execute(
+                """SELECT job_id, provider, output_path FROM job_results
+                   WHERE updated_at > ? AND output_path IS NOT NULL""",
+                (updated_since,),
+            )
+        ]
+
+    def source_path(self, job_id: str) -> str | None:
+        row = (
+            self._connection()
+            .execute("SELECT source_path FROM jobs WHERE job_id = ?", (job_id,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def reset_interrupted(self) -> int:
+        """Returns jobs left queued/processing by a crash to pending so they are retried."""
+        with self._connection() as conn:
+            count = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status IN (?, ?)",
+                (PENDING, time.time(), *ACTIVE_STATUSES),
+            ).rowcount
+        if count:
+            logging.warning(f"Job store: {count} interrupted jobs reset to pending.")
+        return count
+
+    def import_legacy_logs(
+        self, processed_log_path: str, manifest_path: str, job_id_from_link
+    ) -> int:
+        """One-time import of processed_jobs.log and the hot folder manifest."""
+        with self._connection() as conn:
+            if conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone():
+                return 0
+            now = time.time()
+            rows = []
+            if os.path.exists(processed_log_path):
+                with open(processed_log_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        link = line.strip()
+                        if link:
+                            job_id = job_id_from_link(link) or link
+                            rows.append((job_id, link, "csv", None, COMPLETED))
+            if os.path.exists(manifest_path):
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if "," in line:
+                            job_id, filepath = line.strip().split(",", 1)
+                            rows.append(
+                                (job_id, None, "hotfolder", filepath, COMPLETED)
+                            )
+            conn.executemany(
+                """INSERT OR IGNORE INTO jobs (job_id, link, kind, source_path, status,
+                       created_at, updated_at, finished_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [row + (now, now, now) for row in rows],
+            )
+        if rows:
+            logging.info(f"Job store: imported {len(rows)} jobs from legacy logs.")
+        return len(rows)
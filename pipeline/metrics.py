@@ -0,0 +1,309 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+
+# name: (type, help). Everything recorded must be declared here.
+METRICS = {
+    "translator_stage_seconds": (
+        "histogram",
+        "Time spent per pipeline stage (parse, prompt, api, regenerate, write).",
+    ),
+    "translator_provider_request_seconds": (
+        "histogram",
+        "Latency of each provider request attempt, by outcome.",
+    ),
+    "translator_queue_wait_seconds": (
+        "histogram",
+        "Time spent waiting for a job worker or a provider concurrency slot.",
+    ),
+    "translator_provider_requests_total": (
+        "counter",
+        "Provider request attempts, by outcome.",
+    ),
+    "translator_provider_retries_total": ("counter", "Provider requests retried."),
+    "translator_provider_errors_total": (
+        "counter",
+        "Failed provider request attempts, by error class.",
+    ),
+    "translator_provider_input_tokens_total": (
+        "counter",
+        "Estimated input tokens sent to each provider.",
+    ),
+    "translator_provider_output_tokens_total": (
+        "counter",
+        "Estimated output tokens received from each provider.",
+    ),
+    "translator_provider_cost_usd_total": (
+        "counter",
+        "Estimated provider spend in US dollars.",
+    ),
+    "translator_cache_requests_total": (
+        "counter",
+        "Translation cache lookups, by result (hit or miss).",
+    ),
+    "translator_bytes_processed_total": (
+        "counter",
+        "Bytes read from source files and written to outputs, by stage.",
+    ),
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metrics:
+    """
+    In-process counters and latency histograms, labelled by stage, provider,
+    outcome, etc.
+
+    render() returns them in the Prometheus text exposition format, so the
+    endpoint started by start_metrics_server() can be scraped as is. With a
+    jsonl_path (see open_jsonl()), every observation is also appended to that
+    file as one JSON line; the file is rolled over to <path>.1 when it reaches
+    max_bytes. Observations are only buffered when recorded, and a background
+    thread writes them every flush_interval seconds, so callers never wait on
+    the disk. A disabled instance records nothing.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: str | None = None,
+        max_bytes: int = 50 * 1024 * 1024,
+        enabled: bool = True,
+        flush_interval: float = 1.0,
+    ):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._pending = []  # JSONL records not yet written
+        self._write_lock = threading.Lock()  # Held while the file is written
+        self._file = None
+        self._stop = threading.Event()
+        self._flusher = None
+        if jsonl_path:
+            self._start_flusher()
+
+    def open_jsonl(self, path: str, max_bytes: int):
+        """Starts appending observations to a JSONL file (created on first write)."""
+        with self._lock:
+            self.jsonl_path = path
+            self.max_bytes = max_bytes
+        self._start_flusher()
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="MetricsFlusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def inc(self, name: str, value: float = 1, job_id: str | None = None, **labels):
+        """
+        Adds value to a counter. job_id is written to the JSONL record only; it
+        is not a label, so series do not grow with the number of jobs.
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if self.jsonl_path:
+                self._pending.append((time.time(), name, value, labels, job_id))
+
+    def observe(self, name: str, seconds: float, job_id: str | None = None, **labels):
+        """Records one observation in a histogram (job_id as for inc())."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts, plus the observation sum
+                histogram = self._histograms[key] = [
+                    [0] * (len(LATENCY_BUCKETS) + 1),
+                    0.0,
+                ]
+            histogram[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram[1] += seconds
+            if self.jsonl_path:
+                self._pending.append((time.time(), name, seconds, labels, job_id))
+
+    def flush(self):
+        """Writes the buffered observations to the JSONL file."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                path, max_bytes = self.jsonl_path, self.max_bytes
+            if not pending or not path:
+                return
+            try:
+                for ts, name, value, labels, job_id in pending:
+                    if self._file is None:
+                        directory = os.path.dirname(path)
+                        if directory:
+                            os.makedirs(directory, exist_ok=True)
+                        self._file = open(path, "a", encoding="utf-8")
+                    record = {"ts": round(ts, 3), "metric": name, "value": value}
+                    record.update(labels)
+                    if job_id:
+                        record["job_id"] = job_id
+                    self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if self._file.tell() >= max_bytes:
+                        self._file.close()
+                        self._file = None
+                        os.replace(path, f"{path}.1")
+                if self._file:
+                    self._file.flush()
+            except OSError as e:
+                logging.warning(f"Could not write metrics to '{path}': {e}")
+                with self._lock:
+                    self.jsonl_path = None
+                    self._pending.clear()
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (list(buckets), total)
+                for key, (buckets, total) in self._histograms.items()
+            }
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = counters if kind == "counter" else histograms
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in keys:
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {series[key]}")
+                    continue
+                buckets, total = series[key]
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    cumulative += count
+                    le = (("le", bound if bound == "+Inf" else f"{bound:g}"),)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Stops the flusher and writes what is still buffered."""
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher:
+            self._stop.set()
+            flusher.join()
+        self.flush()
+        with self._write_lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would otherwise flood the log
+
+
+def start_metrics_server(
+    metrics: Metrics, port: int, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Serves metrics.render() at http://host:port/metrics on a daemon thread."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="MetricsServer", daemon=True
+    ).start()
+    return server
+
+
+def estimated_cost(provider: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated US dollar cost of a request from the configured per-token prices."""
+    prices = config.PROVIDER_COST_PER_MTOK.get(provider, {})
+    return (
+        input_tokens * prices.get("input", 0) + output_tokens * prices.get("output", 0)
+    ) / 1_000_000
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide metrics registry. It is kept in memory only until
+    the service attaches the JSONL file (see core.start_metrics()).
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(enabled=config.METRICS_ENABLED)
+        return _metrics
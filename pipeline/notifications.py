@@ -0,0 +1,140 @@
+import json
+import logging
+import socket
+import threading
+
+SEND_TIMEOUT = 0.5  # A subscriber slower than this is dropped and reconnects
+
+
+class NotificationServer:
+    """
+    Pushes events from the service to every connected review UI, as one JSON
+    object per line over a local TCP socket. Publishing never holds up the job
+    that triggered it for long: a subscriber that cannot take an event within
+    SEND_TIMEOUT is disconnected, and resynchronises when it reconnects.
+    """
+
+    def __init__(self, host: str, port: int):
+        self._socket = socket.create_server((host, port))
+        self.port = self._socket.getsockname()[1]
+        self._lock = threading.Lock()
+        self._subscribers = []
+        threading.Thread(
+            target=self._accept_loop, name="UINotifier", daemon=True
+        ).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return  # Closed
+            conn.settimeout(SEND_TIMEOUT)
+            with self._lock:
+                self._subscribers.append(conn)
+
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: dict):
+        data = (json.dumps(event) + "\n").encode("utf-8")
+        with self._lock:
+            for conn in list(self._subscribers):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    conn.close()
+                    self._subscribers.remove(conn)
+
+    def close(self):
+        try:
+            # Wakes the accept loop; closing alone leaves the port bound until
+            # the blocked accept() returns.
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        with self._lock:
+            for conn in self._subscribers:
+                conn.close()
+            self._subscribers = []
+
+
+class NotificationListener:
+    """
+    Receives a NotificationServer's events on a daemon thread, reconnecting
+    every retry_interval seconds while the service is down.
+
+    version goes up with every event and every connect or disconnect (events
+    may have been missed), so a caller can tell whether anything happened
+    since it last looked by comparing one integer. last_event is the most
+    recent event received, and changed_since() tells which jobs the events
+    after a given version were about.
+    """
+
+    def __init__(self, host: str, port: int, retry_interval: float = 5.0):
+        self.host = host
+        self.port = port
+        self.retry_interval = retry_interval
+        self.version = 0
+        self.connected = False
+        self.last_event = None
+        self._changed = {}  # job_id: version of its latest event
+        self._resynced = 0  # version of the latest connect or disconnect
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn = None
+        threading.Thread(target=self._run, name="UIListener", daemon=True).start()
+
+    def _set_connected(self, connected: bool):
+        with self._lock:
+            if connected != self.connected:
+                self.connected = connected
+                self.version += 1
+                self._resynced = self.version
+
+    def _receive(self, line: str):
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            logging.warning(f"Ignoring malformed UI notification: {line!r}")
+            return
+        with self._lock:
+            self.last_event = event
+            self.version += 1
+            if event.get("job_id"):
+                self._changed[str(event["job_id"])] = self.version
+
+    def changed_since(self, version: int) -> set | None:
+        """
+        Returns the IDs of the jobs with events after version, or None if the
+        connection dropped or was made since then, as events may have been missed.
+        """
+        with self._lock:
+            if self._resynced > version:
+                return None
+            return {job_id for job_id, v in self._changed.items() if v > version}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with socket.create_connection(
+                    (self.host, self.port), timeout=self.retry_interval
+                ) as conn:
+                    conn.settimeout(None)
+                    self._conn = conn
+                    self._set_connected(True)
+                    for line in conn.makefile("r", encoding="utf-8"):
+                        self._receive(line)
+            except OSError:
+                pass
+            self._conn = None
+            self._set_connected(False)
+            self._stop.wait(self.retry_interval)
+
+    def stop(self):
+        self._stop.set()
+        conn = self._conn
+        if conn:
+            conn.shutdown(socket.SHUT_RDWR)
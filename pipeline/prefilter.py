@@ -0,0 +1,80 @@
+import re
+
+# Whole-segment patterns that never need a translator: numbers, dates, times
+# and amounts; URLs; e-mail addresses; codes and IDs (one token containing a
+# digit); dotted abbreviations like U.S.; formulas stored as text; and
+# strings without any letters or digits. Bare acronyms like USD are only
+# skipped if they are in the filter's allowlist: OPEN or NAME are words.
+NON_PROSE = re.compile(
+    r"""
+    [-+(]?[$€£¥]?[0-9][0-9\s.,:/'()%$€£¥+-]*
+    | (?:https?://|ftp://|www\.)\S+
+    | [\w.+-]+@[\w-]+(?:\.[\w-]+)+
+    | (?=\S*[0-9])[A-Za-z0-9][A-Za-z0-9_./#:-]*
+    | (?:[A-Z]\.){2,}
+    | =[A-Z][A-Z0-9.]*\(.*
+    | [\W_]+
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Scripts that identify a language on sight. Languages written in Latin script
+# (English, German, ...) cannot be told apart this cheaply and have no entry.
+SCRIPTS = {
+    "japanese": "぀-ヿㇰ-ㇿ㐀-䶿一-鿿ｦ-ﾟ",
+    "chinese": "㐀-䶿一-鿿",
+    "korean": "ᄀ-ᇿ㄰-㆏가-힯",
+    "russian": "Ѐ-ӿ",
+    "ukrainian": "Ѐ-ӿ",
+    "greek": "Ͱ-Ͽ",
+    "arabic": "؀-ۿ",
+    "hebrew": "֐-׿",
+    "thai": "฀-๿",
+}
+LATIN_LETTER = re.compile(r"[A-Za-zÀ-ɏ]")
+
+
+class SegmentFilter:
+    """
+    Decides locally which segments are worth sending to a translator.
+
+    A segment passes through unchanged if, once stripped, it matches NON_PROSE
+    or is one of the given acronyms (like N/A or USD), or if it is already written in the target language's script. The script
+    check is only made when it is unambiguous: a non-Latin source and a Latin
+    target (no source-script characters means the text is not source prose),
+    or a Latin source and a non-Latin target (target-script text without Latin
+    letters).
+    """
+
+    def __init__(
+        self,
+        source_language: str | None,
+        target_language: str | None,
+        acronyms=(),
+    ):
+        self._acronyms = frozenset(acronyms)
+        source = SCRIPTS.get((source_language or "").lower())
+        target = SCRIPTS.get((target_language or "").lower())
+        self._source_script = None
+        self._target_script = None
+        if source and not target and target_language:
+            self._source_script = re.compile(f"[{source}]")
+        elif target and not source and source_language:
+            self._target_script = re.compile(f"[{target}]")
+
+    def passthrough(self, text: str) -> bool:
+        stripped = text.strip()
+        if (
+            not stripped
+            or stripped in self._acronyms
+            or NON_PROSE.fullmatch(stripped)
+        ):
+            return True
+        if self._source_script:
+            return not self._source_script.search(stripped)
+        if self._target_script:
+            return bool(
+                self._target_script.search(stripped)
+                and not LATIN_LETTER.search(stripped)
+            )
+        return False
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import OrderedDict
+
+PREVIEW_SUFFIX = ".txt"
+TEXT_EXTENSIONS = (".txt", ".md")
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def preview_path(output_path: str, preview_dir: str) -> str:
+    """Where the plain-text preview of an output file is kept."""
+    return os.path.join(preview_dir, os.path.basename(output_path) + PREVIEW_SUFFIX)
+
+
+def write_preview(output_path: str, text: str, preview_dir: str):
+    """
+    Writes the text of a regenerated output next to it, so the review UI can
+    show it without parsing the document. Written after the output, so a
+    preview older than its output is stale.
+    """
+    os.makedirs(preview_dir, exist_ok=True)
+    path = preview_path(output_path, preview_dir)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def read_preview(output_path: str, preview_dir: str) -> str | None:
+    """Returns the output's preview text, or None if it has none or it is stale."""
+    path = preview_path(output_path, preview_dir)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(output_path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def paginate(text: str, page_chars: int) -> list:
+    """
+    Splits text into pages of at most page_chars characters, breaking after a
+    newline where there is one in the page.
+    """
+    pages = []
+    start = 0
+    while len(text) - start > page_chars:
+        end = text.rfind("\n", start, start + page_chars) + 1
+        if end <= start:
+            end = start + page_chars
+        pages.append(text[start:end])
+        start = end
+    pages.append(text[start:])
+    return pages
+
+
+def tail_lines(path: str, count: int) -> str:
+    """Returns the last count lines of a file, reading backwards from its end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # One more newline than lines wanted, unless the file ends without one.
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines(keepends=True)[-count:]
+    return b"".join(lines).decode("utf-8", errors="replace")
+
+
+class PreviewCache:
+    """
+    A thread-safe LRU of rendered previews, keyed by file path and validated
+    against the file's mtime and size, so an entry is rebuilt once the file
+    changes. It holds at most max_entries previews and about max_chars
+    characters of text in total; the least recently used are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 32, max_chars: int = 200_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, load, size_of=len):
+        """
+        Returns the cached value for path, or calls load(path) and caches it.
+        size_of(value) is the value's size counted against max_chars.
+        """
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = load(path)
+        size = size_of(value)
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self._chars -= old[2]
+            self._entries[path] = (key, value, size)
+            self._chars += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._chars > self.max_chars
+            ):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._chars -= evicted
+        return value
@@ -0,0 +1,167 @@
+import logging
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import config
+
+
+class StageError(Exception):
+    """Raised when a document stage could not run to completion in a worker."""
+
+
+class StageTimeout(StageError):
+    pass
+
+
+class WorkerCrashed(StageError):
+    pass
+
+
+def _timed_call(func, *args) -> tuple:
+    """Runs in the worker: returns (result, CPU seconds the call used)."""
+    start = time.process_time()
+    result = func(*args)
+    return result, time.process_time() - start
+
+
+def _timed_inline(func, *args) -> tuple:
+    start = time.thread_time()
+    result = func(*args)
+    return result, time.thread_time() - start
+
+
+class DocumentWorkers:
+    """
+    Runs CPU-bound document stages (parsing, regeneration) in worker processes,
+    so zip and XML work does not hold the GIL the provider threads need.
+
+    Workers are spawned, not forked, because the service is multi-threaded. A
+    task that exceeds its timeout has its pool terminated, and the tasks that
+    were sharing the pool are run again on a fresh one; that does not count as
+    a crash. A worker that crashes breaks only the pool, never the service,
+    and its tasks are retried once. max_workers=0 runs stages inline in the
+    calling thread.
+    """
+
+    def __init__(self, max_workers: int, timeout: float | None = None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool = None
+        self._terminated = weakref.WeakSet()  # Pools killed for a hung task
+        self._stats = {}
+        # Tasks wait for a free worker here, so the timeout only counts run time.
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor, hung: bool = False):
+        """Terminates a hung or broken pool; the next task starts a new one."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            if hung:
+                self._terminated.add(pool)
+        # ProcessPoolExecutor has no public way to kill busy workers (before 3.14).
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self, stage: str, **deltas):
+        with self._lock:
+            stats = self._stats.setdefault(
+                stage,
+                {
+                    "tasks": 0,
+                    "cpu_seconds": 0.0,
+                    "wall_seconds": 0.0,
+                    "timeouts": 0,
+                    "crashes": 0,
+                },
+            )
+            for key, value in deltas.items():
+                stats[key] += value
+
+    def run(self, stage: str, func, *args) -> tuple:
+        """
+        Runs func(*args) in a worker and returns (result, cpu_seconds,
+        wall_seconds). func and its arguments must be picklable. Raises
+        StageTimeout or WorkerCrashed; exceptions raised by func propagate.
+        """
+        start = time.monotonic()
+        if self.max_workers <= 0:
+            result, cpu_seconds = _timed_inline(func, *args)
+        else:
+            result, cpu_seconds = self._run_in_pool(stage, func, *args)
+        wall_seconds = time.monotonic() - start
+        self._record(stage, tasks=1, cpu_seconds=cpu_seconds, wall_seconds=wall_seconds)
+        return result, cpu_seconds, wall_seconds
+
+    def _run_in_pool(self, stage: str, func, *args) -> tuple:
+        crashed = False
+        while True:
+            with self._slots:
+                pool = self._get_pool()
+                try:
+                    future = pool.submit(_timed_call, func, *args)
+                except RuntimeError:  # Including BrokenProcessPool
+                    # Broken or recycled before this task reached it, so it
+                    # is not this task's fault; a fresh pool is used next.
+                    self._recycle(pool)
+                    continue
+                try:
+                    return future.result(timeout=self.timeout)
+                except FutureTimeout:
+                    self._recycle(pool, hung=True)
+                    timed_out = True
+                except (BrokenProcessPool, CancelledError):
+                    self._recycle(pool)
+                    timed_out = False
+            if timed_out:
+                self._record(stage, timeouts=1)
+                raise StageTimeout(f"{stage} did not finish within {self.timeout}s.")
+            if pool in self._terminated:
+                continue  # Killed with another task that hung; not this one's fault
+            # The pool broke; that may have been another task's crash, so
+            # retry once before blaming this task.
+            if crashed:
+                self._record(stage, crashes=1)
+                logging.error(f"A {stage} worker crashed while running a task.")
+                raise WorkerCrashed(f"{stage} worker process crashed.")
+            crashed = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._stats.items()}
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def get_document_workers() -> DocumentWorkers:
+    """Returns the process-wide document worker pool configured from config."""
+    global _workers
+    with _workers_lock:
+        if _workers is None:
+            _workers = DocumentWorkers(
+                config.DOCUMENT_WORKERS, config.DOCUMENT_TASK_TIMEOUT
+            )
+        return _workers
@@ -0,0 +1,130 @@
+import logging
+import os
+import re
+import threading
+import time
+from .chunking import estimate_tokens
+
+SEGMENT_MARKUP = re.compile(r'<seg id="\d+">|</seg>')
+PARTIAL_EXTENSION = ".partial"
+
+
+def partial_output_path(outputs_dir: str, job_id: str, service: str) -> str:
+    return os.path.join(outputs_dir, f"job_{job_id}_{service}{PARTIAL_EXTENSION}")
+
+
+class StreamProgress:
+    """
+    Collects one provider's streamed output for a job and makes it visible
+    while the job is still running.
+
+    Each request streams into its own slot (keyed by its position in the
+    document), so concurrent chunks never interleave. A background thread
+    rewrites the .partial file with the slots in document order and reports
+    tokens received and tokens/sec to the job store every flush_interval
+    seconds; provider streams only append to memory and never wait on disk.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        service: str,
+        partial_path: str,
+        store=None,
+        flush_interval: float = 1.0,
+    ):
+        self.job_id = job_id
+        self.service = service
+        self.partial_path = partial_path
+        self.store = store
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._tokens = 0
+        self._first_token_at = None
+        self._dirty = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> "StreamProgress":
+        self._thread = threading.Thread(
+            target=self._flush_loop, name=f"Stream-{self.service}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def sink(self, key):
+        """Returns an on_text callback that streams into the slot for key."""
+
+        def on_text(text: str | None):
+            with self._lock:
+                if text is None:  # A new attempt starts; drop the previous one
+                    self._slots[key] = []
+                    return
+                if self._first_token_at is None:
+                    self._first_token_at = time.monotonic()
+                self._slots.setdefault(key, []).append(text)
+                self._tokens += estimate_tokens(text)
+                self._dirty = True
+
+        return on_text
+
+    def complete(self, key, text: str):
+        """Replaces a slot's streamed text with the request's final result."""
+        with self._lock:
+            self._slots[key] = [text, "\n\n"]
+            self._dirty = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            elapsed = (
+                time.monotonic() - self._first_token_at if self._first_token_at else 0
+            )
+            return {
+                "tokens": self._tokens,
+                "tokens_per_second": self._tokens / elapsed if elapsed else None,
+            }
+
+    def _render(self) -> str:
+        with self._lock:
+            self._dirty = False
+            text = "".join("".join(self._slots[key]) for key in sorted(self._slots))
+        return SEGMENT_MARKUP.sub(
+            lambda match: "\n\n" if match.group(0) == "</seg>" else "", text
+        )
+
+    def flush(self):
+        text = self._render()
+        temp_path = f"{self.partial_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, self.partial_path)
+            if self.store is not None:
+                stats = self.stats()
+                self.store.update_progress(
+                    self.job_id,
+                    self.service,
+                    stats["tokens"],
+                    stats["tokens_per_second"],
+                    self.partial_path,
+                )
+        except Exception as e:
+            logging.warning(
+                f"Could not write partial output '{self.partial_path}': {e}"
+            )
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+
+    def close(self, keep_partial: bool = False):
+        """Stops flushing; the .partial file is removed unless keep_partial is set."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+        if keep_partial:
+            self.flush()
+        elif os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
@@ -0,0 +1,10 @@
+def regenerate_all(regenerator, document, outputs: list) -> list:
+    """
+    Runs regenerator(document, translations, output_path) for each
+    (translations, output_path) pair, in order, and returns their statuses.
+    Run as one worker task per job, so the original is loaded only once.
+    """
+    return [
+        regenerator(document, translations, output_path)
+        for translations, output_path in outputs
+    ]
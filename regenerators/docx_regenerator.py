@@ -1,26 +1,21 @@
-from docx import Document
+from fetchers.document_ir import DocumentIR
 
 
-def create_docx_from_text(
-    original_filepath: str, translated_text: str, output_filepath: str
-):
+def create_docx(document: DocumentIR, translations: list, output_filepath: str):
     """
-    Creates a new .docx file with the translated text, preserving paragraph breaks.
+    Creates a new .docx file by replacing each paragraph of the original with
+    its translation (translations[i] belongs to document.segments[i]).
 
-    Note: This is a simple regeneration. It does not preserve advanced formatting like
-    bold, italics, or tables. That requires a more complex, style-mapping approach.
+    Note: Paragraph styles are kept, but run-level formatting like bold or
+    italics within a paragraph is not; that requires a style-mapping approach.
     """
     try:
-        # Create a new document
-        new_doc = Document()
+        doc = document.original()
+        paragraphs = doc.paragraphs
+        for segment, translation in zip(document.segments, translations):
+            paragraphs[segment.location["paragraph"]].text = translation
 
-        # Split the translated text back into paragraphs
-        translated_paragraphs = translated_text.split("\n\n")
-
-        for para in translated_paragraphs:
-            new_doc.add_paragraph(para)
-
-        new_doc.save(output_filepath)
+        doc.save(output_filepath)
         return f"Successfully created {output_filepath}"
     except Exception as e:
         return f"Error: Failed to regenerate .docx file. {e}"
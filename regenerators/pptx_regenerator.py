@@ -1,23 +1,22 @@
-from pptx import Presentation
+from fetchers.document_ir import DocumentIR
 
 
-def create_pptx_from_text(
-    original_filepath: str, translated_text: str, output_filepath: str
-):
+def create_pptx(document: DocumentIR, translations: list, output_filepath: str):
     """
-    Creates a new .pptx file by replacing text in the original with translated text.
+    Creates a new .pptx file by replacing the text of each shape in the original
+    with its translation (translations[i] belongs to document.segments[i]).
     """
     try:
-        prs = Presentation(original_filepath)
-        translated_paragraphs = translated_text.split("\n\n")
-        para_index = 0
-
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    if para_index < len(translated_paragraphs):
-                        shape.text = translated_paragraphs[para_index]
-                        para_index += 1
+        prs = document.original()
+        slides = list(prs.slides)
+        shapes = {}
+        for segment, translation in zip(document.segments, translations):
+            slide_index = segment.location["slide"]
+            if slide_index not in shapes:
+                shapes[slide_index] = {
+                    shape.shape_id: shape for shape in slides[slide_index].shapes
+                }
+            shapes[slide_index][segment.location["shape_id"]].text = translation
 
         prs.save(output_filepath)
         return f"Successfully created {output_filepath}"
@@ -1,26 +1,144 @@
-import openpyxl
+import logging
+import os
+import posixpath
+import re
+import shutil
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.xml.constants import PKG_REL_NS, REL_NS, SHEET_MAIN_NS
+from fetchers.document_ir import DocumentIR, is_large_workbook
 
+CELL = re.compile(rb"<c\b([^>]*?)(/>|>.*?</c>)", re.DOTALL)
+CELL_REF = re.compile(rb'\br="([A-Z]+[0-9]+)"')
+CELL_TYPE = re.compile(rb'\s+t="[^"]*"')
+ROW_END = b"</row>"
+BLOCK_SIZE = 1 << 20
 
-def create_xlsx_from_text(
-    original_filepath: str, translated_text: str, output_filepath: str
-):
+
+def create_xlsx(document: DocumentIR, translations: list, output_filepath: str):
     """
-    Creates a new .xlsx file by replacing string cell values with translated text.
+    Creates a new .xlsx file by replacing string cell values in the original
+    with their translations (translations[i] belongs to document.segments[i]).
     """
+    if is_large_workbook(document.source_path):
+        try:
+            if patch_worksheets(document, translations, output_filepath):
+                return f"Successfully created {output_filepath}"
+            logging.warning("Could not stream-patch every cell, loading in full.")
+        except Exception as e:
+            logging.warning(
+                f"Streaming .xlsx regeneration failed, loading in full: {e}"
+            )
     try:
-        wb = openpyxl.load_workbook(original_filepath)
-        translated_texts = translated_text.split("\n\n")
-        text_index = 0
-
-        for sheet in wb.worksheets:
-            for row in sheet.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str):
-                        if text_index < len(translated_texts):
-                            cell.value = translated_texts[text_index]
-                            text_index += 1
+        wb = document.original()
+        for segment, translation in zip(document.segments, translations):
+            location = segment.location
+            wb[location["sheet"]][location["cell"]].value = translation
 
         wb.save(output_filepath)
         return f"Successfully created {output_filepath}"
     except Exception as e:
         return f"Error: Failed to regenerate .xlsx file. {e}"
+
+
+def _sheet_parts(source: zipfile.ZipFile) -> dict:
+    """Maps each sheet title to its worksheet part in the .xlsx package."""
+    workbook = ElementTree.fromstring(source.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(source.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship")
+    }
+    parts = {}
+    for sheet in workbook.iter(f"{{{SHEET_MAIN_NS}}}sheet"):
+        target = targets[sheet.get(f"{{{REL_NS}}}id")]
+        parts[sheet.get("name")] = (
+            target.lstrip("/")
+            if target.startswith("/")
+            else posixpath.normpath(posixpath.join("xl", target))
+        )
+    return parts
+
+
+def _patch_rows(rows: bytes, translated: dict, applied: list) -> bytes:
+    def replace(match):
+        attributes = match.group(1)
+        ref = CELL_REF.search(attributes)
+        text = translated.get(ref.group(1).decode()) if ref else None
+        if text is None:
+            return match.group(0)
+        applied[0] += 1
+        text = escape(ILLEGAL_CHARACTERS_RE.sub("", text)).encode("utf-8")
+        attributes = CELL_TYPE.sub(b"", attributes)
+        return (
+            b"<c"
+            + attributes
+            + b' t="inlineStr"><is><t xml:space="preserve">'
+            + text
+            + b"</t></is></c>"
+        )
+
+    return CELL.sub(replace, rows)
+
+
+def _patch_sheet(source, target, translated: dict) -> int:
+    """
+    Streams a worksheet part from source to target a block of whole rows at a
+    time, rewriting each translated cell as an inline string. Returns the
+    number of cells rewritten.
+    """
+    applied = [0]
+    pending = b""
+    for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+        pending += block
+        end = pending.rfind(ROW_END)
+        if end == -1:
+            continue
+        end += len(ROW_END)
+        target.write(_patch_rows(pending[:end], translated, applied))
+        pending = pending[end:]
+    target.write(_patch_rows(pending, translated, applied))
+    return applied[0]
+
+
+def patch_worksheets(
+    document: DocumentIR, translations: list, output_filepath: str
+) -> bool:
+    """
+    Regenerates a workbook without loading it: each worksheet's XML is streamed
+    row by row, translated cells are rewritten in place as inline strings (so
+    their styles are kept), and every other part is copied unchanged.
+
+    Returns False, writing nothing, if some translated cell could not be found,
+    e.g. because the file uses an unusual XML layout; the caller must then
+    fall back to a full load.
+    """
+    by_sheet = {}
+    for segment, translation in zip(document.segments, translations):
+        location = segment.location
+        by_sheet.setdefault(location["sheet"], {})[location["cell"]] = translation
+    temp_path = f"{output_filepath}.tmp"
+    try:
+        with zipfile.ZipFile(document.source_path) as source, zipfile.ZipFile(
+            temp_path, "w", zipfile.ZIP_DEFLATED
+        ) as target:
+            parts = {
+                part: by_sheet.get(title, {})
+                for title, part in _sheet_parts(source).items()
+            }
+            applied = 0
+            for info in source.infolist():
+                with source.open(info) as part, target.open(info, "w") as out:
+                    if parts.get(info.filename):
+                        applied += _patch_sheet(part, out, parts[info.filename])
+                    else:
+                        shutil.copyfileobj(part, out, BLOCK_SIZE)
+        if applied != len(document.segments):
+            return False
+        os.replace(temp_path, output_filepath)
+        return True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -3,7 +3,13 @@ import logging
 import colorlog
 from config import DUMMY_MODE, OPERATION_MODE, PRIMARY_MODEL
 
-from core import csv_handshake_worker, folder_monitor_worker
+from core import (
+    csv_handshake_worker,
+    folder_monitor_worker,
+    shutdown_job_queue,
+    start_metrics,
+    start_ui_notifier,
+)
 
 # --- Setup Advanced, Colored Logging for this entry point ---
 logger = logging.getLogger()
@@ -66,6 +72,8 @@ if __name__ == "__main__":
         logger.warning("DUMMY MODE IS ACTIVE. NO REAL API CALLS WILL BE MADE.")
 
     # Start the threads
+    start_metrics()
+    start_ui_notifier()
     csv_thread.start()
     folder_thread.start()
 
@@ -78,4 +86,5 @@ if __name__ == "__main__":
         # Wait for the main worker to finish its current loop and shut down gracefully
         csv_thread.join()
 
+    shutdown_job_queue()
     logger.info("--- Application Shut Down ---")
@@ -2,7 +2,7 @@
 import threading
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, Log
-from core import csv_handshake_worker, folder_monitor_worker
+from core import csv_handshake_worker, folder_monitor_worker, shutdown_job_queue
 
 
 class TUI(App):
@@ -27,6 +27,7 @@ class TUI(App):
         """Signal workers to stop when the TUI exits."""
         self.stop_event.set()
         self.csv_thread.join()
+        shutdown_job_queue()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,26 @@
 import streamlit as st
 import os
-import re
 import time
-from collections import defaultdict
 
-from fetchers.file_fetcher import get_text_from_file
-from config import UI_RELOAD_SIGNAL_PATH, CONFIG_RELOAD_SIGNAL_PATH
+from fetchers.file_fetcher import get_text_from_file, read_document
+from pipeline.job_index import JobIndex
+from pipeline.job_store import JobStore
+from pipeline.notifications import NotificationListener
+from pipeline.previews import (
+    TEXT_EXTENSIONS,
+    PreviewCache,
+    paginate,
+    read_preview,
+    tail_lines,
+)
+from config import CONFIG_RELOAD_SIGNAL_PATH
 import config as app_config
 
 # --- Configuration ---
 OUTPUTS_DIR = "outputs"
 UPLOADS_DIR = "uploads"
-HOTFOLDER_MANIFEST_PATH = "monitor/hotfolder_manifest.log"
 APP_LOG_PATH = "app.log"
+SEGMENT_PAGE_ROWS = 1000
 
 st.set_page_config(layout="wide", page_title="Translation Review")
 
@@ -20,56 +28,155 @@ st.set_page_config(layout="wide", page_title="Translation Review")
 if "show_log" not in st.session_state:
     st.session_state.show_log = False
 
-# --- Signal Handling ---
-if os.path.exists(UI_RELOAD_SIGNAL_PATH):
-    try:
-        os.remove(UI_RELOAD_SIGNAL_PATH)
-        st.cache_data.clear()
-        st.toast("New job results detected. Refreshing...")
-    except OSError as e:
-        st.error(f"Error handling reload signal: {e}")
-
 
 # --- Helper Functions ---
-@st.cache_data
-def get_job_data():
-    job_files = defaultdict(list)
-    if os.path.exists(OUTPUTS_DIR):
-        for f in os.listdir(OUTPUTS_DIR):
-            match = re.search(r"job_([\w\d.-]+)_", f)
-            if match:
-                job_files[match.group(1)].append(f)
-    manifest = {}
-    if os.path.exists(HOTFOLDER_MANIFEST_PATH):
-        with open(HOTFOLDER_MANIFEST_PATH, "r", encoding="utf-8") as f:
-            for line in f:
-                if "," in line:
-                    job_id, filepath = line.strip().split(",", 1)
-                    manifest[job_id] = filepath
-    return job_files, manifest
-
-
-def find_source_file(job_id, hotfolder_manifest):
-    source_filepath = None
-    if job_id.startswith("hotfolder_"):
-        source_filepath = hotfolder_manifest.get(job_id)
+# The store, job index and listener are shared by every browser session.
+@st.cache_resource
+def get_job_store():
+    return JobStore(app_config.JOB_STORE_PATH)
+
+
+@st.cache_resource
+def get_job_index():
+    return JobIndex(get_job_store(), OUTPUTS_DIR)
+
+
+@st.cache_resource
+def get_listener():
+    if not app_config.UI_NOTIFY_PORT:
+        return None
+    return NotificationListener(app_config.UI_NOTIFY_HOST, app_config.UI_NOTIFY_PORT)
+
+
+@st.cache_resource
+def get_preview_cache():
+    return PreviewCache(
+        app_config.UI_PREVIEW_CACHE_ENTRIES,
+        int(app_config.UI_PREVIEW_CACHE_MB * 1024 * 1024),
+    )
+
+
+def load_output_pages(path):
+    """The output's text in pages, from its preview sidecar where there is one."""
+    if path.endswith(TEXT_EXTENSIONS):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
     else:
+        text = read_preview(path, app_config.PREVIEW_DIR)
+        if text is None:  # Outputs written before previews existed
+            text = get_text_from_file(path)
+    return paginate(text, app_config.UI_PREVIEW_PAGE_CHARS)
+
+
+def load_source(path):
+    document, text = read_document(path)
+    segments = None
+    if document:
+        segments = [(segment.id, segment.text) for segment in document.segments]
+    return segments, paginate(text, app_config.UI_PREVIEW_PAGE_CHARS)
+
+
+def output_pages(path):
+    return get_preview_cache().get(
+        path, load_output_pages, size_of=lambda pages: sum(map(len, pages))
+    )
+
+
+def source_preview(path):
+    # Segment texts are held twice (table and pages), so both are counted.
+    return get_preview_cache().get(
+        path, load_source, size_of=lambda value: 2 * sum(map(len, value[1]))
+    )
+
+
+def page_picker(items: list, key: str, label: str = "Page") -> int:
+    """Shows a page selector when there is more than one page; returns the index."""
+    if len(items) <= 1:
+        return 0
+    return st.number_input(f"{label} (of {len(items)})", 1, len(items), 1, key=key) - 1
+
+
+def listener_version():
+    listener = get_listener()
+    return listener.version if listener else 0
+
+
+@st.fragment(run_every=app_config.UI_REFRESH_INTERVAL)
+def watch_jobs(shown_jobs: set, selected_job_id):
+    """
+    Reruns the page when a job is added or the selected job changes. While the
+    service's notifications are connected this only looks at the jobs they
+    name; otherwise the job store's recent changes are read every
+    UI_POLL_INTERVAL seconds.
+    """
+    listener = get_listener()
+    seen, version = st.session_state.seen_event, listener_version()
+    changed = None
+    if listener and listener.connected:
+        if version == seen:
+            return
+        changed = listener.changed_since(seen)
+    elif time.monotonic() - st.session_state.last_poll < app_config.UI_POLL_INTERVAL:
+        return
+    st.session_state.seen_event = version
+    if changed is not None:
+        if selected_job_id in changed or changed - shown_jobs:
+            st.rerun()
+        return
+
+    # Not connected, or events were missed around a reconnect
+    st.session_state.last_poll = time.monotonic()
+    index = get_job_index()
+    index.refresh()
+    changed = index.changed_since(st.session_state.index_version)
+    st.session_state.index_version = index.version
+    if selected_job_id in changed or changed - shown_jobs:
+        st.rerun()
+
+
+@st.fragment(run_every=app_config.STREAM_FLUSH_INTERVAL)
+def show_progress(job_id):
+    """Shows each provider's streamed output for a job that is still running."""
+    progress = get_job_store().get_progress(job_id)
+    if not progress:
+        st.info("Waiting for the first response...")
+        return
+    columns = st.columns(len(progress))
+    for column, (provider, row) in zip(columns, sorted(progress.items())):
+        with column:
+            speed = row["tokens_per_second"]
+            st.metric(
+                provider,
+                f"{row['tokens']} tokens",
+                f"{speed:.1f} tokens/s" if speed else None,
+                delta_color="off",
+            )
+            partial_path = row["partial_path"]
+            if partial_path and os.path.exists(partial_path):
+                with open(partial_path, "r", encoding="utf-8") as f:
+                    st.text_area(
+                        provider, f.read(), height=300, label_visibility="collapsed"
+                    )
+
+
+def find_source_path(job_id):
+    source_filepath = get_job_store().source_path(job_id)
+    if not source_filepath and not job_id.startswith("hotfolder_"):
         if os.path.exists(UPLOADS_DIR):
             for f in os.listdir(UPLOADS_DIR):
                 if f.startswith(job_id):
                     source_filepath = os.path.join(UPLOADS_DIR, f)
                     break
     if source_filepath and os.path.exists(source_filepath):
-        return os.path.basename(source_filepath), get_text_from_file(source_filepath)
-    return None, "Source file not found."
+        return source_filepath
+    return None
 
 
 def read_log_file(lines_to_show=50):
     if not os.path.exists(APP_LOG_PATH):
         return "Log file not found."
     try:
-        with open(APP_LOG_PATH, "r", encoding="utf-8") as f:
-            return "".join(f.readlines()[-lines_to_show:])
+        return tail_lines(APP_LOG_PATH, lines_to_show)
     except Exception as e:
         return f"Error reading log file: {e}"
 
@@ -133,46 +240,97 @@ with st.sidebar:
 # --- Main UI Application ---
 st.title("Multi-LLM Translation Review")
 
-all_jobs, hotfolder_manifest = get_job_data()
-job_ids = ["-- Select a Job to Review --"] + sorted(all_jobs.keys(), reverse=True)
+# Read the notification counter first, so an event that arrives during the
+# refresh is handled by the next watch_jobs() run.
+st.session_state.seen_event = listener_version()
+st.session_state.last_poll = time.monotonic()
+job_index = get_job_index()
+job_index.refresh()
+st.session_state.index_version = job_index.version
+indexed_jobs = job_index.job_ids()
+job_ids = ["-- Select a Job to Review --"] + indexed_jobs
 selected_job_id = st.selectbox("Select a Job ID:", job_ids)
 
 if selected_job_id != "-- Select a Job to Review --":
     st.divider()
     st.header(f"Reviewing Job: `{selected_job_id}`")
-    with st.expander("View Original Source Text"):
-        source_filename, source_content = find_source_file(
-            selected_job_id, hotfolder_manifest
+    dedup = get_job_store().get_dedup(selected_job_id)
+    dispatched = dedup["segments"] - dedup["passthrough_segments"] if dedup else 0
+    if dedup and dedup["unique_segments"] < dispatched:
+        st.caption(
+            f"Deduplicated: {dedup['unique_segments']}/{dispatched} segments "
+            f"unique ({dedup['duplicate_ratio']:.0%} duplicates), "
+            f"~{dedup['tokens_saved']} input tokens saved."
+        )
+    if dedup and dedup["passthrough_segments"]:
+        st.caption(
+            f"Pre-filter: {dedup['passthrough_segments']}/{dedup['segments']} segments "
+            f"copied without translation, ~{dedup['passthrough_tokens']} input "
+            "tokens skipped."
         )
-        if source_filename:
-            st.subheader(f"Source: `{source_filename}`")
-            st.text_area("Source Content", source_content, height=300)
+    stages = get_job_store().get_stage_times(selected_job_id)
+    if stages:
+        st.caption(
+            " · ".join(
+                f"{stage}: {times['cpu_seconds']:.2f}s CPU / {times['wall_seconds']:.2f}s wall"
+                for stage, times in sorted(stages.items())
+            )
+        )
+    with st.expander("View Original Source Text"):
+        source_filepath = find_source_path(selected_job_id)
+        if source_filepath:
+            # Parsed once per file; later reruns read the in-memory preview.
+            segments, pages = source_preview(source_filepath)
+            st.subheader(f"Source: `{os.path.basename(source_filepath)}`")
+            page = page_picker(pages, f"source_page_{source_filepath}")
+            st.text_area("Source Content", pages[page], height=300)
+            if segments:
+                st.caption(f"{len(segments)} segments")
+                row_pages = range(0, len(segments), SEGMENT_PAGE_ROWS)
+                start = row_pages[
+                    page_picker(row_pages, f"rows_{source_filepath}", "Segments page")
+                ]
+                st.dataframe(
+                    [
+                        {"id": segment_id, "text": text}
+                        for segment_id, text in segments[
+                            start : start + SEGMENT_PAGE_ROWS
+                        ]
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
         else:
-            st.error(source_content)
-    job_outputs = all_jobs[selected_job_id]
+            st.error("Source file not found.")
+    if job_index.is_running(selected_job_id):
+        st.subheader("⏳ In Progress")
+        show_progress(selected_job_id)
+    job_outputs = [
+        path for path in job_index.outputs(selected_job_id) if os.path.exists(path)
+    ]
     critique_report_file = next(
         (f for f in job_outputs if "CRITIQUE_REPORT" in f), None
     )
     if critique_report_file:
         st.subheader("Critique & Refinement Report")
-        with open(
-            os.path.join(OUTPUTS_DIR, critique_report_file), "r", encoding="utf-8"
-        ) as f:
-            st.markdown(f.read())
+        pages = output_pages(critique_report_file)
+        st.markdown(pages[page_picker(pages, f"page_{critique_report_file}")])
     else:
         st.subheader("Parallel Translation Comparison")
-        gpt_file = next((f for f in job_outputs if "gpt" in f), None)
-        claude_file = next((f for f in job_outputs if "claude" in f), None)
-        gemini_file = next((f for f in job_outputs if "gemini" in f), None)
+        names = {os.path.basename(path): path for path in job_outputs}
+        gpt_file = next((f for f in names if "gpt" in f), None)
+        claude_file = next((f for f in names if "claude" in f), None)
+        gemini_file = next((f for f in names if "gemini" in f), None)
         col1, col2, col3 = st.columns(3)
 
         def display_translation(file, service_name, column):
             with column:
                 st.subheader(f"{service_name}")
                 if file:
-                    content = get_text_from_file(os.path.join(OUTPUTS_DIR, file))
+                    pages = output_pages(names[file])
+                    page = page_picker(pages, f"page_{file}")
                     st.text_area(
-                        file, content, height=500, label_visibility="collapsed"
+                        file, pages[page], height=500, label_visibility="collapsed"
                     )
                 else:
                     st.warning("No output file found.")
@@ -185,5 +343,4 @@ else:
         "Select a job from the dropdown to see results. The UI will update automatically when new jobs are processed."
     )
 
-time.sleep(5)
-st.rerun()
+watch_jobs(set(indexed_jobs), selected_job_id)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from translators.async_engine import AsyncEngine
+
+
+@pytest.fixture
+def engine():
+    engine = AsyncEngine(max_in_flight=50)
+    yield engine
+    engine.shutdown()
+
+
+def test_requests_are_multiplexed_on_one_loop(engine):
+    """Tests that many waiting requests overlap on the loop instead of running in turn."""
+
+    async def request(number):
+        await asyncio.sleep(0.2)
+        return number
+
+    futures = [engine.submit(request(number)) for number in range(500)]
+    start = time.monotonic()
+    assert [future.result() for future in futures] == list(range(500))
+    # 500 requests in batches of 50 take ~2s; one at a time would take 100s.
+    assert time.monotonic() - start < 10
+    stats = engine.stats()
+    assert stats["completed"] == 500 and stats["in_flight"] == 0
+
+
+def test_max_in_flight_is_respected(engine):
+    """Tests that requests beyond max_in_flight wait for a free slot."""
+    peak = 0
+    running = 0
+
+    async def request():
+        nonlocal peak, running
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for future in [engine.submit(request()) for _ in range(200)]:
+        future.result()
+    assert peak == 50
+
+
+def test_timeout_and_errors_reach_the_caller(engine):
+    """Tests that timeouts cancel the request and exceptions propagate to run()."""
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def broken():
+        raise ValueError("bad request")
+
+    with pytest.raises(TimeoutError):
+        engine.run(slow(), timeout=0.05)
+    with pytest.raises(ValueError):
+        engine.run(broken())
+    stats = engine.stats()
+    assert stats["timed_out"] == 1 and stats["failed"] == 1
+
+
+def test_sync_callers_share_the_engine(engine):
+    """Tests the blocking wrapper from many threads at once."""
+
+    async def double(number):
+        await asyncio.sleep(0.01)
+        return number * 2
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda number: engine.run(double(number)), range(100)))
+    assert results == [number * 2 for number in range(100)]
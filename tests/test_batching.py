@@ -0,0 +1,81 @@
+import config
+from pipeline import document_translator
+from pipeline.batching import SEGMENT_TAG, pack_segments, parse_packed
+from translators import dummy_translator
+
+
+def test_pack_and_parse_round_trip():
+    """Tests that packed segments, including ones with blank lines, parse back by id."""
+    texts = ["Name", "Status\n\nDetails", "N/A"]
+    assert parse_packed(pack_segments(texts), len(texts)) == {
+        1: "Name",
+        2: "Status\n\nDetails",
+        3: "N/A",
+    }
+
+
+def test_parse_packed_drops_missing_unknown_and_duplicate_ids():
+    """Tests that only well-formed, unique, in-range segments are accepted."""
+    response = (
+        '<seg id="1">One</seg>\n<seg id="2"> </seg>\n<seg id="3">Three</seg>'
+        '<seg id="3">Again</seg><seg id="9">Extra</seg>'
+    )
+    assert parse_packed(response, 4) == {1: "One"}
+
+
+def test_only_unparsed_segments_are_re_requested(monkeypatch):
+    """Tests that a response dropping a segment triggers a request for just that one."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+    calls = []
+
+    def flaky_translate(text, target_language, source_language, references=None):
+        calls.append(text)
+        segments = SEGMENT_TAG.findall(text)
+        if len(calls) == 1:
+            segments = segments[:-1]  # The model "forgets" the last segment
+        if not segments:
+            return f"FR:{text}"
+        return "\n".join(f'<seg id="{n}">FR:{body}</seg>' for n, body in segments)
+
+    cells = ["Name", "Status", "Total", "Notes"]
+    result = document_translator.translate_document(
+        "gpt", flaky_translate, cells, "French", "English"
+    )
+    assert result == ["FR:Name", "FR:Status", "FR:Total", "FR:Notes"]
+    assert len(calls) == 2
+    assert calls[1] == "Notes"
+
+
+def test_many_short_segments_use_few_requests(monkeypatch):
+    """Tests that thousands of short cells are packed into a handful of requests."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+    monkeypatch.setattr(config, "BATCH_MAX_SEGMENTS", 500)
+    calls = []
+
+    def fake_translate(text, target_language, source_language, references=None):
+        calls.append(text)
+        return SEGMENT_TAG.sub(lambda m: f'<seg id="{m.group(1)}">x</seg>', text)
+
+    cells = [f"Cell {i}" for i in range(2000)]
+    result = document_translator.translate_document(
+        "gemini", fake_translate, cells, "French", "English"
+    )
+    assert result == ["x"] * 2000
+    assert len(calls) <= 10
+
+
+def test_dummy_provider_answers_packed_requests(monkeypatch):
+    """Tests that DUMMY mode keeps the segment tags, so a batch is one request."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+    monkeypatch.setattr(dummy_translator.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return dummy_translator.dummy_translate_with_gpt(*args, **kwargs)
+
+    result = document_translator.translate_document(
+        "gpt", counted, ["Name", "Status", "Total"], "French", "English"
+    )
+    assert len(calls) == 1
+    assert len(result) == 3 and all("[DUMMY GPT]" in text for text in result)
@@ -0,0 +1,46 @@
+import hashlib
+from benchmarks.corpus import generate_corpus
+from benchmarks.fake_provider import FakeProvider, LatencyProfile
+from benchmarks.throughput import percentile
+
+INSTANT = LatencyProfile(median=0, sigma=0, per_1k_tokens=0)
+
+
+def test_percentile_uses_nearest_rank():
+    """Tests that percentiles pick an observed value and handle empty input."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_fake_provider_keeps_packed_segment_tags():
+    """Tests that packed requests come back with every <seg> tag and ID intact."""
+    provider = FakeProvider("gpt", INSTANT)
+    packed = '<seg id="1">完了</seg>\n<seg id="2">対応中</seg>'
+    assert provider.translate(packed, "English", "Japanese") == (
+        '<seg id="1">[gpt] 完了</seg>\n<seg id="2">[gpt] 対応中</seg>'
+    )
+    assert provider.translate("   ", "English") == ""
+
+
+def test_fake_provider_outcomes_are_seeded():
+    """Tests that attempt outcomes depend on the seed, not on call order."""
+    first, second = FakeProvider("claude", INSTANT, 7), FakeProvider("claude", INSTANT, 7)
+    draws = [first._rng(text, 0).random() for text in ("a", "b", "c")]
+    assert [second._rng(text, 0).random() for text in ("c", "b", "a")] == draws[::-1]
+    assert FakeProvider("claude", INSTANT, 8)._rng("a", 0).random() != draws[0]
+
+
+def test_corpus_is_reproducible(tmp_path):
+    """Tests that the same seed writes the same files, cycling through the kinds."""
+
+    def digests(directory, seed):
+        paths = generate_corpus(str(tmp_path / directory), 4, 10, seed, ("txt",))
+        return [hashlib.sha256(open(p, "rb").read()).hexdigest() for p in paths]
+
+    assert digests("a", 1) == digests("b", 1)
+    assert digests("a", 1) != digests("c", 2)
+    paths = generate_corpus(str(tmp_path / "mixed"), 5, 4)
+    assert [p.rsplit(".", 1)[1] for p in paths] == ["docx", "pptx", "xlsx", "txt", "docx"]
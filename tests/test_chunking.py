@@ -0,0 +1,105 @@
+import threading
+import time
+import config
+from pipeline import document_translator
+from pipeline.batching import SEGMENT_TAG
+from pipeline.chunking import (
+    TAG_OVERHEAD_TOKENS,
+    chunk_units,
+    estimate_tokens,
+    split_oversized,
+)
+from translators.errors import TruncatedError
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    """Tests that CJK text is estimated per character and Latin text per ~4 chars."""
+    assert estimate_tokens("これはテストです") == 8
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_chunk_units_respects_budget_and_order():
+    """Tests that units are packed in order without exceeding the budget."""
+    units = [(i, "word " * 4) for i in range(10)]
+    chunks = chunk_units(units, budget=30)
+    assert 1 < len(chunks) < 10
+    assert [key for chunk in chunks for key, _ in chunk] == list(range(10))
+    for chunk in chunks:
+        assert (
+            len(chunk) == 1
+            or sum(estimate_tokens(text) + TAG_OVERHEAD_TOKENS for _, text in chunk)
+            <= 30
+        )
+
+
+def test_split_oversized_round_trips_separators():
+    """Tests that an oversized segment splits into pieces that rejoin to the original."""
+    text = "First sentence here. Second sentence here.\nA second line that is short."
+    pieces = split_oversized(text, budget=8)
+    assert len(pieces) > 1
+    assert "".join(piece + separator for piece, separator in pieces) == text
+
+
+def test_translate_document_chunks_concurrently_and_keeps_order(monkeypatch):
+    """Tests that chunks are translated in parallel and reassembled in source order."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+    monkeypatch.setitem(config.CHUNK_TOKEN_BUDGET, "gpt", 25)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def fake_translate(text, target_language, source_language, references=None):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+        if not SEGMENT_TAG.search(text):
+            return text.upper()
+        return SEGMENT_TAG.sub(
+            lambda m: f'<seg id="{m.group(1)}">{m.group(2).upper()}</seg>', text
+        )
+
+    segments = [f"segment number {i}" for i in range(8)]
+    result = document_translator.translate_document(
+        "gpt", fake_translate, segments, "French", "English"
+    )
+    assert result == [s.upper() for s in segments]
+    assert running["peak"] > 1
+
+
+def test_paragraph_breaks_in_a_translation_are_kept(monkeypatch):
+    """Tests that blank lines inside a segment's translation reach the output."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+
+    def fake_translate(text, target_language, source_language, references=None):
+        return text.replace("Absatz", "Paragraph")
+
+    result = document_translator.translate_document(
+        "gpt", fake_translate, ["Absatz eins\n\nAbsatz zwei"], "English", "German"
+    )
+    assert result == ["Paragraph eins\n\nParagraph zwei"]
+
+
+def test_truncated_responses_are_retried_in_smaller_requests(monkeypatch):
+    """Tests that a response cut off at the output limit is split, not stored."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+    requests = []
+
+    def fake_translate(text, target_language, source_language, references=None):
+        requests.append(text)
+        if len(text) > 60:
+            raise TruncatedError("gpt", "The response was cut off.")
+        if not SEGMENT_TAG.search(text):
+            return text.upper()
+        return SEGMENT_TAG.sub(
+            lambda m: f'<seg id="{m.group(1)}">{m.group(2).upper()}</seg>', text
+        )
+
+    segments = ["short one", "short two", "line one is long\nline two is long too"]
+    segments.append("\n".join(["a long paragraph line"] * 4))
+    result = document_translator.translate_document(
+        "gpt", fake_translate, segments, "French", "English"
+    )
+    assert result == [s.upper() for s in segments]
+    assert len(requests) > 1
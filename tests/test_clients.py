@@ -0,0 +1,85 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from translators.async_engine import AsyncEngine
+from translators.clients import ProviderClients
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_pooled_client_reuses_connections(server):
+    """Tests that sequential requests share one kept-alive connection and are counted."""
+    clients = ProviderClients()
+    engine = AsyncEngine()
+
+    async def fetch_all():
+        http = clients._http_client("gpt")
+        for _ in range(5):
+            response = await http.get(server)
+            assert response.text == "ok"
+        await http.aclose()
+
+    try:
+        engine.run(fetch_all())
+    finally:
+        engine.shutdown()
+    stats = clients.connection_stats()["gpt"]
+    assert stats == {
+        "requests": 5,
+        "new_connections": 1,
+        "reused_connections": 4,
+        "tls_handshakes": 0,
+    }
+
+
+def test_clients_are_shared_per_loop():
+    """Tests that one client is kept per provider and rebuilt for a new event loop."""
+    clients = ProviderClients()
+
+    async def get_client():
+        return clients.get("gpt")
+
+    first = AsyncEngine()
+    try:
+        assert first.run(get_client()) is first.run(get_client())
+        original = first.run(get_client())
+    finally:
+        first.shutdown()
+    second = AsyncEngine()
+    try:
+        assert second.run(get_client()) is not original
+    finally:
+        second.shutdown()
+
+
+def test_untraced_connections_are_reported_unknown():
+    """Tests that Gemini's connection reuse is not reported without a trace hook."""
+    clients = ProviderClients()
+    clients.stats["gemini"].count_request()
+    assert clients.connection_stats()["gemini"] == {
+        "requests": 1,
+        "new_connections": None,
+        "reused_connections": None,
+        "tls_handshakes": None,
+    }
@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pipeline.critique_pipeline import CritiquePipeline
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def reviewer(label, seconds=0.0):
+    def critique(source, translation, target_language, source_language):
+        time.sleep(seconds)
+        return f"{label} on {translation}"
+
+    return critique
+
+
+def test_reviews_start_before_translation_finishes(executor):
+    """Tests that a chunk is reviewed while later chunks are still being added."""
+    reviewed = threading.Event()
+
+    def critique(source, translation, target_language, source_language):
+        reviewed.set()
+        return "ok"
+
+    pipeline = CritiquePipeline(executor, {"gpt": critique}, "English", "Japanese")
+    pipeline.add(0, "eins", "one")
+    assert reviewed.wait(1)
+    pipeline.add(1, "zwei", "two")
+    assert pipeline.results() == {
+        "gpt": "#### Part 1 of 2\n\nok\n\n#### Part 2 of 2\n\nok"
+    }
+
+
+def test_results_are_in_document_order(executor):
+    """Tests that chunk critiques are joined by position, not completion order."""
+    pipeline = CritiquePipeline(
+        executor, {"gemini": reviewer("gemini")}, "English", "Japanese"
+    )
+    pipeline.add(1, "zwei", "two")
+    pipeline.add(0, "eins", "one")
+    report = pipeline.results()["gemini"]
+    assert report.index("on one") < report.index("on two")
+    assert len(pipeline) == 2
+
+
+def test_failed_chunk_fails_the_reviewer(executor):
+    """Tests that an error on any chunk becomes the reviewer's result."""
+
+    def critique(source, translation, target_language, source_language):
+        return "Error: rate limited" if translation == "two" else "ok"
+
+    pipeline = CritiquePipeline(
+        executor,
+        {"gpt": critique, "gemini": reviewer("gemini")},
+        "English",
+        "Japanese",
+    )
+    pipeline.add(0, "eins", "one")
+    pipeline.add(1, "zwei", "two")
+    results = pipeline.results()
+    assert results["gpt"] == "Error: rate limited"
+    assert not results["gemini"].startswith("Error:")
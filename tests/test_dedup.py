@@ -0,0 +1,75 @@
+import pytest
+from pipeline.dedup import DedupPlan
+from pipeline.job_store import JobStore
+from pipeline.prefilter import SegmentFilter
+
+
+def test_repeats_are_sent_once():
+    """Tests that only the first occurrence of each segment is kept for translation."""
+    plan = DedupPlan(["Status", "Offen", "", "Status", "N/A", "N/A", "Offen"])
+    assert plan.unique == ["Status", "Offen", "N/A"]
+    report = plan.report()
+    assert (report["segments"], report["unique_segments"]) == (6, 3)
+    assert report["duplicate_ratio"] == 0.5
+    assert report["tokens_saved"] > 0
+
+
+def test_translations_fan_out_to_every_occurrence():
+    """Tests that expand() restores one translation per original segment."""
+    plan = DedupPlan(["Status", "", "Offen", "Status", " Offen\n"])
+    assert plan.expand(["State", "Open"]) == ["State", "", "Open", "State", " Open\n"]
+
+
+def test_miscounted_translation_is_rejected():
+    """Tests that a translation with the wrong number of parts is not fanned out."""
+    plan = DedupPlan(["Status", "Offen", "Status"])
+    with pytest.raises(ValueError):
+        plan.expand(["State"])
+
+
+def test_segments_with_blank_lines_stay_aligned():
+    """Tests that a segment containing a blank line expands to one translation."""
+    plan = DedupPlan(["Hallo\n\nWelt", "Status", "Hallo\n\nWelt"])
+    assert plan.expand(["Hello\n\nWorld", "State"]) == [
+        "Hello\n\nWorld",
+        "State",
+        "Hello\n\nWorld",
+    ]
+
+
+def test_report_is_stored(tmp_path):
+    """Tests that the dedup report is recorded with the job."""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.register_job("1", "hotfolder")
+    store.record_dedup("1", DedupPlan(["a", "a", "b"]).report())
+    job = store.get_job("1")
+    assert job["dedup"]["unique_segments"] == 2
+
+
+def test_non_translatable_segments_pass_through():
+    """Tests that filtered segments are not sent and are copied verbatim."""
+    segments = ["Preis", "12,50 €", "", "SKU-1234", "Preis", "https://example.com"]
+    plan = DedupPlan(
+        segments, passthrough=SegmentFilter("German", "English").passthrough
+    )
+    assert plan.unique == ["Preis"]
+    assert plan.expand(["Price"]) == [
+        "Price",
+        "12,50 €",
+        "",
+        "SKU-1234",
+        "Price",
+        "https://example.com",
+    ]
+    report = plan.report()
+    assert (report["segments"], report["passthrough_segments"]) == (5, 3)
+    assert report["passthrough_tokens"] > 0
+
+
+def test_repeats_are_kept_without_dedupe():
+    """Tests that dedupe=False still filters but sends every repeat."""
+    plan = DedupPlan(
+        ["Preis", "42", "Preis"], passthrough=lambda s: s == "42", dedupe=False
+    )
+    assert plan.unique == ["Preis", "Preis"]
+    assert plan.expand(["Price", "Cost"]) == ["Price", "42", "Cost"]
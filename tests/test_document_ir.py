@@ -0,0 +1,190 @@
+import os
+import pickle
+import docx
+import openpyxl
+import pptx
+import pytest
+import config
+from fetchers import document_ir
+from fetchers.document_ir import DocumentCache, parse_document
+from pipeline import document_translator
+from pipeline.batching import SEGMENT_TAG
+from regenerators import regenerate_all
+from regenerators.docx_regenerator import create_docx
+from regenerators.pptx_regenerator import create_pptx
+from regenerators.xlsx_regenerator import create_xlsx, patch_worksheets
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    wb = openpyxl.Workbook()
+    wb.active.title = "Prices"
+    wb.active["A1"] = "Apfel"
+    wb.active["B2"] = 3
+    wb.active["C3"] = "Birne"
+    path = tmp_path / "book.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def test_segments_have_ids_and_locations(workbook_path):
+    """Tests that string cells become segments addressed by sheet and cell."""
+    document = parse_document(workbook_path)
+    assert [(s.id, s.text) for s in document.segments] == [
+        ("Prices!A1", "Apfel"),
+        ("Prices!C3", "Birne"),
+    ]
+    assert document.segments[1].location == {"sheet": "Prices", "cell": "C3"}
+    assert document.text() == "Apfel\n\nBirne"
+
+
+def test_cache_parses_each_file_once(tmp_path, workbook_path, monkeypatch):
+    """Tests that a second load is served from the hash-keyed cache."""
+    cache = DocumentCache(str(tmp_path / "cache"))
+    first = cache.load(workbook_path)
+    monkeypatch.setattr(
+        document_ir, "parse_document", lambda *args: pytest.fail("parsed twice")
+    )
+    second = cache.load(workbook_path)
+    assert second.segments == first.segments
+    assert second.file_hash == first.file_hash
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_xlsx_is_regenerated_by_location(tmp_path, workbook_path):
+    """Tests that translations are written to their own cells only."""
+    document = parse_document(workbook_path)
+    output = str(tmp_path / "out.xlsx")
+    translations = document.align(["Apple", "Pear"])
+    assert create_xlsx(document, translations, output).startswith("Successfully")
+    sheet = openpyxl.load_workbook(output)["Prices"]
+    assert (sheet["A1"].value, sheet["B2"].value, sheet["C3"].value) == (
+        "Apple",
+        3,
+        "Pear",
+    )
+
+
+def test_misaligned_translation_is_rejected(workbook_path):
+    """Tests that a translation with the wrong segment count cannot shift segments."""
+    document = parse_document(workbook_path)
+    with pytest.raises(ValueError):
+        document.align(["Apple", "Pear", "Plum"])
+
+
+def test_docx_and_pptx_round_trip(tmp_path):
+    """Tests that paragraphs and shapes are replaced in place."""
+    doc = docx.Document()
+    doc.add_paragraph("Hallo")
+    doc.add_paragraph("Welt", style="Heading 1")
+    doc.save(tmp_path / "in.docx")
+    document = parse_document(str(tmp_path / "in.docx"))
+    create_docx(document, ["Hello", "World"], str(tmp_path / "out.docx"))
+    paragraphs = docx.Document(tmp_path / "out.docx").paragraphs
+    assert [p.text for p in paragraphs] == ["Hello", "World"]
+    assert paragraphs[1].style.name == "Heading 1"
+
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Titel"
+    prs.save(tmp_path / "in.pptx")
+    document = parse_document(str(tmp_path / "in.pptx"))
+    assert document.segments[0].location["slide"] == 0
+    create_pptx(document, ["Title"], str(tmp_path / "out.pptx"))
+    out = pptx.Presentation(tmp_path / "out.pptx")
+    assert out.slides[0].shapes.title.text == "Title"
+
+
+def test_segments_with_blank_lines_keep_their_place(tmp_path, monkeypatch):
+    """Tests that multi-paragraph shapes and cells survive translation intact."""
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: None)
+
+    def fake_translate(text, target_language, source_language, references=None):
+        if not SEGMENT_TAG.search(text):
+            return text.upper()
+        return SEGMENT_TAG.sub(
+            lambda m: f'<seg id="{m.group(1)}">{m.group(2).upper()}</seg>', text
+        )
+
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = "Title"
+    body = slide.shapes.add_textbox(0, 0, 100, 100).text_frame
+    body.text = "Hello"
+    body.add_paragraph().text = ""
+    body.add_paragraph().text = "World"
+    prs.save(tmp_path / "in.pptx")
+    document = parse_document(str(tmp_path / "in.pptx"))
+    assert document.texts() == ["Title", "Hello\n\nWorld"]
+    translations = document_translator.translate_document(
+        "gpt", fake_translate, document.texts(), "German", "English"
+    )
+    create_pptx(document, document.align(translations), str(tmp_path / "out.pptx"))
+    shapes = pptx.Presentation(tmp_path / "out.pptx").slides[0].shapes
+    assert [shape.text for shape in shapes] == ["TITLE", "HELLO\n\nWORLD"]
+
+    wb = openpyxl.Workbook()
+    wb.active["A1"] = "Note:\n\nfragile"
+    wb.active["A2"] = "Open"
+    wb.save(tmp_path / "in.xlsx")
+    document = parse_document(str(tmp_path / "in.xlsx"))
+    translations = document_translator.translate_document(
+        "gpt", fake_translate, document.texts(), "German", "English"
+    )
+    assert document.align(translations) == ["NOTE:\n\nFRAGILE", "OPEN"]
+
+
+def test_large_workbook_is_streamed(tmp_path, workbook_path, monkeypatch):
+    """Tests that large workbooks are patched cell by cell, keeping styles."""
+    wb = openpyxl.load_workbook(workbook_path)
+    wb["Prices"]["A1"].font = openpyxl.styles.Font(bold=True)
+    wb["Prices"]["D4"] = "=B2*2"
+    wb["Prices"]["E5"] = "Apfel"
+    wb.save(workbook_path)
+    monkeypatch.setattr(config, "XLSX_STREAMING_MIN_MB", 0)
+    document = parse_document(workbook_path)
+    assert document.text() == "Apfel\n\nBirne\n\nApfel"
+    assert patch_worksheets(
+        document, ["Apple", "Pear", "Apple"], str(tmp_path / "out.xlsx")
+    )
+    sheet = openpyxl.load_workbook(tmp_path / "out.xlsx")["Prices"]
+    assert [sheet[c].value for c in ("A1", "B2", "C3", "D4", "E5")] == [
+        "Apple",
+        3,
+        "Pear",
+        "=B2*2",
+        "Apple",
+    ]
+    assert sheet["A1"].font.bold
+
+
+def test_streaming_falls_back_when_a_cell_is_missing(tmp_path, workbook_path):
+    """Tests that a segment whose cell cannot be found is not silently skipped."""
+    document = parse_document(workbook_path)
+    document.segments[0].location["cell"] = "Z99"
+    output = str(tmp_path / "out.xlsx")
+    assert not patch_worksheets(document, ["Apple", "Pear"], output)
+    assert not os.path.exists(output)
+
+
+def test_all_outputs_are_regenerated_from_one_load(tmp_path, monkeypatch):
+    """Tests that a worker loads the original once for every provider's output."""
+    source = docx.Document()
+    source.add_paragraph("Hallo")
+    source.add_paragraph("Welt")
+    path = str(tmp_path / "letter.docx")
+    source.save(path)
+    document = pickle.loads(pickle.dumps(parse_document(path)))  # As in a worker
+    loads = []
+    monkeypatch.setitem(
+        document_ir._LOADERS, ".docx", lambda p: loads.append(p) or docx.Document(p)
+    )
+    outputs = [
+        (["Hello", "World"], str(tmp_path / "gpt.docx")),
+        (["Bonjour", "Monde"], str(tmp_path / "claude.docx")),
+    ]
+    statuses = regenerate_all(create_docx, document, outputs)
+    assert all(status.startswith("Successfully") for status in statuses)
+    assert loads == [path]
+    for translations, output in outputs:
+        assert [p.text for p in docx.Document(output).paragraphs] == translations
@@ -0,0 +1,80 @@
+import os
+from pipeline.feed_reader import FeedTailer
+
+
+def write(path, text, mode="a"):
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def test_only_appended_rows_are_returned(tmp_path):
+    """Tests that each call parses just the rows added since the previous one."""
+    feed = tmp_path / "jobs.csv"
+    write(feed, "title,link\nFirst,https://x/1\n", "w")
+    tailer = FeedTailer(str(feed))
+    assert tailer.read_new_rows() == [{"title": "First", "link": "https://x/1"}]
+    tailer.commit()
+    assert tailer.read_new_rows() == []
+
+    write(feed, "Second,https://x/2\n")
+    assert tailer.read_new_rows() == [{"title": "Second", "link": "https://x/2"}]
+
+
+def test_partial_and_quoted_lines_wait_for_completion(tmp_path):
+    """Tests that a half-written row, even one with a quoted newline, is held back."""
+    feed = tmp_path / "jobs.csv"
+    write(feed, 'title,link\n"Multi\nline', "w")
+    tailer = FeedTailer(str(feed))
+    assert tailer.read_new_rows() == []
+
+    write(feed, ' title",https://x/1\nTail,https://x/')
+    assert tailer.read_new_rows() == [
+        {"title": "Multi\nline title", "link": "https://x/1"}
+    ]
+    tailer.commit()
+
+    write(feed, "2\n")
+    assert tailer.read_new_rows() == [{"title": "Tail", "link": "https://x/2"}]
+
+
+def test_truncated_or_rotated_feed_is_reread(tmp_path):
+    """Tests that a feed replaced by a smaller or different file is read from the start."""
+    feed = tmp_path / "jobs.csv"
+    write(feed, "title,link\nA,https://x/1\nB,https://x/2\n", "w")
+    tailer = FeedTailer(str(feed))
+    assert len(tailer.read_new_rows()) == 2
+    tailer.commit()
+
+    rotated = tmp_path / "jobs.csv.new"
+    write(rotated, "link,title\nhttps://x/3,C\n", "w")
+    os.replace(rotated, feed)
+    assert tailer.read_new_rows() == [{"link": "https://x/3", "title": "C"}]
+
+
+def test_state_survives_restart(tmp_path):
+    """Tests that the offset is persisted so a restarted tailer does not re-read old rows."""
+    feed = tmp_path / "jobs.csv"
+    state = str(tmp_path / "state.json")
+    write(feed, "﻿title,link\nA,https://x/1\n", "w")
+    tailer = FeedTailer(str(feed), state)
+    assert tailer.read_new_rows() == [{"title": "A", "link": "https://x/1"}]
+    tailer.commit()
+
+    write(feed, "B,https://x/2\n")
+    assert FeedTailer(str(feed), state).read_new_rows() == [
+        {"title": "B", "link": "https://x/2"}
+    ]
+
+
+def test_uncommitted_rows_are_read_again(tmp_path):
+    """Tests that rows are not lost if the caller stops before storing them."""
+    feed = tmp_path / "jobs.csv"
+    state = str(tmp_path / "state.json")
+    write(feed, "title,link\nA,https://x/1\n", "w")
+    tailer = FeedTailer(str(feed), state)
+    rows = tailer.read_new_rows()
+    assert tailer.read_new_rows() == rows
+    # A restart before commit() reads the same rows from the saved state.
+    assert FeedTailer(str(feed), state).read_new_rows() == rows
+    tailer.commit()
+    assert FeedTailer(str(feed), state).read_new_rows() == []
@@ -0,0 +1,69 @@
+import threading
+import time
+from pipeline.handshake import HandshakeTable
+
+
+def test_resolve_and_expire():
+    """Tests that handshakes resolve individually and expire on their own deadlines."""
+    table = HandshakeTable()
+    assert table.add("1", {"job_id": "1"}, timeout=0)
+    assert table.add("2", {"job_id": "2"}, timeout=60)
+    assert not table.add("2", {"job_id": "2"}, timeout=60)
+    assert table.seconds_until_next_deadline() == 0
+
+    assert table.expire() == [("1", {"job_id": "1"})]
+    assert "2" in table and len(table) == 1
+    assert 59 < table.seconds_until_next_deadline() <= 60
+
+    assert table.resolve("2") == {"job_id": "2"}
+    assert table.resolve("2") is None
+    assert table.seconds_until_next_deadline() is None
+
+
+def test_job_is_resolved_or_expired_exactly_once():
+    """Tests that racing resolvers and the expiry sweep never both claim a job."""
+    table = HandshakeTable()
+    for number in range(200):
+        table.add(str(number), {"job_id": str(number)}, timeout=0.001)
+    time.sleep(0.01)
+    claimed = []
+
+    def resolver():
+        for number in range(200):
+            if table.resolve(str(number)):
+                claimed.append(str(number))
+
+    threads = [threading.Thread(target=resolver) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    claimed.extend(job_id for job_id, _ in table.expire())
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(str(number) for number in range(200))
+
+
+def test_job_is_queued_once_after_a_second_handshake(tmp_path, monkeypatch):
+    """Tests that a job seen pending again while it is being queued runs once."""
+    import core
+    from pipeline import job_store as jobs
+    from pipeline.job_store import JobStore
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.register_job("42", "csv", link="https://x/42")
+    job = store.jobs_with_status(jobs.PENDING, kind="csv")[0]
+    submitted = []
+    monkeypatch.setattr(core, "_job_store", store)
+    monkeypatch.setattr(core, "handshakes", HandshakeTable())
+    monkeypatch.setattr(core, "active_csv_jobs", set())
+    monkeypatch.setattr(core, "find_job_file", lambda job_id: "uploads/42.docx")
+    monkeypatch.setattr(core.pyperclip, "copy", lambda text: None)
+    monkeypatch.setattr(
+        core.job_queue, "submit", lambda func, *args: submitted.append(args)
+    )
+    core.handshakes.add("42", job, 60)
+    # The CSV worker starts another handshake before the first one is queued.
+    first = core.handshakes.resolve("42")
+    core.start_handshake(job)
+    assert not core.queue_csv_job(first, "uploads/42.docx")
+    assert len(submitted) == 1
+    assert store.get_job("42")["status"] == jobs.QUEUED
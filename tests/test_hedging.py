@@ -0,0 +1,115 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pipeline.hedging import HedgePolicy, LatencyTracker, hedged_call
+from translators.async_engine import cancel_scope, run_request
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def sleeper(label, seconds, result=None, tokens=100, finished=None):
+    """A provider call that waits on the async engine, like a real request."""
+
+    def call(text, cancel=None):
+        with cancel_scope(cancel):
+            response = run_request(
+                label,
+                lambda: asyncio.sleep(seconds, result or f"{label}: {text}"),
+                tokens,
+            )
+        if finished is not None:
+            finished.append(label)
+        return response
+
+    return call
+
+
+def test_thresholds_are_learned_from_latencies():
+    """Tests that the hedge delay follows the recorded percentile once warmed up."""
+    tracker = LatencyTracker()
+    policy = HedgePolicy(tracker, percentile=90, min_samples=10, default_delay=30)
+    assert policy.delay_for("claude", 500) == 30
+    for seconds in range(1, 11):
+        tracker.record("claude", seconds, 1000)
+    assert policy.delay_for("claude", 500) == 10
+    assert policy.delay_for("claude", 3000) == 30
+
+
+def test_slow_primary_is_hedged(executor):
+    """Tests that a secondary request wins when the primary exceeds its threshold."""
+    policy = HedgePolicy(LatencyTracker(), default_delay=0.05, max_extra_spend=1)
+    calls = {"claude": sleeper("claude", 1), "gpt": sleeper("gpt", 0.01)}
+    start = time.monotonic()
+    service, result = hedged_call(policy, executor, calls, "claude", "gpt", 10, "x")
+    assert (service, result) == ("gpt", "gpt: x")
+    assert time.monotonic() - start < 0.5
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged(executor):
+    """Tests that no extra request is sent when the primary answers in time."""
+    policy = HedgePolicy(LatencyTracker(), default_delay=1, max_extra_spend=1)
+    calls = {"claude": sleeper("claude", 0.01), "gpt": sleeper("gpt", 0.01)}
+    assert hedged_call(policy, executor, calls, "claude", "gpt", 10, "x")[0] == "claude"
+    assert policy.stats()["hedges"] == 0
+
+
+def test_spend_cap_limits_hedges(executor):
+    """Tests that hedges stop once they would exceed the allowed extra spend."""
+    policy = HedgePolicy(LatencyTracker(), default_delay=0.01, max_extra_spend=0.5)
+    calls = {"claude": sleeper("claude", 0.1), "gpt": sleeper("gpt", 0.01)}
+    services = [
+        hedged_call(policy, executor, calls, "claude", "gpt", 100, "x")[0]
+        for _ in range(4)
+    ]
+    # 4 x 100 primary tokens allow 200 hedged tokens, i.e. two hedges.
+    assert policy.stats()["hedges"] == 2
+    assert services.count("gpt") == 2
+
+
+def test_failed_hedge_falls_back_to_primary(executor):
+    """Tests that an error from the faster request does not win over a real answer."""
+    policy = HedgePolicy(LatencyTracker(), default_delay=0.01, max_extra_spend=1)
+    calls = {
+        "claude": sleeper("claude", 0.2),
+        "gpt": sleeper("gpt", 0.01, result="Error: gpt permanent"),
+    }
+    assert hedged_call(policy, executor, calls, "claude", "gpt", 10, "x") == (
+        "claude",
+        "claude: x",
+    )
+
+
+def test_losing_request_is_cancelled_and_billed(executor):
+    """Tests that the slower request stops early and its real spend is counted."""
+    policy = HedgePolicy(LatencyTracker(), default_delay=0.05, max_extra_spend=1)
+    finished = []
+    calls = {
+        "claude": sleeper("claude", 5, tokens=80, finished=finished),
+        "gpt": sleeper("gpt", 0.01, tokens=120),
+    }
+    start = time.monotonic()
+    assert hedged_call(policy, executor, calls, "claude", "gpt", 100, "x")[0] == "gpt"
+    executor.shutdown(wait=True)  # Returns once the cancelled call has stopped
+    assert time.monotonic() - start < 1
+    assert finished == []
+    stats = policy.stats()
+    assert (stats["primary_tokens"], stats["hedged_tokens"]) == (120, 80)
+
+
+def test_cache_hits_are_not_latency_samples(executor):
+    """Tests that calls answered without a provider request teach the tracker nothing."""
+    tracker = LatencyTracker()
+    policy = HedgePolicy(tracker, default_delay=1)
+    calls = {"claude": lambda text, cancel=None: f"cached: {text}"}
+    hedged_call(policy, executor, calls, "claude", "gpt", 10, "x")
+    assert tracker.percentile("claude", 50) == (None, 0)
+    assert policy.stats()["primary_tokens"] == 0
+    calls = {"claude": sleeper("claude", 0.01)}
+    hedged_call(policy, executor, calls, "claude", "gpt", 10, "x")
+    assert tracker.percentile("claude", 50)[1] == 1
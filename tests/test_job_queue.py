@@ -0,0 +1,66 @@
+import threading
+import time
+from pipeline.job_queue import JobQueue, ProviderLimiter
+
+
+def test_job_queue_runs_all_jobs_with_bounded_workers():
+    """Tests that every job runs and no more than num_workers run at once."""
+    job_queue = JobQueue(num_workers=2, max_queue_size=10)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0, "done": 0}
+
+    def job():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+            running["done"] += 1
+
+    for _ in range(8):
+        job_queue.submit(job)
+    job_queue.join()
+
+    assert running["done"] == 8
+    assert running["peak"] <= 2
+    stats = job_queue.stats()
+    assert stats["completed"] == 8
+    assert stats["queue_depth"] == 0
+    job_queue.shutdown()
+
+
+def test_job_queue_survives_failing_job():
+    """Tests that an exception in one job is counted and does not kill the worker."""
+    job_queue = JobQueue(num_workers=1, max_queue_size=5)
+    results = []
+
+    def bad_job():
+        raise ValueError("boom")
+
+    job_queue.submit(bad_job)
+    job_queue.submit(results.append, "ok")
+    job_queue.join()
+
+    assert results == ["ok"]
+    assert job_queue.stats()["failed"] == 1
+    job_queue.shutdown()
+
+
+def test_provider_limiter_caps_in_flight_calls():
+    """Tests that a provider never exceeds its configured number of in-flight calls."""
+    limiter = ProviderLimiter({"gpt": 2})
+
+    def call():
+        with limiter.slot("gpt"):
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = limiter.stats()["gpt"]
+    assert stats["peak_in_flight"] == 2
+    assert stats["in_flight"] == 0
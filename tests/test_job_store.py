@@ -0,0 +1,159 @@
+import threading
+import pytest
+from pipeline import job_store as jobs
+from pipeline.job_store import InvalidTransition, JobStore
+
+
+def test_job_lifecycle_and_results(tmp_path):
+    """Tests registering a job, moving it through its states and recording results."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    link = "https://gengo.com/t/jobs/details/123"
+    store.register_job("123", "csv", link=link, source_path="uploads/123.docx")
+    assert not store.is_known(link)
+
+    store.transition("123", jobs.QUEUED, from_statuses=[jobs.PENDING])
+    assert store.is_known(link)
+    store.transition("123", jobs.PROCESSING)
+    store.record_result("123", "gpt", jobs.COMPLETED, output_path="outputs/a.docx")
+    store.record_result("123", "claude", jobs.FAILED, error="Error: 429")
+    store.transition("123", jobs.PARTIAL)
+
+    job = store.get_job("123")
+    assert job["status"] == jobs.PARTIAL
+    assert job["finished_at"] is not None
+    assert job["results"]["gpt"]["output_path"] == "outputs/a.docx"
+    assert job["results"]["claude"]["error"] == "Error: 429"
+    assert store.source_path("123") == "uploads/123.docx"
+
+
+def test_guarded_transition_is_atomic(tmp_path):
+    """Tests that only one of several racing threads can claim a pending job."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.register_job("1", "csv", link="l1")
+    winners = []
+
+    def claim():
+        try:
+            store.transition("1", jobs.QUEUED, from_statuses=[jobs.PENDING])
+            winners.append(1)
+        except InvalidTransition:
+            pass
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(winners) == 1
+
+    with pytest.raises(InvalidTransition):
+        store.transition("missing", jobs.COMPLETED)
+
+
+def test_finished_jobs_are_not_reopened(tmp_path):
+    """Tests that re-registering a finished job leaves its status untouched."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.register_job("1", "csv", link="l1")
+    store.transition("1", jobs.REJECTED)
+    store.register_job("1", "csv", link="l1", status=jobs.QUEUED)
+    assert store.get_job("1")["status"] == jobs.REJECTED
+
+
+def test_interrupted_jobs_are_reset(tmp_path):
+    """Tests that jobs left queued or processing by a crash return to pending."""
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    store.register_job("1", "csv", link="l1", status=jobs.PROCESSING)
+    assert JobStore(path).reset_interrupted() == 1
+    assert not store.is_known("l1")
+
+
+def test_import_legacy_logs(tmp_path):
+    """Tests the one-time import of processed_jobs.log and the hot folder manifest."""
+    processed_log = tmp_path / "processed_jobs.log"
+    processed_log.write_text("https://gengo.com/t/jobs/details/42?referral=rss\n")
+    manifest = tmp_path / "hotfolder_manifest.log"
+    manifest.write_text("hotfolder_1700000000,uploads/a.txt\n")
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    def job_id_from_link(link):
+        return link.split("/")[-1].split("?")[0]
+
+    assert (
+        store.import_legacy_logs(str(processed_log), str(manifest), job_id_from_link)
+        == 2
+    )
+    assert store.is_known("https://gengo.com/t/jobs/details/42?referral=rss")
+    assert store.source_path("hotfolder_1700000000") == "uploads/a.txt"
+    assert (
+        store.import_legacy_logs(str(processed_log), str(manifest), job_id_from_link)
+        == 0
+    )
+
+
+def test_stage_times_accumulate(tmp_path):
+    """Tests that CPU and wall time add up per document stage."""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.register_job("1", "hotfolder")
+    store.add_stage_time("1", "regenerate", 0.5, 1.0)
+    store.add_stage_time("1", "regenerate", 0.25, 0.5)
+    assert store.get_job("1")["stages"]["regenerate"] == {
+        "tasks": 2,
+        "cpu_seconds": 0.75,
+        "wall_seconds": 1.5,
+    }
+
+
+def test_changes_are_reported_after_commit(tmp_path):
+    """Tests that registrations and transitions call on_change, refused ones do not."""
+    changes = []
+    store = JobStore(str(tmp_path / "jobs.db"), on_change=lambda *c: changes.append(c))
+    store.register_job("1", "csv", status=jobs.PROCESSING)
+    store.transition("1", jobs.COMPLETED)
+    store.register_job("1", "csv", status=jobs.PROCESSING)  # Already finished
+    with pytest.raises(InvalidTransition):
+        store.transition("2", jobs.FAILED)
+    assert changes == [("1", jobs.PROCESSING), ("1", jobs.COMPLETED)]
+
+
+def test_interrupted_hot_folder_jobs_are_resubmitted(tmp_path, monkeypatch):
+    """Tests that hot folder jobs are resumed from their file, or failed without it."""
+    import core
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    source = tmp_path / "report.txt"
+    source.write_text("Hallo", encoding="utf-8")
+    store.register_job(
+        "hotfolder_1", "hotfolder", source_path=str(source), status=jobs.PROCESSING
+    )
+    store.register_job(
+        "hotfolder_2",
+        "hotfolder",
+        source_path=str(tmp_path / "gone.txt"),
+        status=jobs.QUEUED,
+    )
+    store.reset_interrupted()
+    submitted = []
+    monkeypatch.setattr(core, "_job_store", store)
+    monkeypatch.setattr(
+        core.job_queue, "submit", lambda func, *args: submitted.append((func, args))
+    )
+    assert core.resume_hot_folder_jobs() == 1
+    assert submitted == [(core.process_hot_folder_job, (str(source), "hotfolder_1"))]
+    assert store.get_job("hotfolder_2")["status"] == jobs.FAILED
+
+
+def test_hot_folder_job_that_raises_is_marked_failed(tmp_path, monkeypatch):
+    """Tests that an unexpected error fails the job instead of leaving it processing."""
+    import core
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(core, "_job_store", store)
+
+    def broken_read(job_id, source_filepath):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(core, "read_source", broken_read)
+    with pytest.raises(RuntimeError):
+        core.process_hot_folder_job(str(tmp_path / "memo.txt"), "hotfolder_3")
+    assert store.get_job("hotfolder_3")["status"] == jobs.FAILED
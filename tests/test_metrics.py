@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+import urllib.request
+from pipeline import metrics as metrics_module
+from pipeline.metrics import Metrics, estimated_cost, start_metrics_server
+from translators.errors import TransientError
+from translators.scheduler import RateLimitScheduler
+
+
+def test_counters_and_histograms_render_as_text_format():
+    """Tests the exposition format, including cumulative histogram buckets."""
+    metrics = Metrics()
+    metrics.inc("translator_provider_input_tokens_total", 1200, provider="gpt")
+    metrics.observe("translator_stage_seconds", 0.2, stage="parse")
+    metrics.observe("translator_stage_seconds", 3, stage="parse")
+    text = metrics.render()
+    assert "# TYPE translator_provider_input_tokens_total counter" in text
+    assert 'translator_provider_input_tokens_total{provider="gpt"} 1200' in text
+    assert 'translator_stage_seconds_bucket{stage="parse",le="0.25"} 1' in text
+    assert 'translator_stage_seconds_bucket{stage="parse",le="5"} 2' in text
+    assert 'translator_stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'translator_stage_seconds_count{stage="parse"} 2' in text
+
+
+def test_jsonl_file_is_rolled_over(tmp_path):
+    """Tests that every observation is logged and the file rolls over at its size."""
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics()
+    metrics.open_jsonl(str(path), max_bytes=300)
+    for _ in range(5):
+        metrics.observe("translator_stage_seconds", 0.1, job_id="7", stage="api")
+    metrics.close()
+    records = [
+        json.loads(line)
+        for name in ("metrics.jsonl.1", "metrics.jsonl")
+        for line in (tmp_path / name).read_text().splitlines()
+    ]
+    assert len(records) == 5
+    assert records[0]["job_id"] == "7" and records[0]["stage"] == "api"
+
+
+def test_observations_do_not_wait_for_the_file(tmp_path):
+    """Tests that recording is not blocked while the JSONL file is being written."""
+    path = tmp_path / "metrics.jsonl"
+    metrics = Metrics(flush_interval=0.05)
+    metrics.open_jsonl(str(path), max_bytes=10**6)
+    recorded = threading.Event()
+
+    def record():
+        metrics.inc("translator_provider_retries_total", provider="gpt")
+        metrics.observe("translator_stage_seconds", 0.1, stage="api")
+        recorded.set()
+
+    with metrics._write_lock:  # As if a flush were stuck on a slow disk
+        threading.Thread(target=record).start()
+        assert recorded.wait(5)
+        assert not path.exists()
+    metrics.close()
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_endpoint_serves_metrics():
+    """Tests that /metrics is served over HTTP and other paths are not."""
+    metrics = Metrics()
+    metrics.inc("translator_provider_retries_total", provider="claude")
+    server = start_metrics_server(metrics, 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+        assert 'translator_provider_retries_total{provider="claude"} 1' in body
+    finally:
+        server.shutdown()
+
+
+def test_scheduler_records_latency_retries_and_errors(monkeypatch):
+    """Tests that each attempt is recorded with its outcome and error class."""
+    metrics = Metrics()
+    monkeypatch.setattr(metrics_module, "_metrics", metrics)
+    scheduler = RateLimitScheduler({}, max_retries=2, base_delay=0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise TransientError("gpt", "502 Bad Gateway", 502)
+        return "translated"
+
+    asyncio.run(scheduler.execute("gpt", flaky))
+    text = metrics.render()
+    assert 'translator_provider_retries_total{provider="gpt"} 1' in text
+    assert (
+        'translator_provider_errors_total{error="TransientError",provider="gpt"} 1'
+        in text
+    )
+    assert (
+        'translator_provider_request_seconds_count{outcome="ok",provider="gpt"} 1'
+        in text
+    )
+
+
+def test_cost_uses_configured_prices():
+    """Tests the cost estimate for a million input and output tokens."""
+    assert estimated_cost("unknown", 10**6, 10**6) == 0
+    assert estimated_cost("gpt", 10**6, 0) > 0
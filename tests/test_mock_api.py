@@ -0,0 +1,77 @@
+import anthropic
+import openai
+import pytest
+from benchmarks.fake_provider import LatencyProfile
+from benchmarks.mock_api import mock_response, start_mock_api
+from translators.errors import RateLimitedError, TransientError, classify_error
+
+INSTANT = LatencyProfile(median=0, sigma=0, per_1k_tokens=0)
+
+
+@pytest.fixture
+def server():
+    server = start_mock_api({"default": INSTANT})
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_responses_follow_the_prompt_format():
+    """Tests that packed segments, critiques and plain text are answered in kind."""
+    packed = 'Source Text:\n---\n<seg id="1">完了</seg>\n<seg id="2">保留</seg>'
+    assert mock_response("gpt", packed) == (
+        '<seg id="1">[mock gpt] 完了</seg>\n<seg id="2">[mock gpt] 保留</seg>'
+    )
+    critique = "SOURCE TEXT:\n原文\n---\nPROVIDED TRANSLATION:\nDraft\n---\n"
+    assert mock_response("claude", critique).endswith("**Refined Translation:** Draft")
+    assert mock_response("gemini", "Hello") == "[mock gemini] Hello"
+
+
+def test_openai_client_reads_completions_and_streams(server, url):
+    """Tests that the OpenAI SDK parses both response formats and usage is counted."""
+    client = openai.OpenAI(api_key="mock", base_url=f"{url}/v1", max_retries=0)
+    messages = [{"role": "user", "content": "Source Text:\n---\nGood morning"}]
+    response = client.chat.completions.create(model="gpt", messages=messages)
+    assert response.choices[0].message.content == "[mock gpt] Good morning"
+    assert response.usage.completion_tokens > 0
+    stream = client.chat.completions.create(model="gpt", messages=messages, stream=True)
+    deltas = [c.choices[0].delta.content for c in stream if c.choices]
+    assert "".join(d for d in deltas if d) == "[mock gpt] Good morning"
+    stats = server.state.stats()["providers"]["gpt"]
+    assert (stats["requests"], stats["streamed"], stats["succeeded"]) == (2, 1, 2)
+    assert stats["output_tokens"] == 2 * response.usage.completion_tokens
+
+
+def test_anthropic_client_streams_messages(url):
+    """Tests that the Anthropic SDK's stream helper assembles the mock's events."""
+    client = anthropic.Anthropic(api_key="mock", base_url=url, max_retries=0)
+    messages = [{"role": "user", "content": "one two three four five six"}]
+    with client.messages.stream(
+        model="claude", max_tokens=100, messages=messages
+    ) as stream:
+        text = "".join(stream.text_stream)
+        message = stream.get_final_message()
+    assert text == "[mock claude] one two three four five six"
+    assert message.stop_reason == "end_turn"
+    assert message.content[0].text == text
+
+
+def test_injected_errors_are_classified(server, url):
+    """Tests that throttling carries Retry-After and server errors are transient."""
+    client = openai.OpenAI(api_key="mock", base_url=f"{url}/v1", max_retries=0)
+    messages = [{"role": "user", "content": "x"}]
+    server.state.set_profiles({"gpt": LatencyProfile(median=0, throttle_rate=1)})
+    with pytest.raises(openai.RateLimitError) as throttled:
+        client.chat.completions.create(model="gpt", messages=messages)
+    error = classify_error("gpt", throttled.value)
+    assert isinstance(error, RateLimitedError) and error.retry_after == 1
+    server.state.set_profiles({"gpt": LatencyProfile(median=0, failure_rate=1)})
+    with pytest.raises(openai.APIStatusError) as failed:
+        client.chat.completions.create(model="gpt", messages=messages)
+    assert isinstance(classify_error("gpt", failed.value), TransientError)
+    stats = server.state.stats()["providers"]["gpt"]
+    assert (stats["throttled"], stats["failed"], stats["output_tokens"]) == (1, 1, 0)
@@ -0,0 +1,103 @@
+import os
+import time
+import pytest
+from pipeline import job_store as jobs
+from pipeline.job_index import JobIndex
+from pipeline.job_store import JobStore
+from pipeline.notifications import NotificationListener, NotificationServer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    server = NotificationServer("127.0.0.1", 0)
+    yield server
+    server.close()
+
+
+def test_events_are_pushed_to_listeners(server):
+    """Tests that every connected listener receives published events in order."""
+    listeners = [
+        NotificationListener("127.0.0.1", server.port, retry_interval=0.05)
+        for _ in range(2)
+    ]
+    wait_for(lambda: all(listener.connected for listener in listeners))
+    wait_for(lambda: server.subscribers() == 2)
+    versions = [listener.version for listener in listeners]
+    server.publish({"event": "job", "job_id": "1", "status": jobs.PROCESSING})
+    server.publish({"event": "job", "job_id": "1", "status": jobs.COMPLETED})
+    for listener, version in zip(listeners, versions):
+        wait_for(lambda: listener.version == version + 2)
+        assert listener.last_event["status"] == jobs.COMPLETED
+        listener.stop()
+
+
+def test_listener_reconnects_when_the_service_restarts():
+    """Tests that the listener notices a restart and bumps its version."""
+    first = NotificationServer("127.0.0.1", 0)
+    port = first.port
+    listener = NotificationListener("127.0.0.1", port, retry_interval=0.05)
+    wait_for(lambda: listener.connected)
+    version = listener.version
+    first.close()
+    wait_for(lambda: not listener.connected)
+    assert listener.version > version
+    second = NotificationServer("127.0.0.1", port)
+    try:
+        wait_for(lambda: listener.connected)
+        second.publish({"event": "job", "job_id": "2", "status": jobs.QUEUED})
+        wait_for(lambda: listener.last_event is not None)
+    finally:
+        listener.stop()
+        second.close()
+
+
+def test_listener_tracks_changed_jobs(server):
+    """Tests that events name their jobs and a reconnect asks for a full refresh."""
+    listener = NotificationListener("127.0.0.1", server.port, retry_interval=0.05)
+    try:
+        wait_for(lambda: listener.connected)
+        wait_for(lambda: server.subscribers() == 1)
+        version = listener.version
+        assert listener.changed_since(version) == set()
+        server.publish({"event": "job", "job_id": "1", "status": jobs.PROCESSING})
+        server.publish({"event": "job", "job_id": "2", "status": jobs.QUEUED})
+        wait_for(lambda: listener.version == version + 2)
+        assert listener.changed_since(version) == {"1", "2"}
+        assert listener.changed_since(version + 1) == {"2"}
+        assert listener.changed_since(version - 1) is None  # Before the connect
+    finally:
+        listener.stop()
+
+
+def test_job_index_reads_only_changes(tmp_path):
+    """Tests that the index picks up legacy files, new outputs and status changes."""
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    (outputs / "job_7_gpt.docx").write_text("old")
+    (outputs / "job_9_gpt.txt.partial").write_text("streaming")
+    store = JobStore(str(tmp_path / "jobs.db"))
+    index = JobIndex(store, str(outputs))
+    assert index.refresh() == {"7"}
+    assert index.job_ids() == ["7"]
+
+    version = index.version
+    store.register_job("8", "csv", status=jobs.PROCESSING)
+    assert index.refresh() == {"8"}
+    assert index.is_running("8") and index.job_ids() == ["8", "7"]
+    assert index.refresh() == set()
+    assert index.version == version + 1
+
+    path = os.path.join(str(outputs), "job_8_claude.docx")
+    store.record_result("8", "claude", jobs.COMPLETED, output_path=path)
+    store.transition("8", jobs.COMPLETED)
+    assert index.refresh() == {"8"}
+    assert not index.is_running("8")
+    assert index.outputs("8") == [path]
+    assert index.changed_since(version) == {"8"}
@@ -0,0 +1,59 @@
+import time
+from pipeline.prefilter import SegmentFilter
+
+
+def test_non_prose_is_recognised():
+    """Tests that numbers, dates, IDs, URLs, e-mails and formulas pass through."""
+    segment_filter = SegmentFilter("German", "English", ["N/A", "USD"])
+    for text in (
+        "12,345",
+        " (1.234,50) ",
+        "¥1,200",
+        "45%",
+        "2024-01-05 10:30",
+        "SKU-1234",
+        "v2.0",
+        "N/A",
+        "USD",
+        "U.S.",
+        "https://example.com/a?b=1",
+        "info@example.co.jp",
+        "=SUMME(A1:A3)",
+        "—",
+    ):
+        assert segment_filter.passthrough(text), text
+    for text in ("Preis", "Straße 5", "OK, danke"):
+        assert not segment_filter.passthrough(text), text
+
+
+def test_capitalised_words_are_translated():
+    """Tests that all-caps labels are sent unless they are listed acronyms."""
+    segment_filter = SegmentFilter("English", "German", ["USD"])
+    for text in ("OPEN", "NAME", "YES", "NO", "SALE", "FREE", "N/A"):
+        assert not segment_filter.passthrough(text), text
+    assert segment_filter.passthrough("USD")
+
+
+def test_text_in_target_script_passes_through():
+    """Tests the script check in both directions, and that mixed text is sent."""
+    to_english = SegmentFilter("Japanese", "English")
+    assert to_english.passthrough("Apple Inc.")
+    assert not to_english.passthrough("3月")
+    assert not to_english.passthrough("東京都 Tokyo")
+    to_japanese = SegmentFilter("English", "Japanese")
+    assert to_japanese.passthrough("東京都")
+    assert not to_japanese.passthrough("Tokyo")
+    assert not SegmentFilter("Japanese", "Chinese").passthrough("東京都")
+
+
+def test_classification_is_fast():
+    """Tests that hundreds of thousands of cells are classified in under a second."""
+    segment_filter = SegmentFilter("Japanese", "English")
+    cells = [
+        f"{i}" if i % 3 == 0 else f"SKU-{i}" if i % 3 == 1 else f"商品 {i} の説明"
+        for i in range(300_000)
+    ]
+    start = time.perf_counter()
+    skipped = sum(map(segment_filter.passthrough, cells))
+    assert time.perf_counter() - start < 1.0
+    assert skipped == 200_000
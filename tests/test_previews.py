@@ -0,0 +1,86 @@
+import os
+from pipeline import previews
+from pipeline.previews import (
+    PreviewCache,
+    paginate,
+    read_preview,
+    tail_lines,
+    write_preview,
+)
+
+
+def touch(path, text, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_paginate_breaks_after_newlines():
+    """Tests that pages end on a newline where possible and join back losslessly."""
+    text = "line one\nline two\n" + "x" * 25 + "\nend"
+    pages = paginate(text, 20)
+    assert "".join(pages) == text
+    assert all(len(page) <= 20 for page in pages)
+    assert pages[0] == "line one\nline two\n"
+    assert paginate("short", 20) == ["short"]
+    assert paginate("", 20) == [""]
+
+
+def test_tail_lines_reads_from_the_end(tmp_path, monkeypatch):
+    """Tests that tailing returns the last lines across several read blocks."""
+    monkeypatch.setattr(previews, "TAIL_BLOCK_SIZE", 16)
+    path = tmp_path / "app.log"
+    lines = [f"line {i}\n" for i in range(100)]
+    touch(path, "".join(lines))
+    assert tail_lines(str(path), 3) == "".join(lines[-3:])
+    assert tail_lines(str(path), 500) == "".join(lines)
+    touch(path, "a\nb\nc")
+    assert tail_lines(str(path), 2) == "b\nc"
+
+
+def test_stale_previews_are_ignored(tmp_path):
+    """Tests that a preview older than its output is not used."""
+    output = tmp_path / "job_1_gpt.docx"
+    preview_dir = str(tmp_path / ".previews")
+    touch(output, "binary", mtime_ns=1_000_000_000)
+    assert read_preview(str(output), preview_dir) is None
+    write_preview(str(output), "Hola", preview_dir)
+    assert read_preview(str(output), preview_dir) == "Hola"
+    touch(output, "regenerated", mtime_ns=2_000_000_000_000_000_000)
+    assert read_preview(str(output), preview_dir) is None
+
+
+def test_cache_reloads_changed_files_and_evicts_lru(tmp_path):
+    """Tests that entries are rebuilt on change and evicted least recently used."""
+    cache = PreviewCache(max_entries=2, max_chars=100)
+    loads = []
+
+    def load(path):
+        loads.append(path)
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    a, b, c = (str(tmp_path / name) for name in "abc")
+    for path in (a, b, c):
+        touch(path, "text")
+    assert cache.get(a, load) == "text"
+    assert cache.get(a, load) == "text"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    touch(a, "changed!")
+    assert cache.get(a, load) == "changed!"
+    cache.get(b, load)
+    cache.get(a, load)  # a is now the most recently used
+    cache.get(c, load)  # Evicts b
+    loads.clear()
+    cache.get(a, load)
+    cache.get(b, load)
+    assert loads == [b]
+
+    touch(c, "x" * 150)  # Larger than the whole budget: kept alone
+    cache.get(c, load)
+    loads.clear()
+    cache.get(c, load)
+    cache.get(a, load)
+    assert loads == [a]
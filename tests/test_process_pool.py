@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+import pytest
+from pipeline.process_pool import DocumentWorkers, StageTimeout, WorkerCrashed
+
+
+@pytest.fixture
+def workers():
+    workers = DocumentWorkers(max_workers=2, timeout=5)
+    yield workers
+    workers.shutdown()
+
+
+def test_inline_mode_runs_in_thread():
+    """Tests that max_workers=0 runs stages inline and still records them."""
+    workers = DocumentWorkers(max_workers=0)
+    result, cpu_seconds, wall_seconds = workers.run("parse", sum, [1, 2, 3])
+    assert result == 6
+    assert cpu_seconds >= 0 and wall_seconds >= 0
+    assert workers.stats()["parse"]["tasks"] == 1
+
+
+def test_stage_runs_in_a_worker_process(workers):
+    """Tests that a stage runs in another process and its CPU time is measured."""
+    pid, cpu_seconds, _ = workers.run("parse", os.getpid)
+    assert pid != os.getpid()
+    assert workers.stats()["parse"]["cpu_seconds"] == cpu_seconds
+
+
+def test_crash_is_isolated(workers):
+    """Tests that a crashing worker fails its task but not later ones."""
+    with pytest.raises(WorkerCrashed):
+        workers.run("regenerate", os._exit, 1)
+    assert workers.run("regenerate", sum, [2, 2])[0] == 4
+    assert workers.stats()["regenerate"]["crashes"] == 1
+
+
+def test_hung_task_times_out(workers):
+    """Tests that a task over its timeout is killed and the pool is replaced."""
+    workers.timeout = 0.5
+    start = time.monotonic()
+    with pytest.raises(StageTimeout):
+        workers.run("parse", time.sleep, 30)
+    assert time.monotonic() - start < 10
+    workers.timeout = 30
+    assert workers.run("parse", sum, [1])[0] == 1
+
+
+def test_tasks_sharing_a_hung_pool_are_rerun(workers):
+    """Tests that killing a hung task's pool does not use up the others' retry."""
+    results = []
+    task = threading.Thread(
+        target=lambda: results.append(workers.run("regenerate", time.sleep, 1.5))
+    )
+    task.start()
+    for _ in range(2):  # As if two other tasks hung while this one ran
+        time.sleep(0.7)
+        workers._recycle(workers._get_pool(), hung=True)
+    task.join(timeout=30)
+    assert len(results) == 1
+    assert workers.stats()["regenerate"]["crashes"] == 0
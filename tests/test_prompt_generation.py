@@ -1,5 +1,7 @@
 import json
+import os
 import config
+from translators import utils
 from translators.utils import get_prompt_with_glossary
 
 
@@ -18,14 +20,14 @@ def test_get_prompt_with_glossary(tmp_path, monkeypatch):
     monkeypatch.setattr(config, "GLOSSARY_PATH", str(glossary_file))
 
     # 4. Define placeholders and call the function
-    placeholders = {"{text}": "Translate this."}
+    placeholders = {"{text}": "Translate this Gengo LLM note."}
     result_prompt = get_prompt_with_glossary(str(template_file), placeholders)
 
     # 5. Assert that the glossary terms are present in the final prompt
     assert "You must adhere to the following glossary terms:" in result_prompt
     assert '- "Gengo" must be translated as "Gengo Inc."' in result_prompt
     assert '- "LLM" must be translated as "Large Language Model"' in result_prompt
-    assert "Text: Translate this." in result_prompt
+    assert "Text: Translate this Gengo LLM note." in result_prompt
 
 
 def test_get_prompt_without_glossary(tmp_path, monkeypatch):
@@ -44,3 +46,86 @@ def test_get_prompt_without_glossary(tmp_path, monkeypatch):
     # 4. Assert that the glossary section is empty and the text is still there
     assert "Instruction: Text: Translate this." in result_prompt
     assert "You must adhere" not in result_prompt
+
+
+def test_only_terms_in_source_text_are_injected(tmp_path, monkeypatch):
+    """Tests that glossary terms absent from the source text are left out of the prompt."""
+    template_file = tmp_path / "prompt.txt"
+    template_file.write_text("{glossary_section}Text: {text}")
+    glossary_file = tmp_path / "glossary.json"
+    glossary_file.write_text(
+        json.dumps({"AI": "Artificial Intelligence", "請求書": "Invoice", "LLM": "x"})
+    )
+    monkeypatch.setattr(config, "GLOSSARY_PATH", str(glossary_file))
+
+    result_prompt = get_prompt_with_glossary(
+        str(template_file), {"{text}": "He said the ai team sent the 請求書."}
+    )
+
+    assert '"AI"' in result_prompt
+    assert '"請求書"' in result_prompt
+    assert '"LLM"' not in result_prompt
+
+
+def test_language_pair_sections_override_global_terms(tmp_path, monkeypatch):
+    """Tests that a "Source/Target" section applies only to that language pair."""
+    template_file = tmp_path / "prompt.txt"
+    template_file.write_text("{glossary_section}")
+    glossary_file = tmp_path / "glossary.json"
+    glossary_file.write_text(
+        json.dumps({"Gengo": "Gengo", "Japanese/German": {"Gengo": "Gengo GmbH"}})
+    )
+    monkeypatch.setattr(config, "GLOSSARY_PATH", str(glossary_file))
+
+    def render(target_language):
+        return get_prompt_with_glossary(
+            str(template_file),
+            {
+                "{text}": "Gengo",
+                "{source_language}": "Japanese",
+                "{target_language}": target_language,
+            },
+        )
+
+    assert '"Gengo" must be translated as "Gengo GmbH"' in render("German")
+    assert '"Gengo" must be translated as "Gengo"' in render("English")
+
+
+def test_glossary_reloads_only_when_file_changes(tmp_path, monkeypatch):
+    """Tests that the glossary is parsed once and re-read after the file changes."""
+    template_file = tmp_path / "prompt.txt"
+    template_file.write_text("{glossary_section}")
+    glossary_file = tmp_path / "glossary.json"
+    glossary_file.write_text(json.dumps({"Gengo": "A"}))
+    monkeypatch.setattr(config, "GLOSSARY_PATH", str(glossary_file))
+    loads = []
+    original_load = utils.load_glossary_file
+    monkeypatch.setattr(
+        utils,
+        "load_glossary_file",
+        lambda path: loads.append(path) or original_load(path),
+    )
+    placeholders = {"{text}": "Gengo"}
+
+    for _ in range(3):
+        get_prompt_with_glossary(str(template_file), placeholders)
+    assert len(loads) == 1
+
+    glossary_file.write_text(json.dumps({"Gengo": "Bee"}))
+    os.utime(glossary_file, ns=(0, 10**18))
+    assert '"Bee"' in get_prompt_with_glossary(str(template_file), placeholders)
+    assert len(loads) == 2
+
+
+def test_placeholders_in_source_text_are_not_expanded(tmp_path, monkeypatch):
+    """Tests that substitution is single-pass, so source text is inserted verbatim."""
+    template_file = tmp_path / "prompt.txt"
+    template_file.write_text("{glossary_section}Text: {text} ({target_language})")
+    monkeypatch.setattr(config, "GLOSSARY_PATH", "non_existent_glossary.json")
+
+    result_prompt = get_prompt_with_glossary(
+        str(template_file),
+        {"{text}": "Keep {target_language}", "{target_language}": "French"},
+    )
+
+    assert result_prompt == "Text: Keep {target_language} (French)"
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import pytest
+from translators.errors import (
+    PermanentError,
+    RateLimitedError,
+    TransientError,
+    parse_retry_after,
+)
+from translators.scheduler import RateLimitScheduler, TokenBucket
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_token_bucket_paces_to_rate():
+    """Tests that reservations beyond the burst are delayed at the refill rate."""
+    bucket = TokenBucket(per_minute=60)  # One per second
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+    assert TokenBucket(per_minute=0).reserve(10**6) == 0
+
+
+def test_retries_transient_errors_then_succeeds():
+    """Tests that transient failures are retried with backoff until a success."""
+    scheduler = RateLimitScheduler({}, max_retries=3, base_delay=0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TransientError("gpt", "502 Bad Gateway", 502)
+        return "translated"
+
+    assert run(scheduler.execute("gpt", flaky)) == "translated"
+    assert len(attempts) == 3
+    assert scheduler.stats()["gpt"]["retries"] == 2
+
+
+def test_permanent_errors_are_not_retried():
+    """Tests that a bad request is raised immediately as a typed error."""
+    scheduler = RateLimitScheduler({}, max_retries=3, base_delay=0.01)
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise PermanentError("claude", "invalid model", 400)
+
+    with pytest.raises(PermanentError):
+        run(scheduler.execute("claude", bad_request))
+    assert len(attempts) == 1
+
+
+def test_retry_after_pauses_the_provider():
+    """Tests that Retry-After is honoured and gives up after max_retries."""
+    scheduler = RateLimitScheduler({}, max_retries=1, base_delay=10)
+
+    async def throttled():
+        raise RateLimitedError("gemini", "quota", 429, retry_after=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(RateLimitedError):
+        run(scheduler.execute("gemini", throttled))
+    assert 0.2 <= time.monotonic() - start < 2
+    assert scheduler.stats()["gemini"]["rate_limited"] == 2
+
+
+def test_timeouts_become_transient_errors():
+    """Tests that an attempt exceeding the timeout is classified as transient."""
+    scheduler = RateLimitScheduler({}, max_retries=0, timeout=0.05)
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    with pytest.raises(TransientError):
+        run(scheduler.execute("gpt", slow))
+
+
+def test_parse_retry_after():
+    """Tests the seconds, milliseconds and missing forms of the header."""
+    assert parse_retry_after({"retry-after": "7"}) == 7
+    assert parse_retry_after({"retry-after-ms": "1500"}) == 1.5
+    assert parse_retry_after({}) is None
@@ -0,0 +1,66 @@
+import os
+from pipeline.job_store import JobStore
+from pipeline.streaming import StreamProgress, partial_output_path
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_slots_are_written_in_document_order(tmp_path):
+    """Tests that concurrently streamed chunks never interleave in the partial file."""
+    path = partial_output_path(str(tmp_path), "42", "gpt")
+    progress = StreamProgress("42", "gpt", path)
+    second, first = progress.sink(1), progress.sink(0)
+    second("Zwei")
+    first("Eins")
+    second(" Drei")
+    progress.flush()
+    assert read(path) == "EinsZwei Drei"
+
+
+def test_segment_markup_is_stripped(tmp_path):
+    """Tests that packed-segment tags are not shown in the partial output."""
+    path = str(tmp_path / "out.partial")
+    progress = StreamProgress("42", "gpt", path)
+    sink = progress.sink(0)
+    for piece in ['<seg id="1">Hallo', '</seg>\n<seg id="2">', "Welt</seg>"]:
+        sink(piece)
+    progress.flush()
+    assert read(path).split() == ["Hallo", "Welt"]
+
+
+def test_retry_discards_previous_attempt(tmp_path):
+    """Tests that a new attempt replaces what the failed attempt streamed."""
+    path = str(tmp_path / "out.partial")
+    progress = StreamProgress("42", "gpt", path)
+    sink = progress.sink(0)
+    sink("Halb")
+    sink(None)
+    sink("Ganz")
+    progress.complete(1, "Fertig")
+    progress.flush()
+    assert read(path) == "GanzFertig\n\n"
+
+
+def test_progress_is_recorded_and_partial_removed(tmp_path):
+    """Tests that flushing reports token counts and closing removes the partial file."""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    path = str(tmp_path / "out.partial")
+    progress = StreamProgress("42", "claude", path, store=store).start()
+    progress.sink(0)("Guten Morgen")
+    progress.flush()
+    row = store.get_progress("42")["claude"]
+    assert row["tokens"] > 0 and row["partial_path"] == path
+    progress.close()
+    assert not os.path.exists(path)
+
+
+def test_failed_run_keeps_partial(tmp_path):
+    """Tests that a failed run leaves what arrived so far on disk."""
+    path = str(tmp_path / "out.partial")
+    progress = StreamProgress("42", "gemini", path, flush_interval=60).start()
+    progress.sink(0)("Teil")
+    progress.close(keep_partial=True)
+    assert read(path) == "Teil"
@@ -0,0 +1,77 @@
+import config
+from translators import cache
+from translators.cache import TranslationCache, make_cache_key
+
+
+def test_cache_key_changes_with_any_input():
+    """Tests that every part of the request contributes to the cache key."""
+    base = make_cache_key(provider="gpt", model="m", params={"t": 0.2}, prompt="p")
+    assert base == make_cache_key(
+        provider="gpt", model="m", params={"t": 0.2}, prompt="p"
+    )
+    assert base != make_cache_key(
+        provider="gpt", model="m", params={"t": 0.4}, prompt="p"
+    )
+    assert base != make_cache_key(
+        provider="gpt", model="m", params={"t": 0.2}, prompt="p2"
+    )
+
+
+def test_get_or_create_hits_after_first_call(tmp_path):
+    """Tests that a second identical request is served from the cache."""
+    translation_cache = TranslationCache(
+        str(tmp_path / "cache.sqlite3"), max_size_bytes=10_000, max_age_seconds=60
+    )
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "Bonjour"
+
+    assert translation_cache.get_or_create("k", compute) == "Bonjour"
+    assert translation_cache.get_or_create("k", compute) == "Bonjour"
+    assert len(calls) == 1
+    stats = translation_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_errors_are_not_cached(tmp_path):
+    """Tests that failed responses are recomputed on the next request."""
+    translation_cache = TranslationCache(
+        str(tmp_path / "cache.sqlite3"), max_size_bytes=10_000, max_age_seconds=60
+    )
+    translation_cache.get_or_create("k", lambda: "Error: quota exceeded")
+    assert translation_cache.get("k") is None
+
+
+def test_cache_survives_reopen(tmp_path):
+    """Tests that entries persist across cache instances (i.e. service restarts)."""
+    path = str(tmp_path / "cache.sqlite3")
+    TranslationCache(path, 10_000, 60).put("k", "Hallo")
+    assert TranslationCache(path, 10_000, 60).get("k") == "Hallo"
+
+
+def test_eviction_by_size_and_age(tmp_path, monkeypatch):
+    """Tests that expired entries and least recently used overflow are evicted."""
+    translation_cache = TranslationCache(
+        str(tmp_path / "cache.sqlite3"), max_size_bytes=10, max_age_seconds=60
+    )
+    translation_cache.put("old", "aaaaaa")
+    translation_cache.put("new", "bbbbbb")
+    translation_cache.get("new")
+    translation_cache.evict()
+    assert translation_cache.get("old") is None
+    assert translation_cache.get("new") == "bbbbbb"
+
+    monkeypatch.setattr(translation_cache, "max_age_seconds", -1)
+    translation_cache.evict()
+    assert translation_cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_always_computes(monkeypatch):
+    """Tests that disabling the cache in config passes every call through."""
+    monkeypatch.setattr(config, "TRANSLATION_CACHE_ENABLED", False)
+    monkeypatch.setattr(cache, "_translation_cache", None)
+    assert cache.cached_completion("gpt", "m", {}, "p", lambda: "one") == "one"
+    assert cache.cached_completion("gpt", "m", {}, "p", lambda: "two") == "two"
+    monkeypatch.setattr(cache, "_translation_cache", None)
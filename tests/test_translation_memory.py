@@ -0,0 +1,118 @@
+import random
+import string
+import time
+import config
+from pipeline import document_translator
+from translators import translation_memory
+from translators.translation_memory import TranslationMemory, get_translation_memory
+
+
+def test_exact_and_fuzzy_lookup(tmp_path):
+    """Tests exact matches score 1.0 and close variants are found as fuzzy matches."""
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"), hint_threshold=0.75)
+    memory.add(
+        [("The invoice is overdue.", "請求書の期限が過ぎています。")],
+        "English",
+        "Japanese",
+        "gpt",
+    )
+
+    exact = memory.lookup("The  invoice is overdue.", "English", "Japanese", "gpt")
+    assert exact.score == 1.0
+    assert exact.target == "請求書の期限が過ぎています。"
+
+    fuzzy = memory.lookup("The invoices are overdue.", "English", "Japanese", "gpt")
+    assert 0.75 <= fuzzy.score < 1.0
+
+    assert memory.lookup("Completely different", "English", "Japanese", "gpt") is None
+    assert memory.lookup("The invoice is overdue.", "English", "German", "gpt") is None
+    assert (
+        memory.lookup("The invoice is overdue.", "English", "Japanese", "claude")
+        is None
+    )
+
+
+def test_memory_persists_across_instances(tmp_path):
+    """Tests that stored segments are reloaded from disk by a new instance."""
+    path = str(tmp_path / "tm.sqlite3")
+    TranslationMemory(path).add([("Hello", "Bonjour")], "English", "French", "gpt")
+    match = TranslationMemory(path).lookup("Hello", "English", "French", "gpt")
+    assert match.target == "Bonjour"
+
+
+def test_lookup_is_fast_on_large_memory(tmp_path):
+    """Tests that lookups stay well under a millisecond with many stored segments."""
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"))
+    memory.add(
+        [(f"Row {i} shipment status code {i * 7}", f"T{i}") for i in range(20000)],
+        "English",
+        "French",
+        "gpt",
+    )
+    started = time.perf_counter()
+    for i in range(200):
+        memory.lookup(
+            f"Row {i} shipment status code {i * 7}", "English", "French", "gpt"
+        )
+    assert (time.perf_counter() - started) / 200 < 0.001
+
+
+def test_fuzzy_lookup_is_fast_on_large_memory(tmp_path):
+    """Tests that near misses are found quickly among many similar segments."""
+    rng = random.Random(7)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(2000)]
+    common = ["the", "of", "and", "invoice", "shipment", "status"]
+    sources = [
+        " ".join(rng.choice(common if rng.random() < 0.4 else words) for _ in range(10))
+        for _ in range(30000)
+    ]
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"))
+    memory.add([(s, f"T{i}") for i, s in enumerate(sources)], "en", "fr", "gpt")
+    # The same segments with their last word replaced
+    picked = range(0, len(sources), 150)
+    queries = [sources[i].rsplit(" ", 1)[0] + " changed" for i in picked]
+
+    timings = []
+    for _ in range(3):  # The best run, so other tests' threads do not skew it
+        started = time.perf_counter()
+        matches = [memory.lookup(query, "en", "fr", "gpt") for query in queries]
+        timings.append((time.perf_counter() - started) / len(queries))
+    assert min(timings) < 0.002
+    found = [m for m, i in zip(matches, picked) if m and m.source == sources[i]]
+    assert len(found) >= 0.9 * len(queries)
+
+
+def test_translate_document_only_sends_unmatched_segments(tmp_path, monkeypatch):
+    """Tests that exact matches skip the API and new pairs are stored afterwards."""
+    memory = TranslationMemory(str(tmp_path / "tm.sqlite3"))
+    memory.add([("Header", "En-tête")], "English", "French", "gpt")
+    monkeypatch.setattr(document_translator, "get_translation_memory", lambda: memory)
+    monkeypatch.setattr(config, "TM_REUSE_THRESHOLD", 0.95)
+    sent = []
+
+    def fake_translate(text, target_language, source_language, references=None):
+        sent.append(text)
+        return "\n\n".join(f"FR:{s}" for s in text.split("\n\n"))
+
+    result = document_translator.translate_document(
+        "gpt", fake_translate, ["Header", "Body text"], "French", "English"
+    )
+    assert result == ["En-tête", "FR:Body text"]
+    assert sent == ["Body text"]
+
+    result = document_translator.translate_document(
+        "gpt", fake_translate, ["Header", "Body text"], "French", "English"
+    )
+    assert result == ["En-tête", "FR:Body text"]
+    assert len(sent) == 1
+
+
+def test_dummy_mode_does_not_use_the_memory(tmp_path, monkeypatch):
+    """Tests that fake translations are neither looked up nor stored."""
+    monkeypatch.setattr(translation_memory, "_translation_memory", None)
+    monkeypatch.setattr(config, "TRANSLATION_MEMORY_ENABLED", True)
+    monkeypatch.setattr(config, "TRANSLATION_MEMORY_PATH", str(tmp_path / "tm.db"))
+    monkeypatch.setattr(config, "DUMMY_MODE", True)
+    assert get_translation_memory() is None
+    monkeypatch.setattr(config, "DUMMY_MODE", False)
+    assert get_translation_memory() is not None
@@ -0,0 +1,227 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
+import config
+from .scheduler import get_scheduler
+
+
+class CancelToken:
+    """
+    Cancels every provider request made on one caller's behalf, even those
+    already in flight, and counts the requests sent and their estimated
+    tokens, so a caller can tell real round trips from cache hits.
+
+    Requests pick the token up from the calling thread (see cancel_scope()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = set()
+        self.cancelled = False
+        self.requests = 0
+        self.tokens = 0
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+
+    def check(self):
+        """Raises CancelledError if the token has been cancelled."""
+        if self.cancelled:
+            raise CancelledError()
+
+    def _sent(self, tokens: int):
+        with self._lock:
+            self.requests += 1
+            self.tokens += tokens
+
+    def _attach(self, future):
+        with self._lock:
+            self._futures.add(future)
+            cancelled = self.cancelled
+        if cancelled:
+            future.cancel()
+
+    def _detach(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+
+_cancel_token = contextvars.ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def cancel_scope(token: CancelToken | None):
+    """Makes provider requests from this thread cancellable by token."""
+    if token is None:
+        yield
+        return
+    token.check()
+    reset = _cancel_token.set(token)
+    try:
+        yield
+    finally:
+        _cancel_token.reset(reset)
+
+
+class AsyncEngine:
+    """
+    One asyncio event loop, on a daemon thread, that every provider request is
+    multiplexed on.
+
+    Sync code hands a coroutine to run(), which blocks only the calling thread
+    while the request is awaited on the loop alongside all the others. Each
+    request is cancelled if it exceeds its timeout, and at most max_in_flight
+    are awaited at once; the rest queue on the loop rather than in threads.
+    """
+
+    def __init__(self, max_in_flight: int = 1000, name: str = "ProviderLoop"):
+        self.max_in_flight = max_in_flight
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        # Counters are only written from the loop thread.
+        self._in_flight = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._cancelled = 0
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Starts the loop thread if it is not already running."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.max_in_flight)
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name=self.name, daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _run(self, coro, timeout: float | None):
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            coro.close()
+            self._cancelled += 1
+            raise
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            result = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise TimeoutError(f"Provider request timed out after {timeout}s.")
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+        self._completed += 1
+        return result
+
+    def submit(self, coro, timeout: float | None = None):
+        """Schedules coro on the loop and returns a concurrent.futures.Future."""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(self._run(coro, timeout), loop)
+
+    def run(self, coro, timeout: float | None = None, cancel: CancelToken = None):
+        """
+        Runs coro on the shared loop and blocks the calling thread for its
+        result. Raises CancelledError if cancel is cancelled first.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncEngine.run() cannot be called from the loop.")
+        future = self.submit(coro, timeout)
+        if cancel:
+            cancel._attach(future)
+        try:
+            return future.result()
+        except BaseException:
+            # Interrupted callers (e.g. KeyboardInterrupt) cancel their request.
+            future.cancel()
+            raise
+        finally:
+            if cancel:
+                cancel._detach(future)
+
+    def shutdown(self):
+        """Cancels outstanding requests and stops the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "cancelled": self._cancelled,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AsyncEngine:
+    """Returns the process-wide provider engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine(config.ASYNC_MAX_IN_FLIGHT)
+            logging.info(
+                f"Async provider engine started (max {config.ASYNC_MAX_IN_FLIGHT} in flight)."
+            )
+        return _engine
+
+
+def run_request(provider: str, request_factory, tokens: int = 0):
+    """
+    Runs a provider request on the shared engine, paced and retried by the
+    rate-limit scheduler. request_factory returns a fresh coroutine per attempt.
+    The request is cancelled with the calling thread's cancel_scope() token.
+    """
+    cancel = _cancel_token.get()
+    if cancel:
+        cancel.check()
+        cancel._sent(tokens)
+    return get_engine().run(
+        get_scheduler().execute(provider, request_factory, tokens), cancel=cancel
+    )
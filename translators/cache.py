@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import config
+from pipeline.chunking import estimate_tokens
+from pipeline.metrics import estimated_cost, get_metrics
+
+EVICTION_CHECK_INTERVAL = 100  # Run eviction every N writes
+
+
+def make_cache_key(**parts) -> str:
+    """Builds a stable content hash from everything that affects a model's output."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    A persistent, content-addressed cache of provider responses backed by SQLite.
+
+    Entries expire after max_age_seconds, and the least recently used entries are
+    evicted once the stored responses exceed max_size_bytes.
+    """
+
+    def __init__(self, path: str, max_size_bytes: int, max_age_seconds: float):
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response for key, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        """Stores a response, evicting old entries periodically."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            conn.commit()
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= EVICTION_CHECK_INTERVAL:
+                self._evict_locked()
+
+    def get_or_create(self, key: str, compute) -> str:
+        """Returns the cached response for key, calling compute() and storing its result on a miss."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        if result and not result.startswith("Error:"):
+            self.put(key, result)
+        return result
+
+    def evict(self):
+        """Removes expired entries, then the least recently used ones over the size limit."""
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        conn = self._connect()
+        self._writes_since_eviction = 0
+        conn.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (time.time() - self.max_age_seconds,),
+        )
+        total_size = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size > self.max_size_bytes:
+            overflow = total_size - self.max_size_bytes
+            freed = 0
+            stale_keys = []
+            for key, size in conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used_at"
+            ):
+                stale_keys.append((key,))
+                freed += size
+                if freed >= overflow:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+            logging.info(f"Translation cache evicted {len(stale_keys)} entries.")
+        conn.commit()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current size of the cache."""
+        with self._lock:
+            entries, size = (
+                self._connect()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+                .fetchone()
+            )
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+class _DisabledCache:
+    """Stands in for the cache when TRANSLATION_CACHE_ENABLED is off."""
+
+    def get_or_create(self, key: str, compute) -> str:
+        return compute()
+
+    def stats(self) -> dict:
+        return {}
+
+
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Returns the process-wide translation cache, creating it from config on first use."""
+    global _translation_cache
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            if config.TRANSLATION_CACHE_ENABLED:
+                _translation_cache = TranslationCache(
+                    config.TRANSLATION_CACHE_PATH,
+                    max_size_bytes=config.TRANSLATION_CACHE_MAX_MB * 1024 * 1024,
+                    max_age_seconds=config.TRANSLATION_CACHE_MAX_AGE_DAYS * 86400,
+                )
+            else:
+                _translation_cache = _DisabledCache()
+        return _translation_cache
+
+
+def cached_completion(
+    provider: str, model: str, params: dict, prompt: str, compute, **context
+) -> str:
+    """
+    Returns a provider response from the cache, or calls compute() on a miss.
+
+    The key covers the provider, model and sampling params plus the fully rendered
+    prompt, which already embeds the source text, language pair and glossary.
+    Any extra request content (e.g. a separate user message) is passed as context.
+    """
+    key = make_cache_key(
+        provider=provider, model=model, params=params, prompt=prompt, **context
+    )
+    metrics = get_metrics()
+    missed = False
+
+    def compute_and_count():
+        nonlocal missed
+        missed = True
+        result = compute()
+        input_tokens = estimate_tokens(prompt) + sum(
+            estimate_tokens(str(value)) for value in context.values()
+        )
+        output_tokens = estimate_tokens(result or "")
+        metrics.inc(
+            "translator_provider_input_tokens_total", input_tokens, provider=provider
+        )
+        metrics.inc(
+            "translator_provider_output_tokens_total", output_tokens, provider=provider
+        )
+        metrics.inc(
+            "translator_provider_cost_usd_total",
+            estimated_cost(provider, input_tokens, output_tokens),
+            provider=provider,
+        )
+        return result
+
+    result = get_translation_cache().get_or_create(key, compute_and_count)
+    metrics.inc(
+        "translator_cache_requests_total",
+        provider=provider,
+        result="miss" if missed else "hit",
+    )
+    return result
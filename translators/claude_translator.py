@@ -1,37 +1,97 @@
 import logging
 import anthropic
-from config import ANTHROPIC_API_KEY
-from .utils import get_prompt_with_glossary
+from config import CLAUDE_MAX_TOKENS
+from pipeline.chunking import estimate_tokens
+from .async_engine import run_request
+from .cache import cached_completion
+from .clients import get_clients
+from .errors import ContentFilteredError, TruncatedError
+from .utils import format_reference_section, get_prompt_with_glossary
 
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+MODEL = "claude-3-5-sonnet-20240620"
+MAX_TOKENS = CLAUDE_MAX_TOKENS
+
+
+async def complete_async(
+    messages: list, system: str | None = None, on_text=None, **params
+) -> str:
+    """
+    Requests a message. With on_text, the response is streamed and each piece
+    of text is passed to on_text as it arrives (after on_text(None), which
+    marks the start of an attempt).
+    """
+    if system is not None:
+        params["system"] = system
+    client: anthropic.AsyncAnthropic = get_clients().get("claude")
+    request = {"model": MODEL, "max_tokens": MAX_TOKENS, "messages": messages}
+    if on_text is None:
+        message = await client.messages.create(**request, **params)
+    else:
+        on_text(None)
+        async with client.messages.stream(**request, **params) as stream:
+            async for text in stream.text_stream:
+                on_text(text)
+            message = await stream.get_final_message()
+    if message.stop_reason == "refusal":
+        raise ContentFilteredError("claude", "The model declined to respond.")
+    if message.stop_reason == "max_tokens":
+        raise TruncatedError(
+            "claude", f"The response was cut off at {MAX_TOKENS} tokens."
+        )
+    return message.content[0].text
+
+
+def _complete(
+    messages: list, input_text: str, output_tokens: int, on_text, **params
+) -> str:
+    return run_request(
+        "claude",
+        lambda: complete_async(messages, on_text=on_text, **params),
+        estimate_tokens(input_text) + output_tokens,
+    )
 
 
 def translate_with_claude(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
-    """Translates text using Anthropic's Claude model with a dynamic prompt."""
+    """
+    Translates text using Anthropic's Claude model with a dynamic prompt.
+    Streams the response to on_text, if given. Raises ProviderError on failure.
+    """
     if not text or not text.strip():
         return ""
     prompt_placeholders = {
         "{source_language}": source_language,
         "{target_language}": target_language,
         "{text}": text,
+        "{reference_section}": format_reference_section(references),
     }
     system_prompt = get_prompt_with_glossary(
         "templates/translate_prompt.txt", prompt_placeholders
     )
     logging.debug(f"Full system prompt for Claude translation:\n{system_prompt}")
-    try:
-        message = client.messages.create(
-            model="claude-3-5-sonnet-20240620",
-            max_tokens=4096,
+
+    def request():
+        return _complete(
+            [{"role": "user", "content": text}],
+            system_prompt + text,
+            estimate_tokens(text),
+            on_text,
             system=system_prompt,
-            messages=[{"role": "user", "content": text}],
         )
-        return message.content[0].text
-    except Exception as e:
-        logging.error(f"Claude translation API call failed: {e}")
-        return f"Error: Claude translation failed. {e}"
+
+    return cached_completion(
+        "claude",
+        MODEL,
+        {"max_tokens": MAX_TOKENS},
+        system_prompt,
+        request,
+        user_message=text,
+    )
 
 
 def critique_with_claude(
@@ -39,8 +99,12 @@ def critique_with_claude(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
-    """Critiques a translation using Anthropic's Claude model."""
+    """
+    Critiques a translation using Anthropic's Claude model. Streams the
+    response to on_text, if given. Raises ProviderError on failure.
+    """
     if not source_text or not source_text.strip():
         return ""
     prompt_placeholders = {
@@ -53,14 +117,20 @@ def critique_with_claude(
         "templates/critique_prompt.txt", prompt_placeholders
     )
     logging.debug(f"Full prompt for Claude critique:\n{critique_prompt}")
-    try:
-        message = client.messages.create(
-            model="claude-3-5-sonnet-20240620",
-            max_tokens=4096,
-            messages=[{"role": "user", "content": critique_prompt}],
+
+    def request():
+        return _complete(
+            [{"role": "user", "content": critique_prompt}],
+            critique_prompt,
+            estimate_tokens(primary_translation),
+            on_text,
             temperature=0.4,
         )
-        return message.content[0].text
-    except Exception as e:
-        logging.error(f"Claude critique API call failed: {e}")
-        return f"Error: Claude critique failed. {e}"
+
+    return cached_completion(
+        "claude",
+        MODEL,
+        {"max_tokens": MAX_TOKENS, "temperature": 0.4},
+        critique_prompt,
+        request,
+    )
@@ -0,0 +1,168 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import anthropic
+import google.generativeai as genai
+import openai
+import config
+
+try:
+    import httpx
+except ImportError:  # Recent openai/anthropic releases ship the client as httpx2.
+    import httpx2 as httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ConnectionStats:
+    """
+    Counts requests, new connections and TLS handshakes for one provider.
+    Without a trace hook (traced=False) only requests can be counted, and the
+    connection figures are reported as None (unknown).
+    """
+
+    def __init__(self, traced: bool = True):
+        self.traced = traced
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    async def trace(self, event: str, info: dict):
+        # httpcore reports every connection it opens and every request it sends.
+        with self._lock:
+            if event == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+            elif event.endswith("send_request_headers.started"):
+                self.requests += 1
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if not self.traced:
+                return {
+                    "requests": self.requests,
+                    "new_connections": None,
+                    "reused_connections": None,
+                    "tls_handshakes": None,
+                }
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(0, self.requests - self.new_connections),
+                "tls_handshakes": self.tls_handshakes,
+            }
+
+
+class ProviderClients:
+    """
+    Owns one long-lived async client per provider, shared by every job and thread.
+
+    GPT and Claude get a pooled, keep-alive HTTP client (HTTP/2 if the h2 package
+    is installed) with separate connect and read timeouts, and a trace hook that
+    counts how many requests had to open a new connection. Gemini's SDK keeps
+    its own gRPC channel, so one model object is reused and only its requests
+    are counted. Clients are bound to the event loop that created them and are
+    rebuilt if the provider engine is restarted on a new loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._clients = {}
+        self.stats = {
+            "gpt": ConnectionStats(),
+            "claude": ConnectionStats(),
+            "gemini": ConnectionStats(traced=False),  # gRPC has no trace hook
+        }
+        if config.PROVIDER_HTTP2 and not HTTP2_AVAILABLE:
+            logging.warning(
+                "PROVIDER_HTTP2 is set but 'h2' is not installed. Using HTTP/1.1."
+            )
+
+    def _http_client(self, provider: str) -> httpx.AsyncClient:
+        stats = self.stats[provider]
+
+        async def add_trace(request):
+            request.extensions["trace"] = stats.trace
+
+        return httpx.AsyncClient(
+            http2=config.PROVIDER_HTTP2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=config.PROVIDER_MAX_CONNECTIONS,
+                max_keepalive_connections=config.PROVIDER_MAX_KEEPALIVE,
+                keepalive_expiry=config.PROVIDER_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                config.PROVIDER_READ_TIMEOUT, connect=config.PROVIDER_CONNECT_TIMEOUT
+            ),
+            event_hooks={"request": [add_trace]},
+        )
+
+    def _create(self, provider: str):
+        if provider == "gpt":
+            return openai.AsyncOpenAI(
+                api_key=config.OPENAI_API_KEY,
+                base_url=config.PROVIDER_BASE_URLS["gpt"] or None,
+                http_client=self._http_client("gpt"),
+                max_retries=0,  # Retries are handled by the rate-limit scheduler
+            )
+        if provider == "claude":
+            return anthropic.AsyncAnthropic(
+                api_key=config.ANTHROPIC_API_KEY,
+                base_url=config.PROVIDER_BASE_URLS["claude"] or None,
+                http_client=self._http_client("claude"),
+                max_retries=0,
+            )
+        raise ValueError(f"Unknown provider '{provider}'.")
+
+    def _reset_if_new_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._clients = {}
+
+    def get(self, provider: str):
+        """Returns the provider's client. Must be called from the engine's loop."""
+        with self._lock:
+            self._reset_if_new_loop()
+            client = self._clients.get(provider)
+            if client is None:
+                client = self._create(provider)
+                self._clients[provider] = client
+                logging.info(f"Created pooled {provider} client.")
+            return client
+
+    def gemini_model(self, model_name: str) -> genai.GenerativeModel:
+        """Returns the shared Gemini model object, counting the request it is fetched for."""
+        self.stats["gemini"].count_request()
+        with self._lock:
+            self._reset_if_new_loop()
+            key = ("gemini", model_name)
+            model = self._clients.get(key)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._clients[key] = model
+            return model
+
+    def connection_stats(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+
+_clients = None
+_clients_lock = threading.Lock()
+
+
+def get_clients() -> ProviderClients:
+    """Returns the process-wide provider client manager."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = ProviderClients()
+        return _clients
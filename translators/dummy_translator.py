@@ -1,42 +1,89 @@
 import logging
 import time
 import random
+from pipeline.batching import SEGMENT_TAG
+
+
+def _simulate_stream(text: str, seconds: float, on_text) -> str:
+    """Waits for seconds, feeding text to on_text word by word if it is given."""
+    if on_text is None:
+        time.sleep(seconds)
+        return text
+    on_text(None)
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        time.sleep(seconds / len(words))
+        on_text(word if i == 0 else f" {word}")
+    return text
+
+
+def _simulated_translation(label: str, text: str, target_language: str) -> str:
+    """One simulated translation per <seg> tag of a packed request, or one in all."""
+    translation = (
+        f"[DUMMY {label}]: This is a simulated translation into {target_language}."
+    )
+    numbers = [number for number, _ in SEGMENT_TAG.findall(text)]
+    if not numbers:
+        return translation
+    return "\n".join(f'<seg id="{number}">{translation}</seg>' for number in numbers)
 
 
 def dummy_translate_with_gpt(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
     """Simulates a GPT translation call."""
     logging.info(
         f"  -> [DUMMY] Simulating translation with GPT ({source_language} -> {target_language})..."
     )
-    time.sleep(random.uniform(1, 2))
-    return f"[DUMMY GPT]: This is a simulated translation into {target_language}."
+    return _simulate_stream(
+        _simulated_translation("GPT", text, target_language),
+        random.uniform(1, 2),
+        on_text,
+    )
 
 
 def dummy_translate_with_claude(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
     """Simulates a Claude translation call that sometimes 'fails'."""
     logging.info(
         f"  -> [DUMMY] Simulating translation with Claude ({source_language} -> {target_language})..."
     )
-    time.sleep(random.uniform(1, 3))
     if random.random() < 0.3:
+        time.sleep(random.uniform(1, 3))
         logging.warning("  -> [DUMMY] Simulating a failure for Claude translation.")
         return "Error: Dummy Claude translation failed as intended."
-    return f"[DUMMY CLAUDE]: This is a simulated translation into {target_language}."
+    return _simulate_stream(
+        _simulated_translation("CLAUDE", text, target_language),
+        random.uniform(1, 3),
+        on_text,
+    )
 
 
 def dummy_translate_with_gemini(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
     """Simulates a Gemini translation call."""
     logging.info(
         f"  -> [DUMMY] Simulating translation with Gemini ({source_language} -> {target_language})..."
     )
-    time.sleep(random.uniform(1, 2.5))
-    return f"[DUMMY GEMINI]: This is a simulated translation into {target_language}."
+    return _simulate_stream(
+        _simulated_translation("GEMINI", text, target_language),
+        random.uniform(1, 2.5),
+        on_text,
+    )
 
 
 def dummy_critique_with_gpt(
@@ -44,11 +91,15 @@ def dummy_critique_with_gpt(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
     """Simulates a GPT critique call."""
     logging.info("  -> [DUMMY] Simulating critique with GPT...")
-    time.sleep(random.uniform(1, 2))
-    return "**Critique:** [DUMMY GPT] The primary translation is generally good but lacks nuance.\n**Refined Translation:** This is a refined GPT translation."
+    return _simulate_stream(
+        "**Critique:** [DUMMY GPT] The primary translation is generally good but lacks nuance.\n**Refined Translation:** This is a refined GPT translation.",
+        random.uniform(1, 2),
+        on_text,
+    )
 
 
 def dummy_critique_with_claude(
@@ -56,11 +107,15 @@ def dummy_critique_with_claude(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
     """Simulates a Claude critique call."""
     logging.info("  -> [DUMMY] Simulating critique with Claude...")
-    time.sleep(random.uniform(1, 3))
-    return "**Critique:** [DUMMY CLAUDE] The tone is slightly off in the primary translation.\n**Refined Translation:** This is a refined Claude translation that adjusts the tone."
+    return _simulate_stream(
+        "**Critique:** [DUMMY CLAUDE] The tone is slightly off in the primary translation.\n**Refined Translation:** This is a refined Claude translation that adjusts the tone.",
+        random.uniform(1, 3),
+        on_text,
+    )
 
 
 def dummy_critique_with_gemini(
@@ -68,8 +123,12 @@ def dummy_critique_with_gemini(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
     """Simulates a Gemini critique call."""
     logging.info("  -> [DUMMY] Simulating critique with Gemini...")
-    time.sleep(random.uniform(1, 2.5))
-    return "**Critique:** [DUMMY GEMINI] A few key terms could be improved for accuracy.\n**Refined Translation:** This is a refined Gemini translation with better terminology."
+    return _simulate_stream(
+        "**Critique:** [DUMMY GEMINI] A few key terms could be improved for accuracy.\n**Refined Translation:** This is a refined Gemini translation with better terminology.",
+        random.uniform(1, 2.5),
+        on_text,
+    )
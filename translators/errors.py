@@ -0,0 +1,148 @@
+import email.utils
+import time
+import anthropic
+import google.api_core.exceptions as google_exceptions
+import google.generativeai as genai
+import openai
+
+
+class ProviderError(Exception):
+    """Base class for failed provider requests, classified by how to react to them."""
+
+    kind = "error"
+    retryable = False
+
+    def __init__(
+        self,
+        provider: str,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def __str__(self):
+        status = f" (HTTP {self.status_code})" if self.status_code else ""
+        return f"{self.provider} {self.kind}{status}: {super().__str__()}"
+
+
+class RateLimitedError(ProviderError):
+    """The provider throttled the request (HTTP 429 or quota exhausted)."""
+
+    kind = "rate_limited"
+    retryable = True
+
+
+class TransientError(ProviderError):
+    """A timeout, connection failure or server-side error worth retrying."""
+
+    kind = "transient"
+    retryable = True
+
+
+class PermanentError(ProviderError):
+    """A request the provider will never accept as sent (bad request, auth, etc.)."""
+
+    kind = "permanent"
+
+
+class ContentFilteredError(PermanentError):
+    """The prompt or the response was blocked by the provider's safety filters."""
+
+    kind = "content_filtered"
+
+
+class TruncatedError(PermanentError):
+    """
+    The response stopped at the output token limit. Sending the same request
+    again would be cut off again, so it is retried in smaller pieces instead.
+    """
+
+    kind = "truncated"
+
+
+TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504, 529}
+
+
+def parse_retry_after(headers) -> float | None:
+    """Reads retry-after-ms or Retry-After (seconds or an HTTP date) from response headers."""
+    if headers is None:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(
+            0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _from_status(
+    provider: str, error: Exception, status: int, headers
+) -> ProviderError:
+    retry_after = parse_retry_after(headers)
+    if status == 429:
+        return RateLimitedError(provider, str(error), status, retry_after)
+    if status in TRANSIENT_STATUS_CODES:
+        return TransientError(provider, str(error), status, retry_after)
+    if "content_filter" in str(error) or "content_policy" in str(error):
+        return ContentFilteredError(provider, str(error), status)
+    return PermanentError(provider, str(error), status)
+
+
+def classify_error(provider: str, error: Exception) -> ProviderError:
+    """Maps an SDK exception from any of the three providers to a ProviderError."""
+    if isinstance(error, ProviderError):
+        return error
+    if isinstance(error, TimeoutError):
+        return TransientError(provider, str(error) or "Request timed out.")
+
+    # OpenAI and Anthropic share the same exception hierarchy.
+    for sdk in (openai, anthropic):
+        if isinstance(error, sdk.APIStatusError):
+            return _from_status(
+                provider, error, error.status_code, error.response.headers
+            )
+        if isinstance(error, (sdk.APITimeoutError, sdk.APIConnectionError)):
+            return TransientError(provider, str(error))
+
+    if isinstance(
+        error,
+        (genai.types.BlockedPromptException, genai.types.StopCandidateException),
+    ):
+        return ContentFilteredError(provider, str(error))
+    if isinstance(error, google_exceptions.GoogleAPICallError):
+        status = error.code if isinstance(error.code, int) else None
+        # gRPC reports quota errors as ResourceExhausted, REST as TooManyRequests.
+        if isinstance(
+            error,
+            (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests),
+        ):
+            return RateLimitedError(provider, str(error), status or 429)
+        if isinstance(
+            error,
+            (
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.DeadlineExceeded,
+                google_exceptions.InternalServerError,
+                google_exceptions.Aborted,
+            ),
+        ):
+            return TransientError(provider, str(error), status)
+        return PermanentError(provider, str(error), status)
+    return PermanentError(provider, f"{type(error).__name__}: {error}")
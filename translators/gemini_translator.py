@@ -1,33 +1,128 @@
+import asyncio
 import logging
 import google.generativeai as genai
-from config import GOOGLE_API_KEY
-from .utils import get_prompt_with_glossary
+from config import GOOGLE_API_KEY, PROVIDER_BASE_URLS
+from pipeline.chunking import estimate_tokens
+from .async_engine import run_request
+from .cache import cached_completion
+from .clients import get_clients
+from .errors import ContentFilteredError, TruncatedError
+from .utils import format_reference_section, get_prompt_with_glossary
+
+# Custom endpoints (such as the local mock API) are reached over REST.
+REST_TRANSPORT = bool(PROVIDER_BASE_URLS["gemini"])
+if REST_TRANSPORT:
+    genai.configure(
+        api_key=GOOGLE_API_KEY,
+        transport="rest",
+        client_options={"api_endpoint": PROVIDER_BASE_URLS["gemini"]},
+    )
+else:
+    genai.configure(api_key=GOOGLE_API_KEY)
+
+MODEL = "gemini-1.5-pro-latest"
+
+
+def _check_blocked(response):
+    if not response.parts:
+        # Blocked prompts and safety stops come back without any text parts.
+        raise ContentFilteredError(
+            "gemini", f"No content returned. {response.prompt_feedback}"
+        )
+    # Only the last streamed chunk carries the finish reason.
+    if (
+        response.candidates
+        and response.candidates[0].finish_reason
+        == genai.protos.Candidate.FinishReason.MAX_TOKENS
+    ):
+        raise TruncatedError("gemini", "The response was cut off at the token limit.")
+
+
+def _complete_blocking(model, prompt: str, generation_config, on_text) -> str:
+    if on_text is None:
+        response = model.generate_content(prompt, generation_config=generation_config)
+        _check_blocked(response)
+        return response.text.strip()
+    on_text(None)
+    parts = []
+    for chunk in model.generate_content(
+        prompt, generation_config=generation_config, stream=True
+    ):
+        _check_blocked(chunk)
+        parts.append(chunk.text)
+        on_text(chunk.text)
+    return "".join(parts).strip()
+
+
+async def complete_async(prompt: str, generation_config=None, on_text=None) -> str:
+    """
+    Generates content. With on_text, the response is streamed and each piece
+    of text is passed to on_text as it arrives (after on_text(None), which
+    marks the start of an attempt).
+    """
+    model = get_clients().gemini_model(MODEL)
+    if REST_TRANSPORT:
+        # The SDK's async client has no REST transport, so the blocking client
+        # runs on a worker thread instead.
+        return await asyncio.to_thread(
+            _complete_blocking, model, prompt, generation_config, on_text
+        )
+    if on_text is None:
+        response = await model.generate_content_async(
+            prompt, generation_config=generation_config
+        )
+        _check_blocked(response)
+        return response.text.strip()
+    on_text(None)
+    parts = []
+    response = await model.generate_content_async(
+        prompt, generation_config=generation_config, stream=True
+    )
+    async for chunk in response:
+        _check_blocked(chunk)
+        parts.append(chunk.text)
+        on_text(chunk.text)
+    return "".join(parts).strip()
 
-genai.configure(api_key=GOOGLE_API_KEY)
+
+def _complete(prompt: str, output_tokens: int, on_text, generation_config=None) -> str:
+    return run_request(
+        "gemini",
+        lambda: complete_async(prompt, generation_config, on_text),
+        estimate_tokens(prompt) + output_tokens,
+    )
 
 
 def translate_with_gemini(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
-    """Translates text using Google's Gemini model with a dynamic prompt."""
+    """
+    Translates text using Google's Gemini model with a dynamic prompt.
+    Streams the response to on_text, if given. Raises ProviderError on failure.
+    """
     if not text or not text.strip():
         return ""
     prompt_placeholders = {
         "{source_language}": source_language,
         "{target_language}": target_language,
         "{text}": text,
+        "{reference_section}": format_reference_section(references),
     }
     prompt = get_prompt_with_glossary(
         "templates/translate_prompt.txt", prompt_placeholders
     )
     logging.debug(f"Full prompt for Gemini translation:\n{prompt}")
-    try:
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        logging.error(f"Gemini translation API call failed: {e}")
-        return f"Error: Gemini translation failed. {e}"
+    return cached_completion(
+        "gemini",
+        MODEL,
+        {},
+        prompt,
+        lambda: _complete(prompt, estimate_tokens(text), on_text),
+    )
 
 
 def critique_with_gemini(
@@ -35,8 +130,12 @@ def critique_with_gemini(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
-    """Critiques a translation using Google's Gemini model."""
+    """
+    Critiques a translation using Google's Gemini model. Streams the response
+    to on_text, if given. Raises ProviderError on failure.
+    """
     if not source_text or not source_text.strip():
         return ""
     prompt_placeholders = {
@@ -49,12 +148,15 @@ def critique_with_gemini(
         "templates/critique_prompt.txt", prompt_placeholders
     )
     logging.debug(f"Full prompt for Gemini critique:\n{prompt}")
-    try:
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-        response = model.generate_content(
-            prompt, generation_config=genai.types.GenerationConfig(temperature=0.4)
-        )
-        return response.text.strip()
-    except Exception as e:
-        logging.error(f"Gemini critique API call failed: {e}")
-        return f"Error: Gemini critique failed. {e}"
+    return cached_completion(
+        "gemini",
+        MODEL,
+        {"temperature": 0.4},
+        prompt,
+        lambda: _complete(
+            prompt,
+            estimate_tokens(primary_translation),
+            on_text,
+            genai.types.GenerationConfig(temperature=0.4),
+        ),
+    )
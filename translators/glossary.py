@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+
+PLACEHOLDER_PATTERN = re.compile(r"\{[a-z_]+\}")
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher that finds every term occurring in a text in one pass.
+
+    Matching is case-insensitive. Terms that start or end with an ASCII letter
+    or digit only match on word boundaries, so "AI" does not match inside "said";
+    CJK terms match anywhere.
+    """
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        node = 0
+        for char in term.lower():
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(term)
+
+    def _build(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+
+    def find(self, text: str) -> set:
+        """Returns the set of terms that occur in text."""
+        lowered = text.lower()
+        found = set()
+        node = 0
+        for end, char in enumerate(lowered, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for term in self._output[node]:
+                if term not in found and _on_word_boundary(
+                    lowered, end - len(term), end
+                ):
+                    found.add(term)
+        return found
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+def _on_word_boundary(text: str, start: int, end: int) -> bool:
+    if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+        return False
+    if _is_word_char(text[end - 1]) and end < len(text) and _is_word_char(text[end]):
+        return False
+    return True
+
+
+class GlossaryIndex:
+    """
+    A glossary loaded once and reloaded only when its file changes.
+
+    The file maps source terms to required translations. Values that are
+    themselves objects are per-language-pair sections keyed "Source/Target"
+    (e.g. "Japanese/English"); they are merged over the global terms for jobs
+    in that language pair.
+    """
+
+    def __init__(self, path: str, loader):
+        self.path = path
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._signature = None
+        self._loaded = False
+        self._global_terms = {}
+        self._sections = {}
+        self._matchers = {}
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if self._loaded and signature == self._signature:
+            return
+        raw = self._loader()
+        self._global_terms = {k: v for k, v in raw.items() if isinstance(v, str)}
+        self._sections = {
+            k.replace(" ", "").lower(): v for k, v in raw.items() if isinstance(v, dict)
+        }
+        self._matchers = {}
+        self._signature = signature
+        self._loaded = True
+
+    def terms_for(self, source_language: str = "", target_language: str = "") -> dict:
+        """Returns the global terms merged with the language pair's section, if any."""
+        with self._lock:
+            self._refresh()
+            return self._terms_for_locked(source_language, target_language)
+
+    def _terms_for_locked(self, source_language: str, target_language: str) -> dict:
+        pair = f"{source_language}/{target_language}".replace(" ", "").lower()
+        section = self._sections.get(pair)
+        return {**self._global_terms, **section} if section else self._global_terms
+
+    def relevant_terms(
+        self, text: str, source_language: str = "", target_language: str = ""
+    ) -> dict:
+        """Returns only the glossary entries whose source term occurs in text."""
+        with self._lock:
+            self._refresh()
+            terms = self._terms_for_locked(source_language, target_language)
+            if not terms:
+                return {}
+            pair = f"{source_language}/{target_language}".replace(" ", "").lower()
+            matcher = self._matchers.get(pair)
+            if matcher is None:
+                matcher = AhoCorasick(terms.keys())
+                self._matchers[pair] = matcher
+        found = matcher.find(text)
+        return {term: terms[term] for term in terms if term in found}
+
+
+class PromptTemplate:
+    """A prompt template parsed once and filled in a single substitution pass."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.placeholders = set(PLACEHOLDER_PATTERN.findall(text))
+
+    def render(self, values: dict) -> str:
+        """
+        Replaces each {placeholder} with its value. Substituted values are never
+        re-scanned, so source text containing braces is inserted verbatim.
+        """
+        return PLACEHOLDER_PATTERN.sub(
+            lambda match: values.get(match.group(0), match.group(0)), self.text
+        )
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(path: str) -> PromptTemplate:
+    """Returns the compiled template for path, re-reading it only if the file changed."""
+    mtime = os.stat(path).st_mtime_ns
+    with _templates_lock:
+        cached = _templates.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        template = PromptTemplate(f.read())
+    with _templates_lock:
+        _templates[path] = (mtime, template)
+    logging.debug(f"Compiled prompt template '{path}'.")
+    return template
+
+
+def load_glossary_file(path: str) -> dict:
+    """Reads a glossary JSON file, returning an empty dict if it is missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            glossary = json.load(f)
+            logging.info(
+                f"Successfully loaded glossary from '{path}' with {len(glossary)} terms."
+            )
+            return glossary
+    except FileNotFoundError:
+        logging.warning(f"Glossary file not found at '{path}'. Continuing without it.")
+        return {}
+    except json.JSONDecodeError:
+        logging.error(
+            f"Could not decode JSON from '{path}'. Please check its format. Continuing without glossary."
+        )
+        return {}
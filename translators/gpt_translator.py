@@ -1,15 +1,72 @@
 import openai
 import logging
-from config import OPENAI_API_KEY
-from .utils import get_prompt_with_glossary
+from pipeline.chunking import estimate_tokens
+from .async_engine import run_request
+from .cache import cached_completion
+from .clients import get_clients
+from .errors import ContentFilteredError, TruncatedError
+from .utils import format_reference_section, get_prompt_with_glossary
 
-openai.api_key = OPENAI_API_KEY
+MODEL = "gpt-4o-mini"
+
+
+async def complete_async(prompt: str, temperature: float, on_text=None) -> str:
+    """
+    Requests a completion. With on_text, the response is streamed and each
+    piece of text is passed to on_text as it arrives (after on_text(None),
+    which marks the start of an attempt).
+    """
+    client: openai.AsyncOpenAI = get_clients().get("gpt")
+    request = {
+        "model": MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+    }
+    if on_text is None:
+        response = await client.chat.completions.create(**request)
+        choice = response.choices[0]
+        content, finish_reason = choice.message.content, choice.finish_reason
+    else:
+        on_text(None)
+        parts = []
+        finish_reason = None
+        async for chunk in await client.chat.completions.create(**request, stream=True):
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                parts.append(choice.delta.content)
+                on_text(choice.delta.content)
+            finish_reason = choice.finish_reason or finish_reason
+        content = "".join(parts)
+    if finish_reason == "content_filter":
+        raise ContentFilteredError(
+            "gpt", "The response was blocked by the content filter."
+        )
+    if finish_reason == "length":
+        raise TruncatedError("gpt", "The response was cut off at the token limit.")
+    return content.strip()
+
+
+def _complete(prompt: str, temperature: float, output_tokens: int, on_text) -> str:
+    return run_request(
+        "gpt",
+        lambda: complete_async(prompt, temperature, on_text),
+        estimate_tokens(prompt) + output_tokens,
+    )
 
 
 def translate_with_gpt(
-    text: str, target_language: str, source_language: str = "English"
+    text: str,
+    target_language: str,
+    source_language: str = "English",
+    references: list | None = None,
+    on_text=None,
 ) -> str:
-    """Translates text using OpenAI's GPT model."""
+    """
+    Translates text using OpenAI's GPT model. Streams the response to on_text,
+    if given. Raises ProviderError on failure.
+    """
     if not text or not text.strip():
         return ""
     prompt = get_prompt_with_glossary(
@@ -18,19 +75,17 @@ def translate_with_gpt(
             "{source_language}": source_language,
             "{target_language}": target_language,
             "{text}": text,
+            "{reference_section}": format_reference_section(references),
         },
     )
     logging.debug(f"Full prompt for GPT translation:\n{prompt}")
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.error(f"OpenAI translation API call failed: {e}")
-        return f"Error: OpenAI translation failed. {e}"
+    return cached_completion(
+        "gpt",
+        MODEL,
+        {"temperature": 0.2},
+        prompt,
+        lambda: _complete(prompt, 0.2, estimate_tokens(text), on_text),
+    )
 
 
 def critique_with_gpt(
@@ -38,8 +93,12 @@ def critique_with_gpt(
     primary_translation: str,
     target_language: str,
     source_language: str = "English",
+    on_text=None,
 ) -> str:
-    """Critiques a translation using OpenAI's GPT model."""
+    """
+    Critiques a translation using OpenAI's GPT model. Streams the response to
+    on_text, if given. Raises ProviderError on failure.
+    """
     if not source_text or not source_text.strip():
         return ""
     prompt = get_prompt_with_glossary(
@@ -52,13 +111,10 @@ def critique_with_gpt(
         },
     )
     logging.debug(f"Full prompt for GPT critique:\n{prompt}")
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.4,
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logging.error(f"OpenAI critique API call failed: {e}")
-        return f"Error: OpenAI critique failed. {e}"
+    return cached_completion(
+        "gpt",
+        MODEL,
+        {"temperature": 0.4},
+        prompt,
+        lambda: _complete(prompt, 0.4, estimate_tokens(primary_translation), on_text),
+    )
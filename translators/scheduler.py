@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import config
+from pipeline.metrics import get_metrics
+from .errors import RateLimitedError, TransientError, classify_error
+
+
+def record_attempt(provider: str, seconds: float, error=None):
+    """Records the latency and outcome of one provider request attempt."""
+    metrics = get_metrics()
+    outcome = error.kind if error else "ok"
+    metrics.observe(
+        "translator_provider_request_seconds",
+        seconds,
+        provider=provider,
+        outcome=outcome,
+    )
+    metrics.observe("translator_stage_seconds", seconds, stage="api")
+    metrics.inc(
+        "translator_provider_requests_total", provider=provider, outcome=outcome
+    )
+    if error:
+        metrics.inc(
+            "translator_provider_errors_total",
+            provider=provider,
+            error=type(error).__name__,
+        )
+
+
+class TokenBucket:
+    """
+    A budget that refills continuously at per_minute / 60 units per second, up
+    to one minute's worth.
+
+    reserve() always succeeds but may leave the bucket in debt; the returned
+    delay is how long the caller must wait before its share is actually
+    available. Later callers see the debt, so requests are served in order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        if self.capacity <= 0:  # Unlimited
+            return 0.0
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request bigger than the whole bucket waits for a full bucket, not forever.
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+
+class RateLimitScheduler:
+    """
+    Paces provider requests to their requests- and tokens-per-minute budgets
+    and retries the failures that are worth retrying.
+
+    Runs on the provider engine's event loop, so its state needs no locks.
+    A request first waits out any pause the provider asked for (Retry-After),
+    then reserves one request and its estimated tokens from the buckets. Rate
+    limits and transient errors are retried with jittered exponential backoff;
+    a rate limit also pauses every other request to that provider. Whatever
+    still fails is raised as a typed ProviderError.
+    """
+
+    def __init__(
+        self,
+        limits: dict,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        timeout: float | None = None,
+    ):
+        self.limits = limits
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._request_buckets = {}
+        self._token_buckets = {}
+        self._paused_until = {}
+        self._stats = {}
+
+    def _buckets(self, provider: str) -> tuple:
+        if provider not in self._request_buckets:
+            limit = self.limits.get(provider, {})
+            self._request_buckets[provider] = TokenBucket(limit.get("rpm", 0))
+            self._token_buckets[provider] = TokenBucket(limit.get("tpm", 0))
+        return self._request_buckets[provider], self._token_buckets[provider]
+
+    def _stat(self, provider: str) -> dict:
+        return self._stats.setdefault(
+            provider,
+            {
+                "requests": 0,
+                "retries": 0,
+                "rate_limited": 0,
+                "failed": 0,
+                "throttled_seconds": 0.0,
+            },
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: a random delay up to base * 2^attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _acquire(self, provider: str, tokens: int):
+        stats = self._stat(provider)
+        while True:
+            pause = self._paused_until.get(provider, 0) - time.monotonic()
+            if pause <= 0:
+                break
+            stats["throttled_seconds"] += pause
+            await asyncio.sleep(pause)
+        request_bucket, token_bucket = self._buckets(provider)
+        delay = max(request_bucket.reserve(1), token_bucket.reserve(tokens))
+        if delay > 0:
+            stats["throttled_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    async def execute(self, provider: str, request_factory, tokens: int = 0):
+        """
+        Awaits request_factory() within the provider's budgets, retrying
+        rate-limited and transient failures. tokens is the estimated input plus
+        output size of the request.
+        """
+        stats = self._stat(provider)
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(provider, tokens)
+            stats["requests"] += 1
+            started = time.monotonic()
+            error = None
+            try:
+                result = await asyncio.wait_for(request_factory(), self.timeout)
+            except asyncio.TimeoutError:
+                error = TransientError(
+                    provider, f"Request timed out after {self.timeout}s."
+                )
+            except Exception as e:
+                error = classify_error(provider, e)
+            record_attempt(provider, time.monotonic() - started, error)
+            if error is None:
+                return result
+            if isinstance(error, RateLimitedError):
+                stats["rate_limited"] += 1
+            if not error.retryable or attempt == self.max_retries:
+                stats["failed"] += 1
+                raise error
+            delay = error.retry_after
+            if delay is None:
+                delay = self.backoff(attempt)
+            if isinstance(error, RateLimitedError):
+                self._paused_until[provider] = max(
+                    self._paused_until.get(provider, 0), time.monotonic() + delay
+                )
+            stats["retries"] += 1
+            get_metrics().inc("translator_provider_retries_total", provider=provider)
+            logging.warning(
+                f"  -> [{provider}] Retrying in {delay:.1f}s "
+                f"(attempt {attempt + 2}/{self.max_retries + 1}) after {error}"
+            )
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {provider: dict(stats) for provider, stats in self._stats.items()}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Returns the process-wide scheduler configured from config."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RateLimitScheduler(
+                config.PROVIDER_RATE_LIMITS,
+                max_retries=config.PROVIDER_MAX_RETRIES,
+                base_delay=config.RETRY_BASE_DELAY,
+                max_delay=config.RETRY_MAX_DELAY,
+                timeout=config.PROVIDER_TIMEOUT_SECONDS,
+            )
+        return _scheduler
@@ -0,0 +1,271 @@
+import difflib
+import hashlib
+import heapq
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from operator import itemgetter
+import config
+
+MAX_SCANNED_POSTINGS = 2000  # Posting entries counted per fuzzy lookup, at most
+MAX_VERIFIED = 20  # Best-counted candidates whose trigram overlap is scored
+MAX_CANDIDATES = 5  # Candidates re-scored with difflib after trigram filtering
+BLOCK_LENGTH = 6  # Characters per candidate search block in unspaced text
+# The trigram score only preselects candidates for difflib, so it is loosened.
+TRIGRAM_SLACK = 0.8
+
+
+@dataclass
+class MemoryMatch:
+    source: str
+    target: str
+    score: float
+
+
+def normalize_segment(text: str) -> str:
+    """Collapses whitespace so trivially different segments share one entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text.lower()} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _blocks(text: str) -> list:
+    """
+    The query's words, padded as trigrams() pads them. Text written without
+    spaces (Chinese, Japanese) is cut into blocks of BLOCK_LENGTH characters.
+    """
+    blocks = []
+    for word in set(text.lower().split()):
+        if len(word) <= 2 * BLOCK_LENGTH:
+            blocks.append(f" {word} ")
+        else:
+            blocks.extend(
+                word[i : i + BLOCK_LENGTH] for i in range(0, len(word), BLOCK_LENGTH)
+            )
+    return blocks
+
+
+class _SegmentIndex:
+    """
+    In-memory exact and trigram index over one language pair and provider.
+
+    Entries are only ever appended, and an entry is published in ids last, so
+    lookups can read the index while add() runs in another thread.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.sources = []
+        self.targets = []
+        self.sizes = array("I")
+        self.postings = defaultdict(lambda: array("I"))
+
+    def add(self, source: str, target: str):
+        if source in self.ids:
+            self.targets[self.ids[source]] = target
+            return
+        entry_id = len(self.sources)
+        self.sources.append(source)
+        self.targets.append(target)
+        grams = trigrams(source)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings[gram].append(entry_id)
+        self.ids[source] = entry_id
+
+    def exact(self, source: str) -> MemoryMatch | None:
+        entry_id = self.ids.get(source)
+        if entry_id is None:
+            return None
+        return MemoryMatch(source, self.targets[entry_id], 1.0)
+
+    def fuzzy(self, source: str, min_score: float) -> MemoryMatch | None:
+        """
+        Returns the closest entry scoring at least min_score, if any.
+
+        Candidates are gathered from the postings of each word's rarest trigram,
+        most selective words first, until MAX_SCANNED_POSTINGS entries have been
+        counted, so a lookup costs the same however large the memory grows.
+        Of those whose size is within reach of the threshold, the MAX_VERIFIED
+        sharing the most words are scored by trigram overlap, and the best few
+        are re-scored with difflib.
+        """
+        grams = trigrams(source)
+        query_size = len(grams)
+        threshold = min_score * TRIGRAM_SLACK
+        # Dice scores under the threshold are certain outside this size band.
+        low = query_size * threshold / (2 - threshold)
+        high = query_size * (2 - threshold) / threshold
+
+        postings = self.postings
+        rarest = {}
+        for block in _blocks(source):
+            found = [
+                postings[gram]
+                for gram in (block[i : i + 3] for i in range(len(block) - 2))
+                if gram in postings
+            ]
+            if found:
+                posting = min(found, key=len)
+                rarest[id(posting)] = posting
+        counts = Counter()
+        budget = MAX_SCANNED_POSTINGS
+        for posting in sorted(rarest.values(), key=len):
+            if budget <= 0:
+                break
+            counts.update(posting[-budget:])  # The newest entries, if too many
+            budget -= len(posting)
+
+        sizes, sources = self.sizes, self.sources
+        in_band = (item for item in counts.items() if low <= sizes[item[0]] <= high)
+        scored = []
+        for entry_id, _ in heapq.nlargest(MAX_VERIFIED, in_band, key=itemgetter(1)):
+            size = sizes[entry_id]
+            dice = 2 * len(grams & trigrams(sources[entry_id])) / (query_size + size)
+            if dice >= threshold:
+                scored.append((dice, entry_id))
+        best = None
+        for _, entry_id in sorted(scored, reverse=True)[:MAX_CANDIDATES]:
+            score = difflib.SequenceMatcher(
+                None, source, self.sources[entry_id], autojunk=False
+            ).ratio()
+            if score >= min_score and (best is None or score > best.score):
+                best = MemoryMatch(
+                    self.sources[entry_id], self.targets[entry_id], score
+                )
+        return best
+
+
+class TranslationMemory:
+    """
+    A segment-level translation memory stored in SQLite.
+
+    Segments are indexed in memory per (source language, target language, provider)
+    the first time that combination is looked up, so exact matches are a dict
+    lookup and fuzzy matches only score the few candidates sharing trigrams.
+    The lock guards loading indexes and writing; lookups score without it.
+    """
+
+    def __init__(self, path: str, hint_threshold: float = 0.75):
+        self.path = path
+        self.hint_threshold = hint_threshold
+        self._conn = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS segments (
+                    source_language TEXT NOT NULL,
+                    target_language TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    source_hash TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (source_language, target_language, provider, source_hash)
+                )""")
+            self._conn.commit()
+        return self._conn
+
+    def _index(self, source_language: str, target_language: str, provider: str):
+        key = (source_language, target_language, provider)
+        if key not in self._indexes:
+            started = time.monotonic()
+            index = _SegmentIndex()
+            for source, target in self._connect().execute(
+                "SELECT source, target FROM segments WHERE source_language = ? "
+                "AND target_language = ? AND provider = ? ORDER BY updated_at",
+                key,
+            ):
+                index.add(source, target)
+            self._indexes[key] = index
+            logging.info(
+                f"Loaded translation memory for {source_language}->{target_language} "
+                f"({provider}): {len(index.sources)} segments in {time.monotonic() - started:.2f}s."
+            )
+        return self._indexes[key]
+
+    def lookup(
+        self, segment: str, source_language: str, target_language: str, provider: str
+    ) -> MemoryMatch | None:
+        """Returns the best match scoring at least hint_threshold, exact matches first."""
+        source = normalize_segment(segment)
+        if not source:
+            return None
+        with self._lock:
+            index = self._index(source_language, target_language, provider)
+        return index.exact(source) or index.fuzzy(source, self.hint_threshold)
+
+    def add(
+        self, pairs: list, source_language: str, target_language: str, provider: str
+    ):
+        """Stores (source, target) segment pairs for a language pair and provider."""
+        rows = []
+        now = time.time()
+        with self._lock:
+            index = self._index(source_language, target_language, provider)
+            for segment, target in pairs:
+                source = normalize_segment(segment)
+                if not source or not target.strip():
+                    continue
+                index.add(source, target)
+                source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()
+                rows.append(
+                    (
+                        source_language,
+                        target_language,
+                        provider,
+                        source_hash,
+                        source,
+                        target,
+                        now,
+                    )
+                )
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = (
+                self._connect().execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+            )
+        return {"segments": count, "loaded_indexes": len(self._indexes)}
+
+
+_translation_memory = None
+_translation_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory | None:
+    """
+    Returns the process-wide translation memory, or None if it is disabled.
+    Dummy mode never uses it, so fake translations cannot be reused by real runs.
+    """
+    global _translation_memory
+    if not config.TRANSLATION_MEMORY_ENABLED or config.DUMMY_MODE:
+        return None
+    with _translation_memory_lock:
+        if _translation_memory is None:
+            _translation_memory = TranslationMemory(
+                config.TRANSLATION_MEMORY_PATH,
+                hint_threshold=config.TM_HINT_THRESHOLD,
+            )
+        return _translation_memory
@@ -1,51 +1,75 @@
-import json
-import logging
+import threading
+import time
 import config
+from pipeline.metrics import get_metrics
+from .glossary import GlossaryIndex, get_template, load_glossary_file
 
 
 def load_glossary() -> dict:
     """Loads the glossary from the path specified in the config module."""
-    glossary_path = config.GLOSSARY_PATH
-    try:
-        with open(glossary_path, "r", encoding="utf-8") as f:
-            glossary = json.load(f)
-            logging.info(
-                f"Successfully loaded glossary from '{glossary_path}' with {len(glossary)} terms."
-            )
-            return glossary
-    except FileNotFoundError:
-        logging.warning(
-            f"Glossary file not found at '{glossary_path}'. Continuing without it."
-        )
-        return {}
-    except json.JSONDecodeError:
-        logging.error(
-            f"Could not decode JSON from '{glossary_path}'. Please check its format. Continuing without glossary."
-        )
-        return {}
+    return load_glossary_file(config.GLOSSARY_PATH)
+
+
+_glossary_index = None
+_glossary_index_lock = threading.Lock()
+
+
+def get_glossary_index() -> GlossaryIndex:
+    """Returns the shared glossary index for the configured glossary path."""
+    global _glossary_index
+    with _glossary_index_lock:
+        if _glossary_index is None or _glossary_index.path != config.GLOSSARY_PATH:
+            _glossary_index = GlossaryIndex(config.GLOSSARY_PATH, load_glossary)
+        return _glossary_index
+
+
+def format_glossary_section(glossary: dict) -> str:
+    if not glossary:
+        return ""
+    terms = "\n".join(
+        [
+            f'- "{key}" must be translated as "{value}"'
+            for key, value in glossary.items()
+        ]
+    )
+    return f"You must adhere to the following glossary terms:\n{terms}\n"
 
 
 def get_prompt_with_glossary(template_path: str, placeholders: dict) -> str:
-    """Reads a prompt template, injects the glossary, and fills placeholders."""
-    with open(template_path, "r", encoding="utf-8") as f:
-        prompt_template = f.read()
-
-    glossary = load_glossary()
-    glossary_section = ""
-    if glossary:
-        terms = "\n".join(
-            [
-                f'- "{key}" must be translated as "{value}"'
-                for key, value in glossary.items()
-            ]
-        )
-        glossary_section = (
-            f"You must adhere to the following glossary terms:\n{terms}\n"
-        )
-
-    placeholders["{glossary_section}"] = glossary_section
-
-    for key, value in placeholders.items():
-        prompt_template = prompt_template.replace(key, value)
-
-    return prompt_template
+    """
+    Fills a compiled prompt template, injecting only the glossary terms that occur
+    in the source text for this job's language pair.
+    """
+    started = time.monotonic()
+    template = get_template(template_path)
+    source_text = placeholders.get("{text}") or placeholders.get("{source_text}", "")
+    source_language = placeholders.get("{source_language}", "")
+    target_language = placeholders.get("{target_language}", "")
+    index = get_glossary_index()
+    if config.GLOSSARY_FILTER_TERMS:
+        glossary = index.relevant_terms(source_text, source_language, target_language)
+    else:
+        glossary = index.terms_for(source_language, target_language)
+    prompt = template.render(
+        {**placeholders, "{glossary_section}": format_glossary_section(glossary)}
+    )
+    get_metrics().observe(
+        "translator_stage_seconds", time.monotonic() - started, stage="prompt"
+    )
+    return prompt
+
+
+def format_reference_section(references: list | None) -> str:
+    """Formats (source, translation) pairs from the translation memory as prompt hints."""
+    if not references:
+        return ""
+    examples = "\n".join(
+        [
+            f'- "{source}" was previously translated as "{target}"'
+            for source, target in references
+        ]
+    )
+    return (
+        "Similar segments have been translated before. Reuse their wording where it still fits:\n"
+        f"{examples}\n"
+    )